@@ -13,12 +13,17 @@ Customizable invocation: ::
 
 """
 
+import os
+
 import celery
 from celery.schedules import crontab
 
 import manage
 
 
+# Minutes between runs of the queue consumer
+QUEUE_INTERVAL = int(os.getenv('FEC_QUEUE_INTERVAL', 5))
+
 app = celery.Celery('cron')
 app.conf.update(
     BROKER_URL='sqla+sqlite:///beat.sqlite',
@@ -32,6 +37,12 @@ app.conf.update(
             'task': 'cron.update_aggregates',
             'schedule': crontab(minute=0, hour=0),
         },
+        # Runs that overlap the nightly rebuild of aggregates skip processing;
+        # see `queues.consume_all`
+        'consume_queues': {
+            'task': 'cron.consume_queues',
+            'schedule': crontab(minute='*/{0}'.format(QUEUE_INTERVAL)),
+        },
     }
 )
 
@@ -39,7 +50,11 @@ app.conf.update(
 @app.task
 def refresh():
     with manage.app.test_request_context():
-        manage.refresh_materialized()
+        try:
+            manage.refresh_materialized()
+        except SystemExit:
+            # Fail the task rather than exiting the worker
+            raise RuntimeError('Failed to refresh materialized views')
 
 
 @app.task
@@ -48,5 +63,11 @@ def update_aggregates():
         manage.update_aggregates()
 
 
+@app.task
+def consume_queues():
+    with manage.app.test_request_context():
+        manage.consume_queues()
+
+
 if __name__ == '__main__':
     app.worker_main(['worker', '--beat'])
@@ -1,9 +1,24 @@
+-- Check whether a queued row belongs to the batch of keys [start_sk, stop_sk);
+-- null bounds are open
+create or replace function in_batch(sk bigint, start_sk bigint, stop_sk bigint) returns boolean as $$
+    select (start_sk is null or sk >= start_sk) and (stop_sk is null or sk < stop_sk);
+$$ language sql immutable;
+
 create or replace function update_aggregates() returns void as $$
 begin
     -- Update aggregates in place
     perform ofec_sched_a_update_aggregate_zip();
     perform ofec_sched_a_update_aggregate_state();
     perform ofec_sched_a_update_aggregate_size();
+    perform ofec_sched_a_update_aggregate_employer();
+    perform ofec_sched_a_update_aggregate_occupation();
+    perform ofec_sched_a_update_aggregate_contributor();
+    perform ofec_sched_a_update_aggregate_date();
+    perform ofec_sched_b_update_aggregate_recipient();
+    perform ofec_sched_b_update_aggregate_recipient_id();
+    perform ofec_sched_b_update_aggregate_state();
+    perform ofec_sched_b_update_aggregate_purpose();
+    perform ofec_sched_b_update_aggregate_date();
 
     -- Update full-text tables in place
     perform ofec_sched_a_update_fulltext();
@@ -12,5 +27,7 @@ begin
     -- Clear queue tables
     delete from ofec_sched_a_queue_new;
     delete from ofec_sched_a_queue_old;
+    delete from ofec_sched_b_queue_new;
+    delete from ofec_sched_b_queue_old;
 end
 $$ language plpgsql;
@@ -0,0 +1,2 @@
+-- Trigram indexes and similarity search on names
+create extension if not exists pg_trgm;
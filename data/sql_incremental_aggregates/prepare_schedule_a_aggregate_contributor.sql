@@ -0,0 +1,85 @@
+drop table if exists ofec_sched_a_aggregate_contributor;
+create table ofec_sched_a_aggregate_contributor as
+select
+    cmte_id,
+    rpt_yr + rpt_yr % 2 as cycle,
+    contbr_id as contributor_id,
+    contbr_nm as contributor_name,
+    sum(contb_receipt_amt) as total,
+    count(contb_receipt_amt) as count
+from sched_a
+where rpt_yr >= :START_YEAR_ITEMIZED
+group by cmte_id, cycle, contributor_id, contributor_name
+;
+
+-- Add surrogate key for keyset pagination
+alter table ofec_sched_a_aggregate_contributor add column idx serial primary key;
+
+create index on ofec_sched_a_aggregate_contributor (cmte_id);
+create index on ofec_sched_a_aggregate_contributor (cycle);
+create index on ofec_sched_a_aggregate_contributor (contributor_id);
+create index on ofec_sched_a_aggregate_contributor (contributor_name);
+create index on ofec_sched_a_aggregate_contributor (total, idx);
+create index on ofec_sched_a_aggregate_contributor (count, idx);
+-- Support top-N queries within a committee and cycle
+create index on ofec_sched_a_aggregate_contributor (cmte_id, cycle, total, idx);
+create index on ofec_sched_a_aggregate_contributor (cmte_id, cycle, count, idx);
+
+-- Create update function; updates from queued rows with keys in the batch
+-- [start_sk, stop_sk), or from all queued rows by default
+create or replace function ofec_sched_a_update_aggregate_contributor(start_sk bigint default null, stop_sk bigint default null) returns void as $$
+begin
+    with new as (
+        select
+            cmte_id,
+            rpt_yr + rpt_yr % 2 as cycle,
+            contbr_id as contributor_id,
+            contbr_nm as contributor_name,
+            sum(contb_receipt_amt) as total,
+            count(contb_receipt_amt) as count
+        from ofec_sched_a_queue_new
+        where in_batch(sched_a_sk, start_sk, stop_sk)
+        group by cmte_id, cycle, contributor_id, contributor_name
+    ),
+    old as (
+        select
+            cmte_id,
+            rpt_yr + rpt_yr % 2 as cycle,
+            contbr_id as contributor_id,
+            contbr_nm as contributor_name,
+            -1 * sum(contb_receipt_amt) as total,
+            -1 * count(contb_receipt_amt) as count
+        from ofec_sched_a_queue_old
+        where in_batch(sched_a_sk, start_sk, stop_sk)
+        group by cmte_id, cycle, contributor_id, contributor_name
+    ),
+    patch as (
+        select cmte_id, cycle, contributor_id, contributor_name, sum(total) as total, sum(count) as count
+        from (
+            select * from new
+            union all
+            select * from old
+        ) changes
+        group by cmte_id, cycle, contributor_id, contributor_name
+    ),
+    inc as (
+        update ofec_sched_a_aggregate_contributor ag
+        set
+            total = ag.total + patch.total,
+            count = ag.count + patch.count
+        from patch
+        where (ag.cmte_id, ag.cycle) = (patch.cmte_id, patch.cycle)
+        and ag.contributor_id is not distinct from patch.contributor_id
+        and ag.contributor_name is not distinct from patch.contributor_name
+    )
+    insert into ofec_sched_a_aggregate_contributor (cmte_id, cycle, contributor_id, contributor_name, total, count) (
+        select patch.* from patch
+        left join ofec_sched_a_aggregate_contributor ag on
+            (ag.cmte_id, ag.cycle) = (patch.cmte_id, patch.cycle)
+            and ag.contributor_id is not distinct from patch.contributor_id
+            and ag.contributor_name is not distinct from patch.contributor_name
+        where ag.idx is null
+    )
+    ;
+end
+$$ language plpgsql;
@@ -0,0 +1,79 @@
+drop table if exists ofec_sched_a_aggregate_employer;
+create table ofec_sched_a_aggregate_employer as
+select
+    cmte_id,
+    rpt_yr + rpt_yr % 2 as cycle,
+    contbr_employer as employer,
+    sum(contb_receipt_amt) as total,
+    count(contb_receipt_amt) as count
+from sched_a
+where rpt_yr >= :START_YEAR_ITEMIZED
+group by cmte_id, cycle, employer
+;
+
+-- Add surrogate key for keyset pagination
+alter table ofec_sched_a_aggregate_employer add column idx serial primary key;
+
+create index on ofec_sched_a_aggregate_employer (cmte_id);
+create index on ofec_sched_a_aggregate_employer (cycle);
+create index on ofec_sched_a_aggregate_employer (employer);
+create index on ofec_sched_a_aggregate_employer (total, idx);
+create index on ofec_sched_a_aggregate_employer (count, idx);
+-- Support top-N queries within a committee and cycle
+create index on ofec_sched_a_aggregate_employer (cmte_id, cycle, total, idx);
+create index on ofec_sched_a_aggregate_employer (cmte_id, cycle, count, idx);
+
+-- Create update function; updates from queued rows with keys in the batch
+-- [start_sk, stop_sk), or from all queued rows by default
+create or replace function ofec_sched_a_update_aggregate_employer(start_sk bigint default null, stop_sk bigint default null) returns void as $$
+begin
+    with new as (
+        select
+            cmte_id,
+            rpt_yr + rpt_yr % 2 as cycle,
+            contbr_employer as employer,
+            sum(contb_receipt_amt) as total,
+            count(contb_receipt_amt) as count
+        from ofec_sched_a_queue_new
+        where in_batch(sched_a_sk, start_sk, stop_sk)
+        group by cmte_id, cycle, employer
+    ),
+    old as (
+        select
+            cmte_id,
+            rpt_yr + rpt_yr % 2 as cycle,
+            contbr_employer as employer,
+            -1 * sum(contb_receipt_amt) as total,
+            -1 * count(contb_receipt_amt) as count
+        from ofec_sched_a_queue_old
+        where in_batch(sched_a_sk, start_sk, stop_sk)
+        group by cmte_id, cycle, employer
+    ),
+    patch as (
+        select cmte_id, cycle, employer, sum(total) as total, sum(count) as count
+        from (
+            select * from new
+            union all
+            select * from old
+        ) changes
+        group by cmte_id, cycle, employer
+    ),
+    inc as (
+        update ofec_sched_a_aggregate_employer ag
+        set
+            total = ag.total + patch.total,
+            count = ag.count + patch.count
+        from patch
+        where (ag.cmte_id, ag.cycle) = (patch.cmte_id, patch.cycle)
+        and ag.employer is not distinct from patch.employer
+    )
+    insert into ofec_sched_a_aggregate_employer (cmte_id, cycle, employer, total, count) (
+        select patch.* from patch
+        left join ofec_sched_a_aggregate_employer ag on
+            (ag.cmte_id, ag.cycle) = (patch.cmte_id, patch.cycle)
+            and ag.employer is not distinct from patch.employer
+        where ag.idx is null
+    )
+    ;
+end
+$$ language plpgsql;
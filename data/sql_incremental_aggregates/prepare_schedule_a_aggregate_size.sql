@@ -24,15 +24,20 @@ and contb_receipt_amt > 200
 group by cmte_id, cycle, size
 ;
 
+-- Add surrogate key for keyset pagination
+alter table ofec_sched_a_aggregate_size add column idx serial primary key;
+
 -- Create indices on aggregate
 create index on ofec_sched_a_aggregate_size (cmte_id);
 create index on ofec_sched_a_aggregate_size (cycle);
 create index on ofec_sched_a_aggregate_size (size);
-create index on ofec_sched_a_aggregate_size (total);
-create index on ofec_sched_a_aggregate_size (count);
+create index on ofec_sched_a_aggregate_size (total, idx);
+create index on ofec_sched_a_aggregate_size (count, idx);
 
--- Create update function
-create or replace function ofec_sched_a_update_aggregate_size() returns void as $$
+-- Create update function; updates from queued rows with keys in the batch
+-- [start_sk, stop_sk), or from all queued rows by default
+drop function if exists ofec_sched_a_update_aggregate_size();
+create or replace function ofec_sched_a_update_aggregate_size(start_sk bigint default null, stop_sk bigint default null) returns void as $$
 begin
     with new as (
         select
@@ -42,6 +47,7 @@ begin
             sum(contb_receipt_amt) as total,
             count(contb_receipt_amt) as count
         from ofec_sched_a_queue_new
+        where in_batch(sched_a_sk, start_sk, stop_sk)
         group by cmte_id, cycle, size
     ),
     old as (
@@ -52,12 +58,17 @@ begin
             -1 * sum(contb_receipt_amt) as total,
             -1 * count(contb_receipt_amt) as count
         from ofec_sched_a_queue_old
+        where in_batch(sched_a_sk, start_sk, stop_sk)
         group by cmte_id, cycle, size
     ),
     patch as (
-        select * from new
-        union all
-        select * from old
+        select cmte_id, cycle, size, sum(total) as total, sum(count) as count
+        from (
+            select * from new
+            union all
+            select * from old
+        ) changes
+        group by cmte_id, cycle, size
     ),
     inc as (
         update ofec_sched_a_aggregate_size ag
@@ -67,7 +78,7 @@ begin
         from patch
         where (ag.cmte_id, ag.cycle, ag.size) = (patch.cmte_id, patch.cycle, patch.size)
     )
-    insert into ofec_sched_a_aggregate_size (
+    insert into ofec_sched_a_aggregate_size (cmte_id, cycle, size, total, count) (
         select patch.* from patch
         left join ofec_sched_a_aggregate_size ag using (cmte_id, cycle, size)
         where ag.cmte_id is null
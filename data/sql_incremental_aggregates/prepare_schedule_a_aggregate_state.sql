@@ -11,14 +11,19 @@ where rpt_yr >= :START_YEAR_ITEMIZED
 group by cmte_id, cycle, state
 ;
 
+-- Add surrogate key for keyset pagination
+alter table ofec_sched_a_aggregate_state add column idx serial primary key;
+
 create index on ofec_sched_a_aggregate_state (cmte_id);
 create index on ofec_sched_a_aggregate_state (cycle);
 create index on ofec_sched_a_aggregate_state (state);
-create index on ofec_sched_a_aggregate_state (total);
-create index on ofec_sched_a_aggregate_state (count);
+create index on ofec_sched_a_aggregate_state (total, idx);
+create index on ofec_sched_a_aggregate_state (count, idx);
 
--- Create update function
-create or replace function ofec_sched_a_update_aggregate_state() returns void as $$
+-- Create update function; updates from queued rows with keys in the batch
+-- [start_sk, stop_sk), or from all queued rows by default
+drop function if exists ofec_sched_a_update_aggregate_state();
+create or replace function ofec_sched_a_update_aggregate_state(start_sk bigint default null, stop_sk bigint default null) returns void as $$
 begin
     with new as (
         select
@@ -28,6 +33,7 @@ begin
             sum(contb_receipt_amt) as total,
             count(contb_receipt_amt) as count
         from ofec_sched_a_queue_new
+        where in_batch(sched_a_sk, start_sk, stop_sk)
         group by cmte_id, cycle, state
     ),
     old as (
@@ -38,12 +44,17 @@ begin
             -1 * sum(contb_receipt_amt) as total,
             -1 * count(contb_receipt_amt) as count
         from ofec_sched_a_queue_old
+        where in_batch(sched_a_sk, start_sk, stop_sk)
         group by cmte_id, cycle, state
     ),
     patch as (
-        select * from new
-        union all
-        select * from old
+        select cmte_id, cycle, state, sum(total) as total, sum(count) as count
+        from (
+            select * from new
+            union all
+            select * from old
+        ) changes
+        group by cmte_id, cycle, state
     ),
     inc as (
         update ofec_sched_a_aggregate_state ag
@@ -53,7 +64,7 @@ begin
         from patch
         where (ag.cmte_id, ag.cycle, ag.state) = (patch.cmte_id, patch.cycle, patch.state)
     )
-    insert into ofec_sched_a_aggregate_state (
+    insert into ofec_sched_a_aggregate_state (cmte_id, cycle, state, total, count) (
         select patch.* from patch
         left join ofec_sched_a_aggregate_state ag using (cmte_id, cycle, state)
         where ag.cmte_id is null
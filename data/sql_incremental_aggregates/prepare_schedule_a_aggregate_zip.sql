@@ -12,15 +12,20 @@ where rpt_yr >= :START_YEAR_ITEMIZED
 group by cmte_id, cycle, zip
 ;
 
+-- Add surrogate key for keyset pagination
+alter table ofec_sched_a_aggregate_zip add column idx serial primary key;
+
 -- Create indices on aggregate
 create index on ofec_sched_a_aggregate_zip (cmte_id);
 create index on ofec_sched_a_aggregate_zip (cycle);
 create index on ofec_sched_a_aggregate_zip (zip);
-create index on ofec_sched_a_aggregate_zip (total);
-create index on ofec_sched_a_aggregate_zip (count);
+create index on ofec_sched_a_aggregate_zip (total, idx);
+create index on ofec_sched_a_aggregate_zip (count, idx);
 
--- Create update function
-create or replace function ofec_sched_a_update_aggregate_zip() returns void as $$
+-- Create update function; updates from queued rows with keys in the batch
+-- [start_sk, stop_sk), or from all queued rows by default
+drop function if exists ofec_sched_a_update_aggregate_zip();
+create or replace function ofec_sched_a_update_aggregate_zip(start_sk bigint default null, stop_sk bigint default null) returns void as $$
 begin
     with new as (
         select
@@ -30,6 +35,7 @@ begin
             sum(contb_receipt_amt) as total,
             count(contb_receipt_amt) as count
         from ofec_sched_a_queue_new
+        where in_batch(sched_a_sk, start_sk, stop_sk)
         group by cmte_id, cycle, zip
     ),
     old as (
@@ -40,12 +46,17 @@ begin
             -1 * sum(contb_receipt_amt) as total,
             -1 * count(contb_receipt_amt) as count
         from ofec_sched_a_queue_old
+        where in_batch(sched_a_sk, start_sk, stop_sk)
         group by cmte_id, cycle, zip
     ),
     patch as (
-      select * from new
-      union all
-      select * from old
+        select cmte_id, cycle, zip, sum(total) as total, sum(count) as count
+        from (
+            select * from new
+            union all
+            select * from old
+        ) changes
+        group by cmte_id, cycle, zip
     ),
     inc as (
         update ofec_sched_a_aggregate_zip ag
@@ -55,7 +66,7 @@ begin
         from patch
         where (ag.cmte_id, ag.cycle, ag.zip) = (patch.cmte_id, patch.cycle, patch.zip)
     )
-    insert into ofec_sched_a_aggregate_zip (
+    insert into ofec_sched_a_aggregate_zip (cmte_id, cycle, zip, total, count) (
         select patch.* from patch
         left join ofec_sched_a_aggregate_zip ag using (cmte_id, cycle, zip)
         where ag.cmte_id is null
@@ -0,0 +1,77 @@
+drop table if exists ofec_sched_b_aggregate_date;
+create table ofec_sched_b_aggregate_date as
+select
+    cmte_id,
+    rpt_yr + rpt_yr % 2 as cycle,
+    date_trunc('month', disb_dt)::date as month,
+    sum(disb_amt) as total,
+    count(disb_amt) as count
+from sched_b
+where rpt_yr >= :START_YEAR_ITEMIZED
+group by cmte_id, cycle, month
+;
+
+-- Add surrogate key for keyset pagination
+alter table ofec_sched_b_aggregate_date add column idx serial primary key;
+
+create index on ofec_sched_b_aggregate_date (cycle);
+create index on ofec_sched_b_aggregate_date (month, idx);
+create index on ofec_sched_b_aggregate_date (total, idx);
+create index on ofec_sched_b_aggregate_date (count, idx);
+-- Support time series for a committee as a single index scan
+create index on ofec_sched_b_aggregate_date (cmte_id, cycle, month);
+
+-- Create update function; updates from queued rows with keys in the batch
+-- [start_sk, stop_sk), or from all queued rows by default
+create or replace function ofec_sched_b_update_aggregate_date(start_sk bigint default null, stop_sk bigint default null) returns void as $$
+begin
+    with new as (
+        select
+            cmte_id,
+            rpt_yr + rpt_yr % 2 as cycle,
+            date_trunc('month', disb_dt)::date as month,
+            sum(disb_amt) as total,
+            count(disb_amt) as count
+        from ofec_sched_b_queue_new
+        where in_batch(sched_b_sk, start_sk, stop_sk)
+        group by cmte_id, cycle, month
+    ),
+    old as (
+        select
+            cmte_id,
+            rpt_yr + rpt_yr % 2 as cycle,
+            date_trunc('month', disb_dt)::date as month,
+            -1 * sum(disb_amt) as total,
+            -1 * count(disb_amt) as count
+        from ofec_sched_b_queue_old
+        where in_batch(sched_b_sk, start_sk, stop_sk)
+        group by cmte_id, cycle, month
+    ),
+    patch as (
+        select cmte_id, cycle, month, sum(total) as total, sum(count) as count
+        from (
+            select * from new
+            union all
+            select * from old
+        ) changes
+        group by cmte_id, cycle, month
+    ),
+    inc as (
+        update ofec_sched_b_aggregate_date ag
+        set
+            total = ag.total + patch.total,
+            count = ag.count + patch.count
+        from patch
+        where (ag.cmte_id, ag.cycle) = (patch.cmte_id, patch.cycle)
+        and ag.month is not distinct from patch.month
+    )
+    insert into ofec_sched_b_aggregate_date (cmte_id, cycle, month, total, count) (
+        select patch.* from patch
+        left join ofec_sched_b_aggregate_date ag on
+            (ag.cmte_id, ag.cycle) = (patch.cmte_id, patch.cycle)
+            and ag.month is not distinct from patch.month
+        where ag.idx is null
+    )
+    ;
+end
+$$ language plpgsql;
@@ -0,0 +1,82 @@
+drop table if exists ofec_sched_b_aggregate_recipient_id;
+create table ofec_sched_b_aggregate_recipient_id as
+select
+    cmte_id,
+    rpt_yr + rpt_yr % 2 as cycle,
+    recipient_cmte_id as recipient_id,
+    sum(disb_amt) as total,
+    count(disb_amt) as count
+from sched_b
+where rpt_yr >= :START_YEAR_ITEMIZED
+and recipient_cmte_id is not null
+group by cmte_id, cycle, recipient_id
+;
+
+-- Add surrogate key for keyset pagination
+alter table ofec_sched_b_aggregate_recipient_id add column idx serial primary key;
+
+create index on ofec_sched_b_aggregate_recipient_id (cmte_id);
+create index on ofec_sched_b_aggregate_recipient_id (cycle);
+create index on ofec_sched_b_aggregate_recipient_id (recipient_id);
+create index on ofec_sched_b_aggregate_recipient_id (total, idx);
+create index on ofec_sched_b_aggregate_recipient_id (count, idx);
+-- Support top-N queries within a committee and cycle
+create index on ofec_sched_b_aggregate_recipient_id (cmte_id, cycle, total, idx);
+create index on ofec_sched_b_aggregate_recipient_id (cmte_id, cycle, count, idx);
+
+-- Create update function; updates from queued rows with keys in the batch
+-- [start_sk, stop_sk), or from all queued rows by default
+create or replace function ofec_sched_b_update_aggregate_recipient_id(start_sk bigint default null, stop_sk bigint default null) returns void as $$
+begin
+    with new as (
+        select
+            cmte_id,
+            rpt_yr + rpt_yr % 2 as cycle,
+            recipient_cmte_id as recipient_id,
+            sum(disb_amt) as total,
+            count(disb_amt) as count
+        from ofec_sched_b_queue_new
+        where in_batch(sched_b_sk, start_sk, stop_sk)
+        and recipient_cmte_id is not null
+        group by cmte_id, cycle, recipient_id
+    ),
+    old as (
+        select
+            cmte_id,
+            rpt_yr + rpt_yr % 2 as cycle,
+            recipient_cmte_id as recipient_id,
+            -1 * sum(disb_amt) as total,
+            -1 * count(disb_amt) as count
+        from ofec_sched_b_queue_old
+        where in_batch(sched_b_sk, start_sk, stop_sk)
+        and recipient_cmte_id is not null
+        group by cmte_id, cycle, recipient_id
+    ),
+    patch as (
+        select cmte_id, cycle, recipient_id, sum(total) as total, sum(count) as count
+        from (
+            select * from new
+            union all
+            select * from old
+        ) changes
+        group by cmte_id, cycle, recipient_id
+    ),
+    inc as (
+        update ofec_sched_b_aggregate_recipient_id ag
+        set
+            total = ag.total + patch.total,
+            count = ag.count + patch.count
+        from patch
+        where (ag.cmte_id, ag.cycle) = (patch.cmte_id, patch.cycle)
+        and ag.recipient_id is not distinct from patch.recipient_id
+    )
+    insert into ofec_sched_b_aggregate_recipient_id (cmte_id, cycle, recipient_id, total, count) (
+        select patch.* from patch
+        left join ofec_sched_b_aggregate_recipient_id ag on
+            (ag.cmte_id, ag.cycle) = (patch.cmte_id, patch.cycle)
+            and ag.recipient_id is not distinct from patch.recipient_id
+        where ag.idx is null
+    )
+    ;
+end
+$$ language plpgsql;
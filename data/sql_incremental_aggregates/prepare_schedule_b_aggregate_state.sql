@@ -0,0 +1,79 @@
+drop table if exists ofec_sched_b_aggregate_state;
+create table ofec_sched_b_aggregate_state as
+select
+    cmte_id,
+    rpt_yr + rpt_yr % 2 as cycle,
+    recipient_st as state,
+    sum(disb_amt) as total,
+    count(disb_amt) as count
+from sched_b
+where rpt_yr >= :START_YEAR_ITEMIZED
+group by cmte_id, cycle, state
+;
+
+-- Add surrogate key for keyset pagination
+alter table ofec_sched_b_aggregate_state add column idx serial primary key;
+
+create index on ofec_sched_b_aggregate_state (cmte_id);
+create index on ofec_sched_b_aggregate_state (cycle);
+create index on ofec_sched_b_aggregate_state (state);
+create index on ofec_sched_b_aggregate_state (total, idx);
+create index on ofec_sched_b_aggregate_state (count, idx);
+-- Support top-N queries within a committee and cycle
+create index on ofec_sched_b_aggregate_state (cmte_id, cycle, total, idx);
+create index on ofec_sched_b_aggregate_state (cmte_id, cycle, count, idx);
+
+-- Create update function; updates from queued rows with keys in the batch
+-- [start_sk, stop_sk), or from all queued rows by default
+create or replace function ofec_sched_b_update_aggregate_state(start_sk bigint default null, stop_sk bigint default null) returns void as $$
+begin
+    with new as (
+        select
+            cmte_id,
+            rpt_yr + rpt_yr % 2 as cycle,
+            recipient_st as state,
+            sum(disb_amt) as total,
+            count(disb_amt) as count
+        from ofec_sched_b_queue_new
+        where in_batch(sched_b_sk, start_sk, stop_sk)
+        group by cmte_id, cycle, state
+    ),
+    old as (
+        select
+            cmte_id,
+            rpt_yr + rpt_yr % 2 as cycle,
+            recipient_st as state,
+            -1 * sum(disb_amt) as total,
+            -1 * count(disb_amt) as count
+        from ofec_sched_b_queue_old
+        where in_batch(sched_b_sk, start_sk, stop_sk)
+        group by cmte_id, cycle, state
+    ),
+    patch as (
+        select cmte_id, cycle, state, sum(total) as total, sum(count) as count
+        from (
+            select * from new
+            union all
+            select * from old
+        ) changes
+        group by cmte_id, cycle, state
+    ),
+    inc as (
+        update ofec_sched_b_aggregate_state ag
+        set
+            total = ag.total + patch.total,
+            count = ag.count + patch.count
+        from patch
+        where (ag.cmte_id, ag.cycle) = (patch.cmte_id, patch.cycle)
+        and ag.state is not distinct from patch.state
+    )
+    insert into ofec_sched_b_aggregate_state (cmte_id, cycle, state, total, count) (
+        select patch.* from patch
+        left join ofec_sched_b_aggregate_state ag on
+            (ag.cmte_id, ag.cycle) = (patch.cmte_id, patch.cycle)
+            and ag.state is not distinct from patch.state
+        where ag.idx is null
+    )
+    ;
+end
+$$ language plpgsql;
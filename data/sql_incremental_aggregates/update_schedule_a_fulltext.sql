@@ -1,14 +1,25 @@
-create or replace function ofec_sched_a_update_fulltext() returns void as $$
+-- Update from queued rows with keys in the batch [start_sk, stop_sk), or from
+-- all queued rows by default
+drop function if exists ofec_sched_a_update_fulltext();
+create or replace function ofec_sched_a_update_fulltext(start_sk bigint default null, stop_sk bigint default null) returns void as $$
 begin
     delete from ofec_sched_a_fulltext
-    where sched_a_sk = any(select sched_a_sk from ofec_sched_a_queue_old)
+    where sched_a_sk = any(
+        select sched_a_sk from ofec_sched_a_queue_old
+        where in_batch(sched_a_sk, start_sk, stop_sk)
+    )
     ;
     insert into ofec_sched_a_fulltext (
         select
             sched_a_sk,
+            cmte_id,
+            rpt_yr,
+            contb_receipt_dt,
+            contb_receipt_amt,
             to_tsvector(contbr_nm) as contributor_name_text,
             to_tsvector(contbr_employer) as contributor_employer_text
         from ofec_sched_a_queue_new
+        where in_batch(sched_a_sk, start_sk, stop_sk)
     )
     ;
 end
@@ -1,13 +1,20 @@
-create or replace function ofec_sched_b_update_fulltext() returns void as $$
+-- Update from queued rows with keys in the batch [start_sk, stop_sk), or from
+-- all queued rows by default
+drop function if exists ofec_sched_b_update_fulltext();
+create or replace function ofec_sched_b_update_fulltext(start_sk bigint default null, stop_sk bigint default null) returns void as $$
 begin
     delete from ofec_sched_b_fulltext
-    where sched_b_sk = any(select sched_b_sk from ofec_sched_b_queue_old)
+    where sched_b_sk = any(
+        select sched_b_sk from ofec_sched_b_queue_old
+        where in_batch(sched_b_sk, start_sk, stop_sk)
+    )
     ;
     insert into ofec_sched_b_fulltext (
         select
             sched_b_sk,
             to_tsvector(recipient_nm) as recipient_name_text
         from ofec_sched_b_queue_new
+        where in_batch(sched_b_sk, start_sk, stop_sk)
     )
     ;
 end
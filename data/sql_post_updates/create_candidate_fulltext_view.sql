@@ -0,0 +1,41 @@
+-- Candidate names for fulltext search, weighted by the total receipts of
+-- linked committees so that ranked searches can rank only the most heavily
+-- weighted matches; depends on the temporary views created in sql_updates
+drop table if exists dimcand_fulltext;
+drop materialized view if exists ofec_candidate_fulltext_mv_tmp;
+create materialized view ofec_candidate_fulltext_mv_tmp as
+with totals as (
+    select committee_id, receipts from ofec_totals_presidential_mv_tmp
+    union all
+    select committee_id, receipts from ofec_totals_house_senate_mv_tmp
+),
+links as (
+    select distinct candidate_id, committee_id
+    from ofec_name_linkage_mv_tmp
+),
+receipts as (
+    select links.candidate_id, sum(totals.receipts) as receipts
+    from links
+    join totals on links.committee_id = totals.committee_id
+    group by links.candidate_id
+)
+select distinct on (cd.candidate_id)
+    row_number() over () as idx,
+    cd.candidate_id as id,
+    cd.name,
+    cd.office as office_sought,
+    case
+        when cd.name is not null then
+            setweight(to_tsvector(cd.name), 'A') ||
+            setweight(to_tsvector(cd.candidate_id), 'B')
+        else null::tsvector
+    end
+as fulltxt,
+    receipts.receipts
+from ofec_candidate_detail_mv_tmp cd
+left join receipts on cd.candidate_id = receipts.candidate_id
+;
+
+create unique index on ofec_candidate_fulltext_mv_tmp(idx);
+create index on ofec_candidate_fulltext_mv_tmp using gin(fulltxt);
+create index on ofec_candidate_fulltext_mv_tmp(receipts);
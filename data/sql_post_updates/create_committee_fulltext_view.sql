@@ -0,0 +1,41 @@
+-- Committee names for fulltext search, weighted by total receipts so that
+-- ranked searches can rank only the most heavily weighted matches; depends
+-- on the temporary views created in sql_updates
+drop table if exists dimcmte_fulltext;
+drop materialized view if exists ofec_committee_fulltext_mv_tmp;
+create materialized view ofec_committee_fulltext_mv_tmp as
+with totals as (
+    select committee_id, receipts from ofec_totals_presidential_mv_tmp
+    union all
+    select committee_id, receipts from ofec_totals_house_senate_mv_tmp
+    union all
+    select committee_id, receipts from ofec_totals_pacs_parties_mv_tmp
+    union all
+    select committee_id, total_independent_contributions as receipts from ofec_totals_ie_only_mv_tmp
+),
+receipts as (
+    select committee_id, sum(receipts) as receipts
+    from totals
+    group by committee_id
+)
+select distinct on (cd.committee_id)
+    row_number() over () as idx,
+    cd.committee_id as id,
+    cd.name,
+    case
+        when cd.name is not null then
+            setweight(to_tsvector(cd.name), 'A') ||
+            setweight(to_tsvector(coalesce(pac."PACRONYM", '')), 'A') ||
+            setweight(to_tsvector(cd.committee_id), 'B')
+        else null::tsvector
+    end
+as fulltxt,
+    receipts.receipts
+from ofec_committee_detail_mv_tmp cd
+left join pacronyms pac on cd.committee_id = pac."ID NUMBER"
+left join receipts on cd.committee_id = receipts.committee_id
+;
+
+create unique index on ofec_committee_fulltext_mv_tmp(idx);
+create index on ofec_committee_fulltext_mv_tmp using gin(fulltxt);
+create index on ofec_committee_fulltext_mv_tmp(receipts);
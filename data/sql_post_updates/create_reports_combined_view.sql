@@ -0,0 +1,105 @@
+-- Reports of committees of all types, restricted to columns common to all
+-- types; depends on the temporary views created in sql_updates
+drop materialized view if exists ofec_reports_combined_mv_tmp;
+create materialized view ofec_reports_combined_mv_tmp as
+with reports as (
+    select
+        committee_id,
+        cycle,
+        report_year,
+        report_type,
+        report_type_full,
+        coverage_start_date,
+        coverage_end_date,
+        beginning_image_number,
+        end_image_number,
+        expire_date,
+        total_receipts_period,
+        total_disbursements_period,
+        total_contributions_period,
+        cash_on_hand_beginning_period,
+        cash_on_hand_end_period,
+        debts_owed_by_committee,
+        debts_owed_to_committee
+    from ofec_reports_presidential_mv_tmp
+    union all
+    select
+        committee_id,
+        cycle,
+        report_year,
+        report_type,
+        report_type_full,
+        coverage_start_date,
+        coverage_end_date,
+        beginning_image_number,
+        end_image_number,
+        expire_date,
+        total_receipts_period,
+        total_disbursements_period,
+        total_contributions_period,
+        cash_on_hand_beginning_period,
+        cash_on_hand_end_period,
+        debts_owed_by_committee,
+        debts_owed_to_committee
+    from ofec_reports_house_senate_mv_tmp
+    union all
+    select
+        committee_id,
+        cycle,
+        report_year,
+        report_type,
+        report_type_full,
+        coverage_start_date,
+        coverage_end_date,
+        beginning_image_number,
+        end_image_number,
+        expire_date,
+        total_receipts_period,
+        total_disbursements_period,
+        total_contributions_period,
+        cash_on_hand_beginning_period,
+        cash_on_hand_end_period,
+        debts_owed_by_committee,
+        debts_owed_to_committee
+    from ofec_reports_pacs_parties_mv_tmp
+    union all
+    -- Form 5 filers only report independent contributions and expenditures
+    select
+        committee_id,
+        cycle,
+        report_year,
+        report_type,
+        report_type_full,
+        coverage_start_date,
+        coverage_end_date,
+        beginning_image_number,
+        end_image_number,
+        expire_date,
+        independent_contributions_period as total_receipts_period,
+        independent_expenditures_period as total_disbursements_period,
+        independent_contributions_period as total_contributions_period,
+        null::numeric as cash_on_hand_beginning_period,
+        null::numeric as cash_on_hand_end_period,
+        null::numeric as debts_owed_by_committee,
+        null::numeric as debts_owed_to_committee
+    from ofec_reports_ie_only_mv_tmp
+)
+select
+    row_number() over () as idx,
+    reports.*,
+    history.name as committee_name,
+    history.committee_type,
+    history.committee_type_full,
+    history.designation as committee_designation
+from reports
+left join ofec_committee_history_mv_tmp history using (committee_id, cycle)
+;
+
+create unique index on ofec_reports_combined_mv_tmp(idx);
+
+create index on ofec_reports_combined_mv_tmp(cycle, committee_type, committee_id);
+create index on ofec_reports_combined_mv_tmp(committee_id, cycle);
+create index on ofec_reports_combined_mv_tmp(report_type);
+create index on ofec_reports_combined_mv_tmp(report_year);
+create index on ofec_reports_combined_mv_tmp(coverage_end_date);
+create index on ofec_reports_combined_mv_tmp(total_receipts_period);
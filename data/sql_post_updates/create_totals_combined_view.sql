@@ -0,0 +1,103 @@
+-- Totals for committees of all types, restricted to columns common to all
+-- types; depends on the temporary views created in sql_updates
+drop materialized view if exists ofec_totals_combined_mv_tmp;
+create materialized view ofec_totals_combined_mv_tmp as
+with totals as (
+    select
+        committee_id,
+        cycle,
+        coverage_start_date,
+        coverage_end_date,
+        receipts,
+        disbursements,
+        contributions,
+        contribution_refunds,
+        individual_contributions,
+        individual_itemized_contributions,
+        individual_unitemized_contributions,
+        operating_expenditures,
+        net_contributions,
+        net_operating_expenditures,
+        other_political_committee_contributions,
+        political_party_committee_contributions,
+        null::numeric as independent_expenditures
+    from ofec_totals_presidential_mv_tmp
+    union all
+    select
+        committee_id,
+        cycle,
+        coverage_start_date,
+        coverage_end_date,
+        receipts,
+        disbursements,
+        contributions,
+        contribution_refunds,
+        individual_contributions,
+        individual_itemized_contributions,
+        individual_unitemized_contributions,
+        operating_expenditures,
+        net_contributions,
+        net_operating_expenditures,
+        other_political_committee_contributions,
+        political_party_committee_contributions,
+        null::numeric as independent_expenditures
+    from ofec_totals_house_senate_mv_tmp
+    union all
+    select
+        committee_id,
+        cycle,
+        coverage_start_date,
+        coverage_end_date,
+        receipts,
+        disbursements,
+        contributions,
+        contribution_refunds,
+        individual_contributions,
+        individual_itemized_contributions,
+        individual_unitemized_contributions,
+        operating_expenditures,
+        net_contributions,
+        net_operating_expenditures,
+        other_political_committee_contributions,
+        political_party_committee_contributions,
+        independent_expenditures
+    from ofec_totals_pacs_parties_mv_tmp
+    union all
+    -- Form 5 filers only report independent contributions and expenditures
+    select
+        committee_id,
+        cycle,
+        coverage_start_date,
+        coverage_end_date,
+        total_independent_contributions as receipts,
+        total_independent_expenditures as disbursements,
+        total_independent_contributions as contributions,
+        null::numeric as contribution_refunds,
+        null::numeric as individual_contributions,
+        null::numeric as individual_itemized_contributions,
+        null::numeric as individual_unitemized_contributions,
+        null::numeric as operating_expenditures,
+        null::numeric as net_contributions,
+        null::numeric as net_operating_expenditures,
+        null::numeric as other_political_committee_contributions,
+        null::numeric as political_party_committee_contributions,
+        total_independent_expenditures as independent_expenditures
+    from ofec_totals_ie_only_mv_tmp
+)
+select
+    row_number() over () as idx,
+    totals.*,
+    history.name as committee_name,
+    history.committee_type,
+    history.committee_type_full,
+    history.designation as committee_designation
+from totals
+left join ofec_committee_history_mv_tmp history using (committee_id, cycle)
+;
+
+create unique index on ofec_totals_combined_mv_tmp(idx);
+
+create index on ofec_totals_combined_mv_tmp(cycle, committee_type, committee_id);
+create index on ofec_totals_combined_mv_tmp(committee_id, cycle);
+create index on ofec_totals_combined_mv_tmp(receipts);
+create index on ofec_totals_combined_mv_tmp(disbursements);
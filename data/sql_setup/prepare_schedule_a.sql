@@ -16,11 +16,16 @@ create index on sched_a (cmte_id, sched_a_sk) where rpt_yr >= :START_YEAR_ITEMIZ
 create index on sched_a (cmte_id, contb_receipt_dt, sched_a_sk) where rpt_yr >= :START_YEAR_ITEMIZED;
 create index on sched_a (cmte_id, contb_receipt_amt, sched_a_sk) where rpt_yr >= :START_YEAR_ITEMIZED;
 
--- Create Schedule A fulltext table
+-- Create Schedule A fulltext table; includes sort and filter columns so that
+-- searches can be filtered, sorted, and paginated without joining to `sched_a`
 drop table if exists ofec_sched_a_fulltext;
 create table ofec_sched_a_fulltext as
 select
     sched_a_sk,
+    cmte_id,
+    rpt_yr,
+    contb_receipt_dt,
+    contb_receipt_amt,
     to_tsvector(contbr_nm) as contributor_name_text,
     to_tsvector(contbr_employer) as contributor_employer_text
 from sched_a
@@ -32,12 +37,23 @@ alter table ofec_sched_a_fulltext add primary key (sched_a_sk);
 create index on ofec_sched_a_fulltext using gin (contributor_name_text);
 create index on ofec_sched_a_fulltext using gin (contributor_employer_text);
 
+-- Create composite indices on sortable columns, alone and within a committee
+create index on ofec_sched_a_fulltext (contb_receipt_dt, sched_a_sk);
+create index on ofec_sched_a_fulltext (contb_receipt_amt, sched_a_sk);
+create index on ofec_sched_a_fulltext (cmte_id, sched_a_sk);
+create index on ofec_sched_a_fulltext (cmte_id, contb_receipt_dt, sched_a_sk);
+create index on ofec_sched_a_fulltext (cmte_id, contb_receipt_amt, sched_a_sk);
+
 -- Create queue tables to hold changes to Schedule A
 drop table if exists ofec_sched_a_queue_new;
 drop table if exists ofec_sched_a_queue_old;
 create table ofec_sched_a_queue_new as select * from sched_a limit 0;
 create table ofec_sched_a_queue_old as select * from sched_a limit 0;
 
+-- Index queue keys so that queued changes can be processed in batches
+create index on ofec_sched_a_queue_new (sched_a_sk);
+create index on ofec_sched_a_queue_old (sched_a_sk);
+
 -- Create trigger to maintain Schedule A queues
 create or replace function ofec_sched_a_update_queues() returns trigger as $$
 begin
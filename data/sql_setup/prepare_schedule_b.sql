@@ -36,6 +36,10 @@ drop table if exists ofec_sched_b_queue_old;
 create table ofec_sched_b_queue_new as select * from sched_b limit 0;
 create table ofec_sched_b_queue_old as select * from sched_b limit 0;
 
+-- Index queue keys so that queued changes can be processed in batches
+create index on ofec_sched_b_queue_new (sched_b_sk);
+create index on ofec_sched_b_queue_old (sched_b_sk);
+
 -- Create trigger to maintain Schedule B queues
 create or replace function ofec_sched_b_update_queues() returns trigger as $$
 begin
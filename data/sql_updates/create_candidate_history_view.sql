@@ -104,7 +104,10 @@ order by candidate_id, two_year_period desc
 
 create unique index on ofec_candidate_detail_mv_tmp(idx);
 
-create index on ofec_candidate_detail_mv_tmp(name);
+create index on ofec_candidate_detail_mv_tmp(name, idx);
+-- Serve substring and similarity searches on names
+-- Requires: pg_trgm
+create index on ofec_candidate_detail_mv_tmp using gin (name gin_trgm_ops);
 create index on ofec_candidate_detail_mv_tmp(party);
 create index on ofec_candidate_detail_mv_tmp(state);
 create index on ofec_candidate_detail_mv_tmp(office);
@@ -118,24 +121,3 @@ create index on ofec_candidate_detail_mv_tmp(incumbent_challenge);
 
 create index on ofec_candidate_detail_mv_tmp using gin (cycles);
 create index on ofec_candidate_detail_mv_tmp using gin (election_years);
-
-drop table if exists dimcand_fulltext;
-drop materialized view if exists ofec_candidate_fulltext_mv_tmp;
-create materialized view ofec_candidate_fulltext_mv_tmp as
-select distinct on (candidate_id)
-    row_number() over () as idx,
-    candidate_id as id,
-    name,
-    office as office_sought,
-    case
-        when name is not null then
-            setweight(to_tsvector(name), 'A') ||
-            setweight(to_tsvector(candidate_id), 'B')
-        else null::tsvector
-    end
-as fulltxt
-from ofec_candidate_detail_mv_tmp
-;
-
-create unique index on ofec_candidate_fulltext_mv_tmp(idx);
-create index on ofec_candidate_fulltext_mv_tmp using gin(fulltxt);
@@ -134,7 +134,10 @@ order by committee_id, cycle desc
 
 create unique index on ofec_committee_detail_mv_tmp(idx);
 
-create index on ofec_committee_detail_mv_tmp(name);
+create index on ofec_committee_detail_mv_tmp(name, idx);
+-- Serve substring and similarity searches on names
+-- Requires: pg_trgm
+create index on ofec_committee_detail_mv_tmp using gin (name gin_trgm_ops);
 create index on ofec_committee_detail_mv_tmp(party);
 create index on ofec_committee_detail_mv_tmp(state);
 create index on ofec_committee_detail_mv_tmp(party_full);
@@ -153,25 +156,3 @@ create index on ofec_committee_detail_mv_tmp(organization_type_full);
 
 create index on ofec_committee_detail_mv_tmp using gin (cycles);
 create index on ofec_committee_detail_mv_tmp using gin (candidate_ids);
-
-drop table if exists dimcmte_fulltext;
-drop materialized view if exists ofec_committee_fulltext_mv_tmp;
-create materialized view ofec_committee_fulltext_mv_tmp as
-select distinct on (committee_id)
-    row_number() over () as idx,
-    committee_id as id,
-    name,
-    case
-        when name is not null then
-            setweight(to_tsvector(name), 'A') ||
-            setweight(to_tsvector(coalesce(pac."PACRONYM", '')), 'A') ||
-            setweight(to_tsvector(committee_id), 'B')
-        else null::tsvector
-    end
-as fulltxt
-from ofec_committee_detail_mv_tmp cd
-left join pacronyms pac on cd.committee_id = pac."ID NUMBER"
-;
-
-create unique index on ofec_committee_fulltext_mv_tmp(idx);
-create index on ofec_committee_fulltext_mv_tmp using gin(fulltxt);
@@ -51,7 +51,7 @@ where
 create index on public.ofec_filings_vw_tmp(committee_id);
 create index on public.ofec_filings_vw_tmp(candidate_id);
 create index on public.ofec_filings_vw_tmp(beginning_image_number);
-create index on public.ofec_filings_vw_tmp(receipt_date);
+create index on public.ofec_filings_vw_tmp(receipt_date, sub_id);
 create index on public.ofec_filings_vw_tmp(form_type);
 create index on public.ofec_filings_vw_tmp(primary_general_indicator);
 create index on public.ofec_filings_vw_tmp(amendment_indicator);
@@ -1,10 +1,10 @@
 #!/usr/bin/env python
 
 import os
+import sys
 import glob
 import subprocess
 import urllib.parse
-import multiprocessing
 
 from flask import url_for
 from flask.ext.script import Server
@@ -13,6 +13,10 @@ from sqlalchemy import text as sqla_text
 
 from webservices.rest import app, db
 from webservices.config import SQL_CONFIG
+from webservices.common import cache
+from webservices.common import queues
+from webservices.common import matviews
+from webservices.common import sqlfiles
 from webservices.common.util import get_full_path
 
 
@@ -25,29 +29,29 @@ manager.add_command('runserver', Server(use_debugger=True, use_reloader=True))
 
 
 def execute_sql_file(path):
-    # This helper is typically used within a multiprocessing pool; create a new database
+    # This helper is typically used within a process pool; create a new database
     # engine for each job.
     db.engine.dispose()
     print(('Running {}'.format(path)))
-    with open(path) as fp:
-        cmd = '\n'.join([
-            line for line in fp.readlines()
-            if not line.startswith('--')
-        ])
-        db.engine.execute(sqla_text(cmd), **SQL_CONFIG)
+    cmd = sqlfiles.read_sql(path)
+    db.engine.execute(sqla_text(cmd), **SQL_CONFIG)
+
+
+def execute_sql_folders(paths, processes):
+    """Run the SQL files in the folders `paths`, each after the files
+    creating the relations and functions it uses.
+    """
+    files = []
+    for path in paths:
+        sql_dir = get_full_path(path)
+        if not sql_dir.endswith('/'):
+            sql_dir += '/'
+        files.extend(glob.glob(sql_dir + '*.sql'))
+    sqlfiles.run(files, execute_sql_file, processes=processes)
 
 
 def execute_sql_folder(path, processes):
-    sql_dir = get_full_path(path)
-    if not sql_dir.endswith('/'):
-        sql_dir += '/'
-    paths = glob.glob(sql_dir + '*.sql')
-    if processes > 1:
-        pool = multiprocessing.Pool(processes=processes)
-        pool.map(execute_sql_file, sorted(paths))
-    else:
-        for path in paths:
-            execute_sql_file(path)
+    execute_sql_folders([path], processes)
 
 
 @manager.command
@@ -74,9 +78,14 @@ def update_schemas(processes=2):
     print("Starting DB refresh...")
     processes = int(processes)
     load_pacronyms()
-    execute_sql_folder('data/functions/', processes=processes)
-    execute_sql_folder('data/sql_updates/', processes=processes)
+    # Views in `sql_post_updates` combine the views in `sql_updates`; files
+    # run in dependency order, so all three folders can run at once
+    execute_sql_folders(
+        ['data/functions/', 'data/sql_updates/', 'data/sql_post_updates/'],
+        processes=processes,
+    )
     execute_sql_file('data/rename_temporary_views.sql')
+    cache.bump_generation()
     print("Finished DB refresh.")
 
 
@@ -84,6 +93,7 @@ def update_schemas(processes=2):
 def update_schedule_a():
     print('Updating Schedule A tables...')
     execute_sql_file('data/sql_setup/prepare_schedule_a.sql')
+    cache.bump_generation(scope=cache.ITEMIZED)
     print('Finished Schedule A update.')
 
 
@@ -91,16 +101,34 @@ def update_schedule_a():
 def update_schedule_b():
     print('Updating Schedule B tables...')
     execute_sql_file('data/sql_setup/prepare_schedule_b.sql')
+    cache.bump_generation(scope=cache.ITEMIZED)
     print('Finished Schedule B update.')
 
 
 @manager.command
-def update_aggregates(processes=2):
+def update_aggregates():
+    """Rebuild incremental aggregates, and clear the queued changes that they
+    already include; see `queues.rebuild`.
+    """
     print('Updating incremental aggregates...')
-    execute_sql_folder('data/sql_incremental_aggregates/', processes=processes)
+    queues.rebuild(glob.glob(get_full_path('data/sql_incremental_aggregates/') + '*.sql'), SQL_CONFIG)
+    cache.bump_generation(scope=cache.ITEMIZED)
     print('Finished updating incremental aggregates.')
 
 
+@manager.command
+def consume_queues(batch_size=queues.BATCH_SIZE):
+    """Apply queued changes to Schedules A and B to aggregates and fulltext
+    tables in batches.
+    """
+    print('Processing queued changes...')
+    count = queues.consume_all(batch_size=int(batch_size))
+    if count:
+        # Only itemized data and their aggregates change
+        cache.bump_generation(scope=cache.ITEMIZED)
+    print('Processed {0} queued changes.'.format(count))
+
+
 @manager.command
 def list_routes():
     output = []
@@ -122,10 +150,24 @@ def list_routes():
 
 
 @manager.command
-def refresh_materialized():
-    """Refresh materialized views."""
+def refresh_materialized(workers=matviews.WORKERS, retries=matviews.RETRIES):
+    """Refresh materialized views in parallel, each after the views it
+    depends on.
+    """
     print('Refreshing materialized views...')
-    execute_sql_file('data/refresh_materialized_views.sql')
+    results = matviews.refresh_all(workers=int(workers), retries=int(retries))
+    for result in results:
+        print('{0:40s} {1:8.1f}s {2}'.format(
+            result.view,
+            result.seconds,
+            'failed: {0}'.format(result.error) if result.error else 'ok',
+        ))
+    failed = [result.view for result in results if result.error]
+    if failed:
+        # Keep serving cached responses until every view is current
+        print('Failed to refresh {0} materialized views.'.format(len(failed)))
+        sys.exit(1)
+    cache.bump_generation()
     print('Finished refreshing materialized views.')
 
 
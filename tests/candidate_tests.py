@@ -14,6 +14,7 @@ from webservices.rest import db
 from webservices.rest import api
 from webservices.resources.candidates import CandidateList
 from webservices.resources.candidates import CandidateView
+from webservices.resources.candidates import CandidateBatchView
 from webservices.resources.candidates import CandidateSearch
 from webservices.resources.candidates import CandidateHistoryView
 
@@ -89,6 +90,12 @@ class CandidateFormatTest(ApiBaseTest):
         self.assertResultsEqual(result['incumbent_challenge'], candidate.incumbent_challenge)
         self.assertResultsEqual(result['candidate_status_full'], candidate.candidate_status_full)
 
+    def test_candidate_batch(self):
+        candidates = [factories.CandidateDetailFactory() for _ in range(3)]
+        ids = [each.candidate_id for each in candidates[:2]]
+        results = self._results(api.url_for(CandidateBatchView, candidate_id=ids))
+        self.assertEqual(set(each['candidate_id'] for each in results), set(ids))
+
     def test_candidates_search(self):
         principal_committee = factories.CommitteeFactory(designation='P')
         joint_committee = factories.CommitteeFactory(designation='J')
@@ -113,6 +120,25 @@ class CandidateFormatTest(ApiBaseTest):
             principal_committee.committee_id,
         )
 
+    def test_candidates_search_large_page(self):
+        committee = factories.CommitteeFactory(designation='P')
+        candidates = [factories.CandidateFactory() for _ in range(3)]
+        db.session.flush()
+        [
+            factories.CandidateCommitteeLinkFactory(
+                candidate_key=candidate.candidate_key,
+                committee_key=committee.committee_key,
+            )
+            for candidate in candidates
+        ]
+        results = self._results(api.url_for(CandidateSearch, per_page=100))
+        self.assertEqual(len(results), 3)
+        for result in results:
+            self.assertEqual(
+                [each['committee_id'] for each in result['principal_committees']],
+                [committee.committee_id],
+            )
+
     def test_fields(self):
         candidate = factories.CandidateDetailFactory()
         response = self._results(
@@ -149,6 +175,35 @@ class CandidateFormatTest(ApiBaseTest):
             {danielle.candidate_id, dana.candidate_id},
         )
 
+    def test_name_similarity(self):
+        bartlet = factories.CandidateFactory(name='Bartlet')
+        factories.CandidateFactory(name='Vinick')
+        rest.db.session.flush()
+        results = self._results(api.url_for(CandidateList, name='bartlett'))
+        self.assertEqual(len(results), 0)
+        results = self._results(api.url_for(CandidateList, name='bartlett', name_match='similarity'))
+        self.assertEqual([each['candidate_id'] for each in results], [bartlet.candidate_id])
+
+    def test_name_similarity_pagination(self):
+        candidates = [
+            factories.CandidateFactory(name=name)
+            for name in ['Bartlet', 'Bartlett', 'Bartlet Jr', 'Bartley', 'Bartlet Sr']
+        ]
+        rest.db.session.flush()
+        params = {'name': 'bartlet', 'name_match': 'similarity', 'per_page': 2}
+        page1 = self._response(api.url_for(CandidateList, **params))
+        self.assertIsNone(page1['pagination']['next_cursor'])
+        self.assertIsNone(page1['pagination']['last_indexes'])
+        results = page1['results']
+        for page in range(2, page1['pagination']['pages'] + 1):
+            results.extend(self._results(api.url_for(CandidateList, page=page, **params)))
+        ids = [each['candidate_id'] for each in results]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(results[0]['name'], 'Bartlet')
+        self.assertLessEqual(set(ids), set(each.candidate_id for each in candidates))
+        response = self.app.get(api.url_for(CandidateList, last_index=1, **params))
+        self.assertEqual(response.status_code, 422)
+
     def test_cand_filters(self):
         [
             factories.CandidateFactory(office='H'),
@@ -1,5 +1,6 @@
 import urllib
 import datetime
+from unittest import mock
 
 import sqlalchemy as sa
 from marshmallow.utils import isoformat
@@ -7,11 +8,13 @@ from marshmallow.utils import isoformat
 from tests import factories
 from tests.common import ApiBaseTest
 
+from webservices import args
 from webservices import utils
 from webservices.rest import db
 from webservices.rest import api
 from webservices.resources.committees import CommitteeList
 from webservices.resources.committees import CommitteeView
+from webservices.resources.committees import CommitteeBatchView
 from webservices.resources.candidates import CandidateView
 
 
@@ -46,6 +49,24 @@ class CommitteeFormatTest(ApiBaseTest):
         self.assertEqual(results[0]['committee_id'], committee.committee_id)
         self.assertNotEqual(results[0]['committee_id'], decoy_committee.committee_id)
 
+    def test_fulltext_search_ranks_heaviest_matches(self):
+        committees = [
+            factories.CommitteeFactory(name='Americans for {0}'.format(name))
+            for name in ['Bartlet', 'Vinick']
+        ]
+        for committee, receipts in zip(committees, [100, 200]):
+            factories.CommitteeSearchFactory(
+                id=committee.committee_id,
+                fulltxt=sa.func.to_tsvector(committee.name),
+                receipts=receipts,
+            )
+        with mock.patch.object(utils, 'RANK_LIMIT', 1):
+            results = self._results(api.url_for(CommitteeList, q='america'))
+        self.assertEqual(
+            [each['committee_id'] for each in results],
+            [committees[1].committee_id],
+        )
+
     def test_filter_by_candidate_id(self):
         candidate_id = 'id0'
         candidate_committees = [factories.CommitteeFactory(candidate_ids=[candidate_id]) for _ in range(2)]
@@ -91,6 +112,17 @@ class CommitteeFormatTest(ApiBaseTest):
         self.assertEqual(result['street_1'], committee.street_1)
         self.assertEqual(result['zip'], committee.zip)
 
+    def test_committee_batch(self):
+        committees = [factories.CommitteeDetailFactory() for _ in range(3)]
+        ids = [each.committee_id for each in committees[:2]]
+        results = self._results(api.url_for(CommitteeBatchView, committee_id=ids))
+        self.assertEqual(set(each['committee_id'] for each in results), set(ids))
+
+    def test_committee_batch_too_large(self):
+        ids = ['C{0:08d}'.format(idx) for idx in range(args.MAX_BATCH_SIZE + 1)]
+        response = self.app.get(api.url_for(CommitteeBatchView, committee_id=ids))
+        self.assertEqual(response.status_code, 422)
+
     def test_committee_search_double_committee_id(self):
         committees = [factories.CommitteeFactory() for _ in range(2)]
         ids = [each.committee_id for each in committees]
@@ -6,6 +6,7 @@ import subprocess
 
 from webservices import rest
 from webservices import __API_VERSION__
+from webservices.common import cache
 
 
 TEST_CONN = os.getenv('SQLA_TEST_CONN', 'postgresql:///cfdm-unit-test')
@@ -23,6 +24,7 @@ class BaseTestCase(unittest.TestCase):
         rest.app.config['TESTING'] = True
         rest.app.config['SQLALCHEMY_DATABASE_URI'] = TEST_CONN
         rest.app.config['PRESERVE_CONTEXT_ON_EXCEPTION'] = False
+        rest.app.config['RESPONSE_CACHE'] = False
         cls.app = rest.app.test_client()
         cls.app_context = rest.app.app_context()
         cls.app_context.push()
@@ -48,6 +50,7 @@ class ApiBaseTest(BaseTestCase):
     @classmethod
     def setUpClass(cls):
         super(ApiBaseTest, cls).setUpClass()
+        rest.db.engine.execute('create extension if not exists pg_trgm;')
         rest.db.create_all()
 
     def setUp(self):
@@ -56,6 +59,8 @@ class ApiBaseTest(BaseTestCase):
         self.maxDiff = None
         self.request_context = rest.app.test_request_context()
         self.request_context.push()
+        # Discard counts and responses cached by earlier tests
+        cache.bump_generation()
 
     def tearDown(self):
         super(ApiBaseTest, self).tearDown()
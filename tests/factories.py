@@ -119,6 +119,18 @@ class ReportsIEOnlyFactory(BaseFactory):
         model = models.CommitteeReportsIEOnly
 
 
+class TotalsCombinedFactory(BaseFactory):
+    class Meta:
+        model = models.CommitteeTotalsCombined
+    committee_id = factory.Sequence(lambda n: 'id{0}'.format(n))
+
+
+class ReportsCombinedFactory(BaseFactory):
+    class Meta:
+        model = models.CommitteeReportsCombined
+    committee_id = factory.Sequence(lambda n: 'id{0}'.format(n))
+
+
 class ScheduleAFactory(BaseFactory):
     class Meta:
         model = models.ScheduleA
@@ -132,6 +144,7 @@ class ScheduleASearchFactory(BaseFactory):
     class Meta:
         model = models.ScheduleASearch
     sched_a_sk = factory.Sequence(lambda n: n)
+    report_year = 2016
 
 
 class ScheduleBFactory(BaseFactory):
@@ -150,3 +163,55 @@ class ScheduleBSearchFactory(BaseFactory):
 class FilingsFactory(BaseFactory):
     class Meta:
         model = models.Filings
+
+
+class BaseAggregateFactory(BaseFactory):
+    committee_id = factory.Sequence(lambda n: 'C{0:08d}'.format(n))
+    cycle = 2016
+    total = 100
+    count = 1
+
+
+class ScheduleAByEmployerFactory(BaseAggregateFactory):
+    class Meta:
+        model = models.ScheduleAByEmployer
+
+
+class ScheduleAByOccupationFactory(BaseAggregateFactory):
+    class Meta:
+        model = models.ScheduleAByOccupation
+
+
+class ScheduleAByContributorFactory(BaseAggregateFactory):
+    class Meta:
+        model = models.ScheduleAByContributor
+
+
+class ScheduleAByDateFactory(BaseAggregateFactory):
+    class Meta:
+        model = models.ScheduleAByDate
+
+
+class ScheduleBByRecipientFactory(BaseAggregateFactory):
+    class Meta:
+        model = models.ScheduleBByRecipient
+
+
+class ScheduleBByRecipientIdFactory(BaseAggregateFactory):
+    class Meta:
+        model = models.ScheduleBByRecipientId
+
+
+class ScheduleBByStateFactory(BaseAggregateFactory):
+    class Meta:
+        model = models.ScheduleBByState
+
+
+class ScheduleBByPurposeFactory(BaseAggregateFactory):
+    class Meta:
+        model = models.ScheduleBByPurpose
+
+
+class ScheduleBByDateFactory(BaseAggregateFactory):
+    class Meta:
+        model = models.ScheduleBByDate
@@ -27,6 +27,20 @@ class TestFilings(ApiBaseTest):
         results = self._results(api.url_for(FilingsList))
         self.assertEqual(len(results), 2)
 
+    def test_seek_pagination(self):
+        filings = [
+            factories.FilingsFactory(receipt_date=datetime.datetime(2012, 1, 1))
+            for _ in range(5)
+        ]
+        response = self._response(api.url_for(FilingsList, per_page=3))
+        last_indexes = response['pagination']['last_indexes']
+        page_two = self._results(api.url_for(FilingsList, per_page=3, **last_indexes))
+        self.assertEqual(len(page_two), 2)
+        self.assertEqual(
+            set(each['sub_id'] for each in response['results'] + page_two),
+            set(each.sub_id for each in filings),
+        )
+
     def test_filter_date(self):
         [
             factories.FilingsFactory(receipt_date=datetime.datetime(2012, 1, 1)),
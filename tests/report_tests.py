@@ -10,6 +10,7 @@ from webservices import schemas
 from webservices.rest import db
 from webservices.rest import api
 from webservices.resources.reports import ReportsView
+from webservices.resources.reports import ReportsCombinedView
 
 
 class TestReports(ApiBaseTest):
@@ -33,6 +34,15 @@ class TestReports(ApiBaseTest):
         results = self._results(api.url_for(ReportsView, committee_id=committee_id))
         self._check_committee_ids(results, [committee_report], [other_report])
 
+    def test_reports_fields(self):
+        committee_id = 'C8675309'
+        factories.CommitteeHistoryFactory(committee_id=committee_id, committee_type='P')
+        factories.ReportsPresidentialFactory(committee_id=committee_id, cycle=2016)
+        results = self._results(
+            api.url_for(ReportsView, committee_id=committee_id, fields=['cycle', 'committee_id'])
+        )
+        self.assertEqual(results, [{'cycle': 2016, 'committee_id': committee_id}])
+
     def test_reports_by_committee_type(self):
         presidential_report = factories.ReportsPresidentialFactory()
         house_report = factories.ReportsHouseSenateFactory()
@@ -310,3 +320,12 @@ class TestReports(ApiBaseTest):
         self.assertEqual(resp.content_type, 'application/json')
         data = json.loads(resp.data.decode('utf-8'))
         self.assertIn('not found', data['message'].lower())
+
+    def test_reports_combined(self):
+        house = factories.ReportsCombinedFactory(committee_type='H', cycle=2016, report_type='Q1')
+        pac = factories.ReportsCombinedFactory(committee_type='Q', cycle=2016, report_type='M3')
+        other = factories.ReportsCombinedFactory(committee_type='P', cycle=2014, report_type='Q1')
+        results = self._results(api.url_for(ReportsCombinedView, cycle=2016))
+        self._check_committee_ids(results, [house, pac], [other])
+        results = self._results(api.url_for(ReportsCombinedView, report_type='-M3'))
+        self._check_committee_ids(results, [house, other], [pac])
@@ -0,0 +1,89 @@
+import datetime
+
+from tests import factories
+from tests.common import ApiBaseTest
+
+from webservices.rest import api
+from webservices.resources import aggregates
+
+
+class TestAggregates(ApiBaseTest):
+
+    cases = [
+        (factories.ScheduleAByEmployerFactory, aggregates.ScheduleAByEmployerView, 'employer', 'Acme'),
+        (factories.ScheduleAByOccupationFactory, aggregates.ScheduleAByOccupationView, 'occupation', 'Lawyer'),
+        (factories.ScheduleAByContributorFactory, aggregates.ScheduleAByContributorView, 'contributor_id', 'C001'),
+        (factories.ScheduleAByContributorFactory, aggregates.ScheduleAByContributorView, 'contributor_name', 'Hoynes'),
+        (factories.ScheduleBByRecipientFactory, aggregates.ScheduleBByRecipientView, 'recipient_name', 'Acme'),
+        (factories.ScheduleBByRecipientIdFactory, aggregates.ScheduleBByRecipientIdView, 'recipient_id', 'C001'),
+        (factories.ScheduleBByStateFactory, aggregates.ScheduleBByStateView, 'state', 'NY'),
+        (factories.ScheduleBByPurposeFactory, aggregates.ScheduleBByPurposeView, 'purpose', 'Travel'),
+    ]
+
+    def test_filter_by_field(self):
+        for factory, resource, field, value in self.cases:
+            matched = factory(**{field: value})
+            factory(**{field: 'Other'})
+            results = self._results(api.url_for(resource, **{field: value}))
+            self.assertEqual(len(results), 1, resource.__name__)
+            self.assertEqual(results[0][field], value)
+            self.assertEqual(results[0]['committee_id'], matched.committee_id)
+            self.assertEqual(results[0]['total'], matched.total)
+            self.assertEqual(results[0]['count'], matched.count)
+
+    def test_filter_by_committee(self):
+        for factory, resource, field, value in self.cases:
+            matched = factory(**{field: value})
+            factory(**{field: value})
+            results = self._results(
+                api.url_for(resource, committee_id=matched.committee_id)
+            )
+            self.assertEqual(len(results), 1, resource.__name__)
+            self.assertEqual(results[0]['committee_id'], matched.committee_id)
+
+    def test_filter_by_cycle(self):
+        for factory, resource, field, value in self.cases:
+            matched = factory(**{field: value, 'cycle': 2012})
+            factory(**{field: value, 'cycle': 2014})
+            results = self._results(api.url_for(resource, cycle=2012, **{field: value}))
+            self.assertEqual(len(results), 1, resource.__name__)
+            self.assertEqual(results[0]['cycle'], matched.cycle)
+
+
+class TestAggregatesByDate(ApiBaseTest):
+
+    cases = [
+        (factories.ScheduleAByDateFactory, aggregates.ScheduleAByDateView),
+        (factories.ScheduleBByDateFactory, aggregates.ScheduleBByDateView),
+    ]
+
+    def test_by_committee(self):
+        for factory, resource in self.cases:
+            committee_id = 'C{0}'.format(resource.__name__)
+            months = [datetime.date(2015, month, 1) for month in (3, 1, 2)]
+            [factory(committee_id=committee_id, month=month) for month in months]
+            factory(month=months[0])
+            results = self._results(api.url_for(resource, committee_id=committee_id))
+            self.assertEqual(
+                [each['month'] for each in results],
+                [month.isoformat() for month in sorted(months)],
+            )
+            self.assertTrue(all(each['committee_id'] == committee_id for each in results))
+
+    def test_date_range(self):
+        for factory, resource in self.cases:
+            committee_id = 'C{0}'.format(resource.__name__)
+            months = [datetime.date(2015, month, 1) for month in (1, 2, 3)]
+            [factory(committee_id=committee_id, month=month) for month in months]
+            results = self._results(
+                api.url_for(
+                    resource,
+                    committee_id=committee_id,
+                    min_date=months[1].isoformat(),
+                    max_date=months[2].isoformat(),
+                )
+            )
+            self.assertEqual(
+                [each['month'] for each in results],
+                [month.isoformat() for month in months[1:]],
+            )
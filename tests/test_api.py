@@ -1,12 +1,20 @@
+import json
+import codecs
+from unittest import mock
+
 import sqlalchemy as sa
 
 from tests import factories
 from tests.common import ApiBaseTest
 
 from webservices import rest
+from webservices.common import cache
+from webservices.common import models
+from webservices.common import typeahead
 from webservices.rest import api
 from webservices.rest import CandidateNameSearch
 from webservices.rest import CommitteeNameSearch
+from webservices.resources.sched_a import ScheduleAView
 from webservices.resources.candidates import CandidateList
 
 
@@ -82,6 +90,127 @@ class OverallTest(ApiBaseTest):
         for itm in page_two:
             self.assertIn(itm, page_one_and_two)
 
+    def test_count_mode_skip(self):
+        [factories.CandidateFactory() for _ in range(5)]
+        response = self._response(api.url_for(CandidateList, count_mode='skip'))
+        self.assertEqual(len(response['results']), 5)
+        self.assertIsNone(response['pagination']['count'])
+        self.assertIsNone(response['pagination']['pages'])
+        self.assertEqual(response['pagination']['count_mode'], 'skip')
+
+    def test_count_mode_cached(self):
+        [factories.CandidateFactory() for _ in range(5)]
+        response = self._response(api.url_for(CandidateList, count_mode='cached', per_page=2))
+        self.assertEqual(response['pagination']['count'], 5)
+        self.assertEqual(response['pagination']['count_mode'], 'cached')
+
+    def test_count_mode_invalid(self):
+        response = self.app.get(api.url_for(CandidateList, count_mode='guess'))
+        self.assertEqual(response.status_code, 422)
+
+    def test_fields(self):
+        factories.CandidateFactory(name='Josiah Bartlet', party='DEM')
+        results = self._results(api.url_for(CandidateList, fields=['name', 'party']))
+        self.assertEqual(results, [{'name': 'Josiah Bartlet', 'party': 'DEM'}])
+
+    def test_fields_invalid(self):
+        response = self.app.get(api.url_for(CandidateList, fields=['name', 'bad_field']))
+        self.assertEqual(response.status_code, 422)
+
+    def test_response_cache(self):
+        rest.app.config['RESPONSE_CACHE'] = True
+        try:
+            factories.CandidateFactory(name='Josiah Bartlet')
+            url = api.url_for(CandidateList)
+            first = self.app.get(url)
+            factories.CandidateFactory(name='Josiah Bartlet')
+            second = self.app.get(url)
+            self.assertEqual(first.headers['X-Cache'], 'MISS')
+            self.assertEqual(second.headers['X-Cache'], 'HIT')
+            self.assertEqual(first.data, second.data)
+            cache.bump_generation()
+            third = self.app.get(url)
+            self.assertEqual(third.headers['X-Cache'], 'MISS')
+            self.assertEqual(len(json.loads(codecs.decode(third.data))['results']), 2)
+        finally:
+            rest.app.config['RESPONSE_CACHE'] = False
+
+    def test_generation_shared_between_instances(self):
+        generation = cache.bump_generation()
+        refreshed = cache.get_refreshed()
+        # Forget the generation, as on an instance that did not run the refresh
+        cache._generations.clear()
+        self.assertEqual(cache.get_generation(), generation)
+        self.assertEqual(cache.get_refreshed(), refreshed)
+
+    def test_etag(self):
+        url = api.url_for(CandidateList)
+        response = self.app.get(url)
+        etag = response.headers['ETag']
+        self.assertIn('Last-Modified', response.headers)
+        response = self.app.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        response = self.app.get(api.url_for(CandidateList, per_page=10), headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        cache.bump_generation()
+        response = self.app.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_etag_itemized_scope(self):
+        url, itemized_url = api.url_for(CandidateList), api.url_for(ScheduleAView)
+        etag = self.app.get(url).headers['ETag']
+        itemized_etag = self.app.get(itemized_url).headers['ETag']
+        # Consuming queued changes only invalidates itemized data
+        cache.bump_generation(scope=cache.ITEMIZED)
+        self.assertEqual(self.app.get(url).headers['ETag'], etag)
+        self.assertNotEqual(self.app.get(itemized_url).headers['ETag'], itemized_etag)
+
+    def test_etag_unknown_refresh(self):
+        url = api.url_for(CandidateList)
+        etag = self.app.get(url).headers['ETag']
+        # As on an instance that cannot read the refresh time
+        with mock.patch.object(cache, 'get_refreshed', return_value=None):
+            response = self.app.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response.headers)
+
+    def test_last_modified(self):
+        url = api.url_for(CandidateList)
+        last_modified = self.app.get(url).headers['Last-Modified']
+        response = self.app.get(url, headers={'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 304)
+
+    def test_seek_pagination(self):
+        [factories.CandidateFactory(name='Bartlet {0:02d}'.format(idx)) for idx in range(15)]
+        response = self._response(api.url_for(CandidateList, per_page=10))
+        self.assertEqual(len(response['results']), 10)
+        last_indexes = response['pagination']['last_indexes']
+        self.assertEqual(last_indexes['last_name'], 'Bartlet 09')
+        page_two = self._results(api.url_for(CandidateList, per_page=10, **last_indexes))
+        self.assertEqual(
+            [each['name'] for each in page_two],
+            ['Bartlet {0:02d}'.format(idx) for idx in range(10, 15)],
+        )
+
+    def test_seek_pagination_multiple_sort(self):
+        response = self.app.get(api.url_for(CandidateList, last_index=1, sort=['name', 'party']))
+        self.assertEqual(response.status_code, 422)
+
+    def test_cursor_pagination_multiple_sort(self):
+        [
+            factories.CandidateFactory(name=name, party=party)
+            for name, party in [('Bartlet', 'DEM'), ('Bartlet', 'REP'), ('Vinick', 'REP'), ('Vinick', 'DEM')]
+        ]
+        sort = ['name', '-party']
+        page1 = self._response(api.url_for(CandidateList, per_page=3, sort=sort))
+        cursor = page1['pagination']['next_cursor']
+        page2 = self._results(api.url_for(CandidateList, per_page=3, sort=sort, cursor=cursor))
+        self.assertEqual(
+            [(each['name'], each['party']) for each in page1['results'] + page2],
+            [('Bartlet', 'REP'), ('Bartlet', 'DEM'), ('Vinick', 'REP'), ('Vinick', 'DEM')],
+        )
+
     # Typeahead name search
     def test_typeahead_candidate_search(self):
         [
@@ -99,6 +228,20 @@ class OverallTest(ApiBaseTest):
         for each in results:
             self.assertIn('bartlet', each['name'].lower())
 
+    def test_typeahead_index_fallback(self):
+        factories.CandidateSearchFactory(
+            name='Josiah Bartlet',
+            fulltxt=sa.func.to_tsvector('Josiah Bartlet'),
+        )
+        rest.db.session.flush()
+        index = typeahead.PrefixIndex([{'id': 'P1', 'name': 'Jed Bartlet'}])
+        results = rest.search_typeahead_text(models.CandidateSearch, 'bartlet', index=index)['results']
+        self.assertEqual([each['name'] for each in results], ['Jed Bartlet'])
+        # Unmatched and unloaded indexes fall back to fulltext search
+        for index in [typeahead.PrefixIndex([]), None]:
+            results = rest.search_typeahead_text(models.CandidateSearch, 'bartlet', index=index)['results']
+            self.assertEqual([each.name for each in results], ['Josiah Bartlet'])
+
     def test_typeahead_committee_search(self):
         [
             factories.CommitteeSearchFactory(
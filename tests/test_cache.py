@@ -0,0 +1,116 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+from webservices.common import cache
+
+
+class TestMemoryCache(unittest.TestCase):
+
+    def test_get_set(self):
+        store = cache.MemoryCache()
+        self.assertIsNone(store.get('key'))
+        store.set('key', 42)
+        self.assertEqual(store.get('key'), 42)
+
+    def test_expires(self):
+        store = cache.MemoryCache()
+        store.set('key', 42, ttl=-1)
+        self.assertIsNone(store.get('key'))
+
+    def test_evicts_least_recently_used(self):
+        store = cache.MemoryCache(max_size=2)
+        store.set('a', 1)
+        store.set('b', 2)
+        store.get('a')
+        store.set('c', 3)
+        self.assertEqual(store.get('a'), 1)
+        self.assertIsNone(store.get('b'))
+        self.assertEqual(store.get('c'), 3)
+
+
+class TestSharedCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        self.shared = cache.SqliteCache(os.path.join(self.dirname, 'cache.sqlite'))
+        # Forget generations read from other tests' caches
+        cache._generations.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def test_get_set(self):
+        self.shared.set('key', {'count': 42})
+        self.assertEqual(self.shared.get('key'), {'count': 42})
+        self.assertIsNone(self.shared.get('missing'))
+
+    def test_expires(self):
+        self.shared.set('key', 42, ttl=-1)
+        self.assertIsNone(self.shared.get('key'))
+
+    def test_incr(self):
+        self.assertEqual(self.shared.incr('counter'), 1)
+        self.assertEqual(self.shared.incr('counter'), 2)
+
+    def test_set_purges_expired(self):
+        self.shared.set('expired', 42, ttl=-1)
+        self.shared.set('key', 43)
+        conn = self.shared._connect()
+        keys = [row[0] for row in conn.execute('select key from cache')]
+        conn.close()
+        self.assertEqual(keys, ['key'])
+
+    def test_default_ttl(self):
+        store = cache.Cache('test', shared=self.shared, generations=self.shared)
+        store.set('key', 42)
+        conn = self.shared._connect()
+        expires = conn.execute('select expires from cache').fetchone()[0]
+        conn.close()
+        self.assertIsNotNone(expires)
+
+    def test_unavailable(self):
+        shared = cache.SqliteCache(os.path.join(self.dirname, 'missing', 'cache.sqlite'))
+        shared.set('key', 42)
+        self.assertIsNone(shared.get('key'))
+
+    def test_shared_between_instances(self):
+        cache.Cache('test', shared=self.shared, generations=self.shared).set('key', 42)
+        self.assertEqual(cache.Cache('test', shared=self.shared, generations=self.shared).get('key'), 42)
+        self.assertIsNone(cache.Cache('other', shared=self.shared, generations=self.shared).get('key'))
+
+    def test_bump_generation_invalidates(self):
+        store = cache.Cache('test', shared=self.shared, generations=self.shared)
+        store.set('key', 42)
+        cache.bump_generation(self.shared)
+        self.assertIsNone(store.get('key'))
+        store.set('key', 43)
+        self.assertEqual(store.get('key'), 43)
+
+    def test_bump_scoped_generation(self):
+        store = cache.Cache('test', shared=self.shared, generations=self.shared)
+        store.set('key', 42)
+        store.set('key', 43, scope=cache.ITEMIZED)
+        cache.bump_generation(self.shared, scope=cache.ITEMIZED)
+        self.assertEqual(store.get('key'), 42)
+        self.assertIsNone(store.get('key', scope=cache.ITEMIZED))
+
+    def test_bump_generation_invalidates_scopes(self):
+        store = cache.Cache('test', shared=self.shared, generations=self.shared)
+        store.set('key', 42, scope=cache.ITEMIZED)
+        cache.bump_generation(self.shared)
+        self.assertIsNone(store.get('key', scope=cache.ITEMIZED))
+
+    def test_scoped_refreshed(self):
+        cache.bump_generation(self.shared)
+        refreshed = cache.get_refreshed(self.shared)
+        cache.bump_generation(self.shared, scope=cache.ITEMIZED)
+        self.assertEqual(cache.get_refreshed(self.shared), refreshed)
+        self.assertGreaterEqual(cache.get_refreshed(self.shared, scope=cache.ITEMIZED), refreshed)
+
+    def test_bump_generation_sets_refreshed(self):
+        before = time.time()
+        cache.bump_generation(self.shared)
+        self.assertGreaterEqual(cache.get_refreshed(self.shared), before)
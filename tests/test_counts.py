@@ -0,0 +1,130 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from webservices.common import cache
+from webservices.common import counts
+
+
+def make_plan(plan):
+    return [(json.dumps([{'Plan': plan}]), )]
+
+
+class TestPlanCount(unittest.TestCase):
+
+    def test_scan(self):
+        rows = make_plan({'Node Type': 'Seq Scan', 'Plan Rows': 42})
+        self.assertEqual(counts.extract_plan_count(rows), 42)
+
+    def test_parsed_plan(self):
+        rows = [([{'Plan': {'Node Type': 'Seq Scan', 'Plan Rows': 42}}], )]
+        self.assertEqual(counts.extract_plan_count(rows), 42)
+
+    def test_skips_passthrough_nodes(self):
+        rows = make_plan({
+            'Node Type': 'Limit',
+            'Plan Rows': 20,
+            'Plans': [{
+                'Node Type': 'Sort',
+                'Plan Rows': 1000,
+                'Plans': [{'Node Type': 'Seq Scan', 'Plan Rows': 1000}],
+            }],
+        })
+        self.assertEqual(counts.extract_plan_count(rows), 1000)
+
+    def test_skips_left_join(self):
+        rows = make_plan({
+            'Node Type': 'Hash Join',
+            'Join Type': 'Left',
+            'Plan Rows': 5000,
+            'Plans': [
+                {'Node Type': 'Hash', 'Parent Relationship': 'Inner', 'Plan Rows': 10},
+                {'Node Type': 'Index Scan', 'Parent Relationship': 'Outer', 'Plan Rows': 300},
+            ],
+        })
+        self.assertEqual(counts.extract_plan_count(rows), 300)
+
+    def test_keeps_inner_join(self):
+        rows = make_plan({
+            'Node Type': 'Hash Join',
+            'Join Type': 'Inner',
+            'Plan Rows': 250,
+            'Plans': [
+                {'Node Type': 'Seq Scan', 'Parent Relationship': 'Outer', 'Plan Rows': 300},
+                {'Node Type': 'Hash', 'Parent Relationship': 'Inner', 'Plan Rows': 10},
+            ],
+        })
+        self.assertEqual(counts.extract_plan_count(rows), 250)
+
+
+class TestEstimateStats(unittest.TestCase):
+
+    def test_learns_ratio(self):
+        stats = counts.EstimateStats()
+        for _ in range(counts.ESTIMATE_MIN_SAMPLES - 1):
+            stats.observe(100, 200)
+        self.assertEqual(stats.correct(100), 100)
+        stats.observe(100, 200)
+        self.assertEqual(stats.correct(100), 200)
+
+    def test_threshold_adapts(self):
+        stats = counts.EstimateStats(threshold=1000)
+        stats.observe(100, 1000)
+        self.assertEqual(stats.threshold, 2000)
+        stats = counts.EstimateStats(threshold=1000)
+        stats.observe(1000, 1000)
+        self.assertEqual(stats.threshold, counts.MIN_THRESHOLD)
+
+    def test_threshold_bounded(self):
+        stats = counts.EstimateStats(threshold=counts.MAX_THRESHOLD)
+        stats.observe(1, 1000)
+        self.assertEqual(stats.threshold, counts.MAX_THRESHOLD)
+
+
+class FakeQuery(object):
+
+    def __init__(self, count):
+        self._count = count
+        self.calls = 0
+
+    def count(self):
+        self.calls += 1
+        return self._count
+
+
+class TestStoreCount(unittest.TestCase):
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        self.shared = cache.SqliteCache(os.path.join(self.dirname, 'cache.sqlite'))
+        patcher = mock.patch.object(
+            counts,
+            'count_cache',
+            cache.Cache('counts', shared=self.shared, generations=self.shared),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def _shared_keys(self):
+        conn = self.shared._connect()
+        try:
+            return [row[0] for row in conn.execute('select key from cache')]
+        finally:
+            conn.close()
+
+    def test_cheap_count_cached_in_process(self):
+        query = FakeQuery(42)
+        self.assertEqual(counts.store_count(query, 'key'), 42)
+        self.assertEqual(counts.count_cache.get('key'), 42)
+        self.assertEqual(self._shared_keys(), [])
+
+    @mock.patch.object(counts, 'SHARED_COUNT_SECONDS', 0)
+    def test_expensive_count_shared(self):
+        counts.store_count(FakeQuery(42), 'key')
+        self.assertEqual(len(self._shared_keys()), 1)
@@ -12,6 +12,7 @@ from tests import factories
 from webservices.rest import db
 from webservices.spec import spec
 from webservices.common import models
+from webservices.common import queues
 from webservices.config import SQL_CONFIG
 
 
@@ -49,7 +50,7 @@ class TestViews(common.IntegrationTestCase):
         manage.update_schemas(processes=1)
         manage.update_schedule_a()
         manage.update_schedule_b()
-        manage.update_aggregates(processes=1)
+        manage.update_aggregates()
 
     def test_update_schemas(self):
         for model in db.Model._decl_class_registry.values():
@@ -255,6 +256,171 @@ class TestViews(common.IntegrationTestCase):
         self.assertEqual(existing.total, total + 538)
         self.assertEqual(existing.count, count + 1)
 
+    def test_update_aggregate_employer_create(self):
+        factories.ScheduleAFactory(
+            report_year=2015,
+            committee_id='C12345',
+            contributor_receipt_amount=538,
+            contributor_employer='Sands Corporation',
+        )
+        db.session.flush()
+        db.session.execute('select update_aggregates()')
+        rows = models.ScheduleAByEmployer.query.filter_by(
+            cycle=2016,
+            committee_id='C12345',
+            employer='Sands Corporation',
+        ).all()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].total, 538)
+        self.assertEqual(rows[0].count, 1)
+
+    def test_update_aggregate_employer_same_batch(self):
+        filing = factories.ScheduleAFactory(
+            report_year=2015,
+            committee_id='C12345',
+            contributor_receipt_amount=538,
+            contributor_employer='Sands Corporation',
+        )
+        db.session.flush()
+        # Queue the insert and the update in the same batch
+        filing.contributor_receipt_amount = 53
+        db.session.add(filing)
+        db.session.flush()
+        db.session.execute('select update_aggregates()')
+        rows = models.ScheduleAByEmployer.query.filter_by(
+            cycle=2016,
+            committee_id='C12345',
+            employer='Sands Corporation',
+        ).all()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].total, 53)
+        self.assertEqual(rows[0].count, 1)
+
+    def test_update_aggregate_occupation_create(self):
+        factories.ScheduleAFactory(
+            report_year=2015,
+            committee_id='C12345',
+            contributor_receipt_amount=538,
+            contributor_occupation='Chairman',
+        )
+        db.session.flush()
+        db.session.execute('select update_aggregates()')
+        rows = models.ScheduleAByOccupation.query.filter_by(
+            cycle=2016,
+            committee_id='C12345',
+            occupation='Chairman',
+        ).all()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].total, 538)
+        self.assertEqual(rows[0].count, 1)
+
+    def test_update_aggregate_contributor_null_id(self):
+        for _ in range(2):
+            factories.ScheduleAFactory(
+                report_year=2015,
+                committee_id='C12345',
+                contributor_receipt_amount=538,
+                contributor_id=None,
+                contributor_name='Sheldon Adelson',
+            )
+            db.session.flush()
+            db.session.execute('select update_aggregates()')
+        rows = models.ScheduleAByContributor.query.filter_by(
+            cycle=2016,
+            committee_id='C12345',
+            contributor_name='Sheldon Adelson',
+        ).all()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].total, 538 * 2)
+        self.assertEqual(rows[0].count, 2)
+
+    def test_update_aggregate_schedule_b_recipient(self):
+        filing = factories.ScheduleBFactory(
+            report_year=2015,
+            committee_id='C12345',
+            disbursement_amount=538,
+            recipient_name='Koch Industries',
+        )
+        db.session.flush()
+        db.session.execute('select update_aggregates()')
+        rows = models.ScheduleBByRecipient.query.filter_by(
+            cycle=2016,
+            committee_id='C12345',
+            recipient_name='Koch Industries',
+        ).all()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].total, 538)
+        self.assertEqual(rows[0].count, 1)
+        db.session.delete(filing)
+        db.session.flush()
+        db.session.execute('select update_aggregates()')
+        db.session.refresh(rows[0])
+        self.assertEqual(rows[0].total, 0)
+        self.assertEqual(rows[0].count, 0)
+
+    def test_update_aggregate_schedule_b_state(self):
+        filing = factories.ScheduleBFactory(
+            report_year=2015,
+            committee_id='C12345',
+            disbursement_amount=538,
+            recipient_state='KS',
+        )
+        db.session.flush()
+        db.session.execute('select update_aggregates()')
+        rows = models.ScheduleBByState.query.filter_by(
+            cycle=2016,
+            committee_id='C12345',
+            state='KS',
+        ).all()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].total, 538)
+        self.assertEqual(rows[0].count, 1)
+        filing.recipient_state = 'NY'
+        db.session.add(filing)
+        db.session.flush()
+        db.session.execute('select update_aggregates()')
+        db.session.refresh(rows[0])
+        self.assertEqual(rows[0].total, 0)
+        self.assertEqual(rows[0].count, 0)
+
+    def test_update_aggregate_schedule_b_purpose_same_batch(self):
+        for amount in (538, 53):
+            factories.ScheduleBFactory(
+                report_year=2015,
+                committee_id='C12345',
+                disbursement_amount=amount,
+                disbursement_description='Consulting',
+            )
+        db.session.flush()
+        db.session.execute('select update_aggregates()')
+        rows = models.ScheduleBByPurpose.query.filter_by(
+            cycle=2016,
+            committee_id='C12345',
+            purpose='Consulting',
+        ).all()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].total, 538 + 53)
+        self.assertEqual(rows[0].count, 2)
+
+    def test_update_aggregate_date(self):
+        for day in (1, 28):
+            factories.ScheduleAFactory(
+                report_year=2015,
+                committee_id='C12345',
+                contributor_receipt_amount=538,
+                contributor_receipt_date=datetime.datetime(2015, 2, day),
+            )
+        db.session.flush()
+        db.session.execute('select update_aggregates()')
+        rows = models.ScheduleAByDate.query.filter_by(
+            cycle=2016,
+            committee_id='C12345',
+            month=datetime.date(2015, 2, 1),
+        ).all()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].total, 538 * 2)
+        self.assertEqual(rows[0].count, 2)
+
     def test_update_aggregate_size_create(self):
         filing = factories.ScheduleAFactory(
             report_year=2015,
@@ -279,6 +445,36 @@ class TestViews(common.IntegrationTestCase):
         self.assertEqual(rows[0].total, 0)
         self.assertEqual(rows[0].count, 0)
 
+    def test_consume_queue_batches(self):
+        filings = [
+            factories.ScheduleAFactory(
+                report_year=2015,
+                committee_id='C12345',
+                contributor_receipt_amount=538,
+                contributor_name='Sheldon Adelson',
+            )
+            for _ in range(3)
+        ]
+        db.session.flush()
+        connection = db.session.connection()
+        self.assertEqual(queues.process_batch(connection, 'sched_a', batch_size=2), (2, False))
+        self.assertEqual(queues.process_batch(connection, 'sched_a', batch_size=2), (1, True))
+        self.assertEqual(queues.process_batch(connection, 'sched_a', batch_size=2), (0, True))
+        rows = models.ScheduleABySize.query.filter_by(
+            cycle=2016,
+            committee_id='C12345',
+            size=500,
+        ).all()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].total, 538 * 3)
+        self.assertEqual(rows[0].count, 3)
+        self.assertEqual(
+            models.ScheduleASearch.query.filter(
+                models.ScheduleASearch.sched_a_sk.in_([each.sched_a_sk for each in filings])
+            ).count(),
+            3,
+        )
+
     def test_update_aggregate_size_existing(self):
         existing = models.ScheduleABySize.query.filter_by(
             size=500,
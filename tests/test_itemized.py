@@ -1,3 +1,6 @@
+import csv
+import gzip
+import json
 import datetime
 
 import sqlalchemy as sa
@@ -8,7 +11,9 @@ from tests.common import ApiBaseTest
 from webservices.rest import db
 from webservices.rest import api
 from webservices.resources.sched_a import ScheduleAView
+from webservices.resources.sched_a import ScheduleAExportView
 from webservices.resources.sched_b import ScheduleBView
+from webservices.resources.sched_b import ScheduleBExportView
 
 
 class TestItemized(ApiBaseTest):
@@ -31,6 +36,61 @@ class TestItemized(ApiBaseTest):
         self.assertEqual(response.status_code, 422)
         self.assertIn(b'Cannot sort on value', response.data)
 
+    def test_fields(self):
+        factories.ScheduleAFactory(contributor_name='Toby Ziegler', contributor_receipt_amount=50)
+        db.session.flush()
+        response = self._response(
+            api.url_for(ScheduleAView, fields=['contributor_name', 'contributor_receipt_amount'])
+        )
+        self.assertEqual(
+            response['results'],
+            [{'contributor_name': 'Toby Ziegler', 'contributor_receipt_amount': 50}],
+        )
+        self.assertIsNotNone(response['pagination']['last_indexes'])
+
+    def test_pagination_stream(self):
+        [factories.ScheduleAFactory() for _ in range(5)]
+        db.session.flush()
+        buffered = self._response(api.url_for(ScheduleAView, per_page=20))
+        streamed = self._response(api.url_for(ScheduleAView, per_page=100))
+        self.assertEqual(streamed['results'], buffered['results'])
+        self.assertEqual(
+            streamed['pagination']['last_indexes'],
+            buffered['pagination']['last_indexes'],
+        )
+
+    def test_export_csv(self):
+        [
+            factories.ScheduleAFactory(contributor_state='NY', contributor_receipt_amount=50),
+            factories.ScheduleAFactory(contributor_state='CA', contributor_receipt_amount=100),
+            factories.ScheduleAFactory(contributor_state='CA', contributor_receipt_amount=75),
+        ]
+        db.session.flush()
+        response = self.app.get(
+            api.url_for(ScheduleAExportView, contributor_state='CA', sort='contributor_receipt_amount')
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/csv')
+        rows = list(csv.DictReader(response.data.decode('utf-8').splitlines()))
+        self.assertEqual([row['contributor_receipt_amount'] for row in rows], ['75.0', '100.0'])
+
+    def test_export_json_gzip(self):
+        [factories.ScheduleBFactory(recipient_state='CA') for _ in range(3)]
+        db.session.flush()
+        response = self.app.get(
+            api.url_for(ScheduleBExportView, format='json'),
+            headers={'Accept-Encoding': 'gzip'},
+        )
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        lines = gzip.decompress(response.data).decode('utf-8').splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(len(records), 3)
+        self.assertTrue(all(record['recipient_state'] == 'CA' for record in records))
+
+    def test_export_format_invalid(self):
+        response = self.app.get(api.url_for(ScheduleAExportView, format='xml'))
+        self.assertEqual(response.status_code, 422)
+
     def test_filter(self):
         [
             factories.ScheduleAFactory(contributor_state='NY'),
@@ -57,6 +117,37 @@ class TestItemized(ApiBaseTest):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]['contributor_name'], 'George Soros')
 
+    def test_filter_fulltext_sort(self):
+        filings = [
+            factories.ScheduleAFactory(
+                contributor_name='George Soros',
+                committee_id=committee_id,
+                contributor_receipt_amount=amount,
+            )
+            for committee_id, amount in [('C001', 100), ('C001', 200), ('C002', 300)]
+        ]
+        [
+            factories.ScheduleASearchFactory(
+                sched_a_sk=filing.sched_a_sk,
+                committee_id=filing.committee_id,
+                contributor_receipt_amount=filing.contributor_receipt_amount,
+                contributor_name_text=sa.func.to_tsvector(filing.contributor_name),
+            )
+            for filing in filings
+        ]
+        results = self._results(
+            api.url_for(
+                ScheduleAView,
+                contributor_name='soros',
+                committee_id='C001',
+                sort='-contributor_receipt_amount',
+            )
+        )
+        self.assertEqual(
+            [each['sched_a_sk'] for each in results],
+            [filings[1].sched_a_sk, filings[0].sched_a_sk],
+        )
+
     def test_pagination(self):
         filings = [
             factories.ScheduleAFactory()
@@ -75,6 +166,73 @@ class TestItemized(ApiBaseTest):
             [each.sched_a_sk for each in filings[20:]],
         )
 
+    def test_pagination_cursor(self):
+        [
+            factories.ScheduleAFactory(contributor_receipt_amount=amount)
+            for amount in [50, 50, 50, 100, 100]
+        ]
+        results, cursor = [], None
+        for _ in range(3):
+            response = self._response(
+                api.url_for(ScheduleAView, sort='contributor_receipt_amount', per_page=2, cursor=cursor)
+            )
+            results.extend(response['results'])
+            cursor = response['pagination']['next_cursor']
+        self.assertEqual(len(set(each['sched_a_sk'] for each in results)), 5)
+        self.assertEqual(
+            [each['contributor_receipt_amount'] for each in results],
+            [50, 50, 50, 100, 100],
+        )
+
+    def test_pagination_cursor_null_sort_values(self):
+        dates = [datetime.datetime(2014, 1, 1), None, datetime.datetime(2014, 1, 2), None, None]
+        [factories.ScheduleAFactory(contributor_receipt_date=date) for date in dates]
+        for sort, expected in [
+            ('contributor_receipt_date', ['2014-01-01', '2014-01-02', None, None, None]),
+            ('-contributor_receipt_date', [None, None, None, '2014-01-02', '2014-01-01']),
+        ]:
+            results, cursor = [], None
+            for _ in range(3):
+                response = self._response(api.url_for(ScheduleAView, sort=sort, per_page=2, cursor=cursor))
+                results.extend(response['results'])
+                cursor = response['pagination']['next_cursor']
+            self.assertEqual(len(set(each['sched_a_sk'] for each in results)), 5)
+            self.assertEqual(
+                [(each['contributor_receipt_date'] or '')[:10] or None for each in results],
+                expected,
+            )
+
+    def test_pagination_null_sort_values(self):
+        dates = [None, datetime.datetime(2014, 1, 1), None, None]
+        [factories.ScheduleAFactory(contributor_receipt_date=date) for date in dates]
+        page1 = self._response(api.url_for(ScheduleAView, sort='contributor_receipt_date', per_page=2))
+        last_indexes = page1['pagination']['last_indexes']
+        self.assertIsNone(last_indexes['last_contributor_receipt_date'])
+        page2 = self._results(
+            api.url_for(
+                ScheduleAView,
+                sort='contributor_receipt_date',
+                per_page=2,
+                last_index=last_indexes['last_index'],
+            )
+        )
+        self.assertEqual([each['contributor_receipt_date'] for each in page2], [None, None])
+        self.assertEqual(
+            len(set(each['sched_a_sk'] for each in page1['results'] + page2)),
+            4,
+        )
+
+    def test_pagination_cursor_invalid(self):
+        response = self.app.get(api.url_for(ScheduleAView, cursor='not-a-cursor'))
+        self.assertEqual(response.status_code, 422)
+
+    def test_pagination_cursor_sort_mismatch(self):
+        [factories.ScheduleAFactory() for _ in range(3)]
+        page1 = self._response(api.url_for(ScheduleAView, sort='contributor_receipt_amount', per_page=2))
+        cursor = page1['pagination']['next_cursor']
+        response = self.app.get(api.url_for(ScheduleAView, sort='-contributor_receipt_amount', cursor=cursor))
+        self.assertEqual(response.status_code, 422)
+
     def test_pdf_url(self):
         # TODO(jmcarp) Refactor as parameterized tests
         image_number = 39
@@ -0,0 +1,52 @@
+import threading
+import unittest
+
+from webservices.common import matviews
+
+
+class TestRun(unittest.TestCase):
+
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.refreshed = []
+
+    def _refresh(self, failing=()):
+        def refresh(view):
+            with self.lock:
+                self.refreshed.append(view)
+            error = 'failed' if view in failing else None
+            return matviews.Result(view, 0, 1, error)
+        return refresh
+
+    def test_dependency_order(self):
+        dependencies = {
+            'detail': {'history'},
+            'fulltext': {'detail', 'totals'},
+        }
+        results = matviews.run(
+            ['history', 'detail', 'totals', 'fulltext'],
+            dependencies,
+            self._refresh(),
+        )
+        self.assertEqual(set(self.refreshed), {'history', 'detail', 'totals', 'fulltext'})
+        for view, sources in dependencies.items():
+            for source in sources:
+                self.assertLess(self.refreshed.index(source), self.refreshed.index(view))
+        self.assertTrue(all(result.error is None for result in results))
+
+    def test_skip_dependents_of_failures(self):
+        results = matviews.run(
+            ['history', 'detail', 'fulltext', 'totals'],
+            {'detail': {'history'}, 'fulltext': {'detail'}},
+            self._refresh(failing={'history'}),
+        )
+        self.assertEqual(sorted(self.refreshed), ['history', 'totals'])
+        errors = {result.view: result.error for result in results}
+        self.assertEqual(errors['totals'], None)
+        self.assertEqual(errors['history'], 'failed')
+        self.assertIsNotNone(errors['detail'])
+        self.assertIsNotNone(errors['fulltext'])
+
+    def test_ignore_dependencies_on_other_relations(self):
+        matviews.run(['detail'], {'detail': {'sched_a'}}, self._refresh())
+        self.assertEqual(self.refreshed, ['detail'])
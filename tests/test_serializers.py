@@ -0,0 +1,61 @@
+import datetime
+
+from tests import factories
+from tests.common import ApiBaseTest
+
+from webservices import schemas
+from webservices import serializers
+from webservices.rest import db
+
+
+class TestCompiledSerializers(ApiBaseTest):
+
+    def assert_parity(self, schema_class, obj, only=None):
+        serializer = serializers.compile_schema(schema_class, only)
+        self.assertIsNotNone(serializer)
+        self.assertEqual(serializer(obj), schema_class(only=only).dump(obj).data)
+
+    def test_schedule_a(self):
+        committee = factories.CommitteeHistoryFactory(committee_id='C001', cycle=2016)
+        receipt = factories.ScheduleAFactory(
+            committee_id=committee.committee_id,
+            report_year=2016,
+            contributor_name='Toby Ziegler',
+            contributor_receipt_amount=50.125,
+            contributor_receipt_date=datetime.datetime(2015, 6, 1),
+            image_number='12345678901',
+        )
+        db.session.flush()
+        self.assertIsNotNone(receipt.committee)
+        self.assert_parity(schemas.ScheduleASchema, receipt)
+
+    def test_schedule_a_empty(self):
+        self.assert_parity(schemas.ScheduleASchema, factories.ScheduleAFactory())
+
+    def test_schedule_a_only(self):
+        receipt = factories.ScheduleAFactory(contributor_name='Toby Ziegler')
+        self.assert_parity(
+            schemas.ScheduleASchema,
+            receipt,
+            only=('contributor_name', 'committee', 'pdf_url'),
+        )
+
+    def test_schedule_b(self):
+        disbursement = factories.ScheduleBFactory(
+            recipient_name='Bartlet for America',
+            disbursement_amount=100,
+            disbursement_date=datetime.datetime(2015, 6, 1),
+        )
+        self.assert_parity(schemas.ScheduleBSchema, disbursement)
+
+    def test_candidate(self):
+        candidate = factories.CandidateFactory(name='Josiah Bartlet', election_years=[1992, 1996])
+        self.assert_parity(schemas.CandidateSchema, candidate)
+
+    def test_committee(self):
+        committee = factories.CommitteeFactory(name='Bartlet for America', cycles=[1996])
+        self.assert_parity(schemas.CommitteeSchema, committee)
+
+    def test_filings(self):
+        filing = factories.FilingsFactory(receipt_date=datetime.datetime(2015, 6, 1))
+        self.assert_parity(schemas.FilingsSchema, filing)
@@ -0,0 +1,101 @@
+import os
+import glob
+import tempfile
+import unittest
+
+from webservices.common import sqlfiles
+
+
+class TestDependencies(unittest.TestCase):
+
+    def test_inferred(self):
+        sources = {
+            'clean.sql': 'create or replace function clean_party(text) returns text as $$ select $1 $$;',
+            'history.sql': 'create materialized view ofec_history_mv_tmp as select clean_party(party) from dimparty;',
+            'detail.sql': '-- ofec_history_mv_tmp is mentioned only here\nselect 1;',
+            'post.sql': 'create materialized view ofec_post_mv_tmp as select * from ofec_history_mv_tmp;',
+        }
+        dependencies = sqlfiles.get_dependencies(sources)
+        self.assertEqual(dependencies['clean.sql'], set())
+        self.assertEqual(dependencies['history.sql'], {'clean.sql'})
+        self.assertEqual(dependencies['detail.sql'], set())
+        self.assertEqual(dependencies['post.sql'], {'history.sql'})
+
+    def test_declared(self):
+        sources = {
+            'extensions.sql': 'create extension if not exists pg_trgm;',
+            'detail.sql': (
+                '-- Requires: pg_trgm\n'
+                'create index on ofec_detail_mv_tmp using gin (name gin_trgm_ops);'
+            ),
+        }
+        dependencies = sqlfiles.get_dependencies(sources)
+        self.assertEqual(dependencies['detail.sql'], {'extensions.sql'})
+
+    def test_order(self):
+        order = sqlfiles.get_order({
+            'post.sql': {'history.sql'},
+            'history.sql': {'clean.sql'},
+            'clean.sql': set(),
+        })
+        self.assertEqual(order, ['clean.sql', 'history.sql', 'post.sql'])
+
+    def test_order_circular(self):
+        with self.assertRaises(sqlfiles.DependencyError):
+            sqlfiles.get_order({'a.sql': {'b.sql'}, 'b.sql': {'a.sql'}})
+
+    def test_schema_files(self):
+        root = os.path.join(os.path.dirname(__file__), os.pardir, 'data')
+        paths = [
+            path
+            for folder in ('functions', 'sql_updates', 'sql_post_updates')
+            for path in glob.glob(os.path.join(root, folder, '*.sql'))
+        ]
+        sources = {}
+        for path in paths:
+            with open(path) as fp:
+                sources[os.path.basename(path)] = fp.read()
+        dependencies = sqlfiles.get_dependencies(sources)
+        order = sqlfiles.get_order(dependencies)
+        self.assertIn('create_committee_history.sql', dependencies['post_committees_create_filings_view.sql'])
+        self.assertIn('extensions.sql', dependencies['create_candidate_history_view.sql'])
+        for path, required in dependencies.items():
+            for each in required:
+                self.assertLess(order.index(each), order.index(path))
+
+
+class TestRun(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.paths = {}
+        sources = {
+            'post.sql': 'create view ofec_post_vw as select * from ofec_history_vw;',
+            'history.sql': 'create view ofec_history_vw as select 1;',
+            'other.sql': 'select 1;',
+        }
+        for name, sql in sources.items():
+            self.paths[name] = os.path.join(self.dir.name, name)
+            with open(self.paths[name], 'w') as fp:
+                fp.write(sql)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_run(self):
+        executed = []
+        sqlfiles.run(list(self.paths.values()), executed.append)
+        self.assertEqual(len(executed), 3)
+        self.assertLess(executed.index(self.paths['history.sql']), executed.index(self.paths['post.sql']))
+
+    def test_run_failure(self):
+        executed = []
+
+        def execute(path):
+            executed.append(path)
+            if path == self.paths['history.sql']:
+                raise ValueError(path)
+
+        with self.assertRaises(ValueError):
+            sqlfiles.run(list(self.paths.values()), execute)
+        self.assertNotIn(self.paths['post.sql'], executed)
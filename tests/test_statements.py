@@ -0,0 +1,97 @@
+import unittest
+
+import sqlalchemy as sa
+from sqlalchemy.ext.declarative import declarative_base
+
+from webservices import statements
+
+
+Base = declarative_base()
+
+
+class Committee(Base):
+    __tablename__ = 'committees'
+    idx = sa.Column(sa.Integer, primary_key=True)
+    committee_id = sa.Column(sa.String)
+
+
+class TestBindKwargs(unittest.TestCase):
+
+    def test_bound_values_share_shape(self):
+        bound = {'committee_id', 'min_amount'}
+        shape1, _, params1 = statements.bind_kwargs(
+            {'committee_id': ['C001'], 'min_amount': 100, 'sort': 'name', 'page': 1},
+            bound,
+        )
+        shape2, _, params2 = statements.bind_kwargs(
+            {'committee_id': ['C002'], 'min_amount': 500, 'sort': 'name', 'page': 2},
+            bound,
+        )
+        self.assertEqual(shape1, shape2)
+        self.assertEqual(params1, {'committee_id_0': 'C001', 'min_amount': 100})
+        self.assertEqual(params2, {'committee_id_0': 'C002', 'min_amount': 500})
+
+    def test_shape_depends_on_list_length(self):
+        shape1, _, _ = statements.bind_kwargs({'committee_id': ['C001']}, {'committee_id'})
+        shape2, _, _ = statements.bind_kwargs({'committee_id': ['C001', 'C002']}, {'committee_id'})
+        self.assertNotEqual(shape1, shape2)
+
+    def test_unbound_values_in_shape(self):
+        shape1, placeholders, params = statements.bind_kwargs({'sort': 'name', 'committee_id': []}, {'committee_id'})
+        shape2, _, _ = statements.bind_kwargs({'sort': '-name', 'committee_id': []}, {'committee_id'})
+        self.assertNotEqual(shape1, shape2)
+        self.assertEqual(placeholders, {'sort': 'name', 'committee_id': []})
+        self.assertEqual(params, {})
+
+    def test_paging_args_excluded_from_shape(self):
+        shape, placeholders, _ = statements.bind_kwargs(
+            {'per_page': 20, 'last_index': 5, 'last_contributor_receipt_date': '2015-01-01'},
+            set(),
+        )
+        self.assertEqual(shape, ())
+        self.assertEqual(placeholders['per_page'], 20)
+
+
+class TestStatement(unittest.TestCase):
+
+    def setUp(self):
+        engine = sa.create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        self.session = sa.orm.Session(bind=engine)
+        self.session.add_all([Committee(committee_id=each) for each in ['C001', 'C002', 'C003']])
+        self.session.flush()
+        self.builds = 0
+        statements.queries.clear()
+
+    def tearDown(self):
+        self.session.close()
+
+    def build(self, kwargs):
+        self.builds += 1
+        return self.session.query(Committee).filter(Committee.committee_id.in_(kwargs['committee_id']))
+
+    def _statement(self, committee_ids):
+        return statements.Statement('test', self.build, {'committee_id': committee_ids}, {'committee_id'}, self.session)
+
+    def test_builds_once_per_shape(self):
+        first = self._statement(['C001']).query().all()
+        second = self._statement(['C002']).query().all()
+        self.assertEqual([each.committee_id for each in first], ['C001'])
+        self.assertEqual([each.committee_id for each in second], ['C002'])
+        self.assertEqual(self.builds, 1)
+        self._statement(['C001', 'C002']).query()
+        self.assertEqual(self.builds, 2)
+
+    def test_count(self):
+        self.assertEqual(statements.StatementCounter(self._statement(['C001', 'C002'])).count(), 2)
+        self.assertEqual(statements.StatementCounter(self._statement(['C001', 'C003'])).count(), 2)
+        self.assertEqual(statements.StatementCounter(self._statement(['C001', 'C004'])).count(), 1)
+
+    def test_count_key(self):
+        counters = [
+            statements.StatementCounter(self._statement(committee_ids))
+            for committee_ids in (['C001'], ['C002'], ['C001'])
+        ]
+        keys = [counter.get_key() for counter in counters]
+        self.assertNotEqual(keys[0], keys[1])
+        self.assertEqual(keys[0], keys[2])
@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from webservices.common import cache
+from webservices.common import typeahead
+
+
+class TestPrefixIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = typeahead.PrefixIndex([
+            {'id': 'C1', 'name': 'Friends of Josiah Bartlet'},
+            {'id': 'C2', 'name': 'Bartlet for America'},
+            {'id': 'C3', 'name': 'Vinick for President'},
+            {'id': 'C4', 'name': None},
+        ])
+
+    def _ids(self, text, limit=20):
+        return [each['id'] for each in self.index.search(text, limit=limit)]
+
+    def test_prefix(self):
+        self.assertEqual(self._ids('bart'), ['C2', 'C1'])
+
+    def test_all_words_match(self):
+        self.assertEqual(self._ids('bartlet amer'), ['C2'])
+        self.assertEqual(self._ids('josiah vin'), [])
+
+    def test_case_and_punctuation(self):
+        self.assertEqual(self._ids('VINICK, pres'), ['C3'])
+
+    def test_limit(self):
+        self.assertEqual(self._ids('for', limit=1), ['C2'])
+
+    def test_empty(self):
+        self.assertEqual(self._ids(''), [])
+        self.assertEqual(self._ids('santos'), [])
+
+
+class StaticTypeahead(typeahead.Typeahead):
+
+    def __init__(self, names, generations):
+        super(StaticTypeahead, self).__init__(None, ['id', 'name'], generations=generations)
+        self.names = names
+
+    def load(self):
+        return typeahead.PrefixIndex([
+            {'id': idx, 'name': name}
+            for idx, name in enumerate(self.names)
+        ])
+
+
+class TestTypeahead(unittest.TestCase):
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        self.shared = cache.SqliteCache(os.path.join(self.dirname, 'cache.sqlite'))
+        cache._generations.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def _names(self, index, text):
+        return [each['name'] for each in index.search(text)]
+
+    def test_loads_in_background(self):
+        index = StaticTypeahead(['Josiah Bartlet'], self.shared)
+        index.refresh().join()
+        self.assertEqual(self._names(index, 'bart'), ['Josiah Bartlet'])
+
+    def test_reloads_after_bump_generation(self):
+        index = StaticTypeahead(['Josiah Bartlet'], self.shared)
+        index.refresh().join()
+        index.names = ['Arnold Vinick']
+        self.assertEqual(self._names(index, 'vin'), [])
+        cache.bump_generation(self.shared)
+        index.get_index()
+        index.refresh().join()
+        self.assertEqual(self._names(index, 'vin'), ['Arnold Vinick'])
+
+    def test_identifiers_skip_index(self):
+        index = StaticTypeahead(['DNC Services Corp'], self.shared)
+        index.refresh().join()
+        self.assertEqual(self._names(index, 'DNC'), [])
+        self.assertEqual(self._names(index, 'dnc'), ['DNC Services Corp'])
+
+
+class TestRanking(unittest.TestCase):
+
+    def test_receipts(self):
+        index = typeahead.PrefixIndex([
+            {'id': 'C1', 'name': 'Bartlet for America', 'receipts': 100},
+            {'id': 'C2', 'name': 'Bartlet for America Again', 'receipts': 1000},
+            {'id': 'C3', 'name': 'Bartlet Now', 'receipts': None},
+            {'id': 'C4', 'name': 'Friends of Bartlet', 'receipts': 5000},
+        ])
+        self.assertEqual(
+            [each['id'] for each in index.search('bartlet')],
+            ['C2', 'C1', 'C3', 'C4'],
+        )
+
+    def test_identifiers(self):
+        for text in ['C00123456', 'h4ny12345', 'DNC', ' NRA ']:
+            self.assertTrue(typeahead.is_identifier(text), text)
+        for text in ['bartlet', 'Bartlet', 'dnc', 'C', 'bartlet for america']:
+            self.assertFalse(typeahead.is_identifier(text), text)
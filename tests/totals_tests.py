@@ -1,8 +1,12 @@
 import json
 
 from webservices import utils
+from webservices.rest import db
 from webservices.rest import api
+from webservices.common import cache
+from webservices.common import committee_types
 from webservices.resources.totals import TotalsView
+from webservices.resources.totals import TotalsCombinedView
 
 from tests import factories
 from .common import ApiBaseTest
@@ -170,9 +174,38 @@ class TestTotals(ApiBaseTest):
         self.assertEqual(response[0]['cycle'], 2012)
         self.assertEqual(response[1]['cycle'], 2008)
 
+    def test_totals_fields(self):
+        committee_id = 'C8675310'
+        factories.CommitteeHistoryFactory(committee_id=committee_id, committee_type='H')
+        factories.TotalsHouseSenateFactory(committee_id=committee_id, cycle=2012)
+        response = self._results(api.url_for(TotalsView, committee_id=committee_id, fields=['cycle']))
+        self.assertEqual(response, [{'cycle': 2012}])
+
     def test_totals_committee_not_found(self):
         resp = self.app.get(api.url_for(TotalsView, committee_id='fake'))
         self.assertEqual(resp.status_code, 404)
         self.assertEqual(resp.content_type, 'application/json')
         data = json.loads(resp.data.decode('utf-8'))
         self.assertIn('not found', data['message'].lower())
+
+    def test_committee_type_cached_until_refresh(self):
+        history = factories.CommitteeHistoryFactory(committee_id='C8675312', committee_type='P')
+        self.assertEqual(committee_types.get_committee_type('C8675312'), 'P')
+        history.committee_type = 'H'
+        db.session.flush()
+        self.assertEqual(committee_types.get_committee_type('C8675312'), 'P')
+        cache.bump_generation()
+        self.assertEqual(committee_types.get_committee_type('C8675312'), 'H')
+
+    def test_totals_combined(self):
+        presidential = factories.TotalsCombinedFactory(committee_type='P', cycle=2016, receipts=50)
+        pac = factories.TotalsCombinedFactory(committee_type='Q', cycle=2016, receipts=100)
+        factories.TotalsCombinedFactory(committee_type='Q', cycle=2014, receipts=200)
+        results = self._results(api.url_for(TotalsCombinedView, cycle=2016))
+        self.assertEqual(
+            [each['committee_type'] for each in results],
+            [pac.committee_type, presidential.committee_type],
+        )
+        results = self._results(api.url_for(TotalsCombinedView, cycle=2016, committee_type='P'))
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['receipts'], 50)
@@ -1,3 +1,4 @@
+import os
 import logging
 import functools
 
@@ -12,11 +13,16 @@ from webargs.flaskparser import FlaskParser
 
 from webservices import docs
 from webservices import exceptions
+from webservices import exports
+from webservices.common import counts
 from webservices.common.models import db
 
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of ids accepted by batch endpoints
+MAX_BATCH_SIZE = int(os.getenv('FEC_MAX_BATCH_SIZE', 100))
+
 
 class FlaskRestParser(FlaskParser):
 
@@ -60,9 +66,34 @@ class Date(webargs.Arg):
             raise webargs.ValidationError('Expected date for {0}; got "{1}"'.format(name, value))
 
 
+NAME_MATCHES = ['substring', 'similarity']
+NameMatch = functools.partial(
+    Arg,
+    str,
+    default='substring',
+    enum=NAME_MATCHES,
+    validate=lambda v: v in NAME_MATCHES,
+    description=docs.NAME_MATCH,
+)
+
+
+CountMode = functools.partial(
+    Arg,
+    str,
+    enum=counts.COUNT_MODES,
+    validate=lambda v: v in counts.COUNT_MODES,
+    description=docs.COUNT_MODE,
+)
+
+
+Fields = functools.partial(Arg, str, multiple=True, description=docs.FIELDS)
+
+
 paging = {
     'page': Natural(default=1, description='For paginating through results, starting at page 1'),
     'per_page': Natural(default=20, description='The number of results returned per page. Defaults to 20.'),
+    'count_mode': CountMode(),
+    'fields': Fields(),
 }
 
 
@@ -125,9 +156,45 @@ def make_seek_args(type=int, description=None):
             type,
             description=description or 'Index of last result from previous page',
         ),
+        'cursor': Arg(str, description=docs.CURSOR),
+        'count_mode': CountMode(),
+        'fields': Fields(),
+    }
+
+
+def make_batch_args(key, description=None):
+    """Arguments for fetching many records by id in one request. Pages hold
+    up to `MAX_BATCH_SIZE` results by default, so that a batch fits on a single
+    page unless records have several rows each.
+    """
+    return {
+        key: Arg(str, multiple=True, required=True, description=description),
+        'page': Natural(default=1, description='For paginating through results, starting at page 1'),
+        'per_page': Natural(default=MAX_BATCH_SIZE, description='The number of results returned per page.'),
+        'count_mode': CountMode(),
+        'fields': Fields(),
     }
 
 
+def validate_batch(values, key):
+    if len(values) > MAX_BATCH_SIZE:
+        raise exceptions.ApiError(
+            'Cannot request more than {0} values of {1}'.format(MAX_BATCH_SIZE, key),
+            status_code=422,
+        )
+
+
+seek = {
+    'last_index': Arg(
+        int,
+        description='Index of last result from previous page, as returned in `pagination.last_indexes`. '
+                    'Switches to keyset pagination; also pass `last_<sort>` when sorting, '
+                    'unless it is null.',
+    ),
+    'cursor': Arg(str, description=docs.CURSOR),
+}
+
+
 def one_of(value, options):
     if value not in options:
         raise webargs.ValidationError('Value "{0}" not in "{1}"'.format(value, options))
@@ -158,6 +225,7 @@ candidate_list = {
     'q': Arg(str, description='Text to search all fields for'),
     'candidate_id': Arg(str, multiple=True, description=docs.CANDIDATE_ID),
     'name': Arg(str, description="Candidate's name (full or partial)"),
+    'name_match': NameMatch(),
 }
 
 committee = {
@@ -214,6 +282,7 @@ committee_list = {
     'name': Arg(str, description="Candidate's name (full or partial)"),
     'state': Arg(str, multiple=True, description='Two-character U.S. state or territory in which the committee is registered.'),
     'name': Arg(str, description="Committee's name (full or partial)"),
+    'name_match': NameMatch(),
     'party': Arg(str, multiple=True, description='Three-letter code for the party. For example: DEM=Democrat REP=Republican'),
     'min_first_file_date': Date(description='Filters out committees that first filed their registration before this date. Can bu used as a range with max_first_file_date. To see when a Committee first filed its F1.'),
     'max_first_file_date': Date(description='Filters out committees that first filed their registration after this date. Can bu used as a range with start_date. To see when a Committee first filed its F1.'),
@@ -256,6 +325,13 @@ totals = {
 }
 
 
+combined = {
+    'committee_id': Arg(str, multiple=True, description=docs.COMMITTEE_ID),
+    'committee_type': committee['committee_type'],
+    'committee_designation': committee['designation'],
+}
+
+
 itemized = {
     # TODO(jmcarp) Request integer image numbers from FEC and update argument types
     'image_number': Arg(str, multiple=True, description='The image number of the page where the schedule item is reported'),
@@ -285,6 +361,17 @@ schedule_a = {
 }
 
 
+export = {
+    'format': Arg(
+        str,
+        default=exports.CSV,
+        enum=exports.FORMATS,
+        validate=lambda v: v in exports.FORMATS,
+        description=docs.EXPORT_FORMAT,
+    ),
+}
+
+
 schedule_a_by_size = {
     'cycle': Arg(int, multiple=True, description=docs.RECORD_CYCLE),
     # add choices
@@ -304,6 +391,29 @@ schedule_a_by_zip = {
 }
 
 
+schedule_a_by_employer = {
+    'cycle': Arg(int, multiple=True, description=docs.RECORD_CYCLE),
+    'employer': Arg(str, multiple=True, description='Employer of contributor'),
+}
+
+
+schedule_a_by_occupation = {
+    'cycle': Arg(int, multiple=True, description=docs.RECORD_CYCLE),
+    'occupation': Arg(str, multiple=True, description='Occupation of contributor'),
+}
+
+
+schedule_a_by_contributor = {
+    'cycle': Arg(int, multiple=True, description=docs.RECORD_CYCLE),
+    'contributor_id': Arg(
+        str,
+        multiple=True,
+        description='The FEC identifier of the contributor, if the contributor is registered with the FEC',
+    ),
+    'contributor_name': Arg(str, multiple=True, description='Name of contributor'),
+}
+
+
 schedule_b = {
     'committee_id': Arg(str, multiple=True, description=docs.COMMITTEE_ID),
     'recipient_committee_id': Arg(str, multiple=True, description='The FEC identifier should be represented here the contributor is registered with the FEC'),
@@ -313,3 +423,34 @@ schedule_b = {
     'last_disbursement_date': Date(description='Filter for records before this date'),
     'last_disbursement_amount': Arg(float, description='Filter for records'),
 }
+
+
+schedule_b_by_recipient = {
+    'cycle': Arg(int, multiple=True, description=docs.RECORD_CYCLE),
+    'recipient_name': Arg(str, multiple=True, description='Name of the entity receiving the disbursement'),
+}
+
+
+schedule_b_by_recipient_id = {
+    'cycle': Arg(int, multiple=True, description=docs.RECORD_CYCLE),
+    'recipient_id': Arg(str, multiple=True, description='The FEC identifier of the receiving committee'),
+}
+
+
+schedule_b_by_state = {
+    'cycle': Arg(int, multiple=True, description=docs.RECORD_CYCLE),
+    'state': Arg(str, multiple=True, description='State of recipient'),
+}
+
+
+schedule_b_by_purpose = {
+    'cycle': Arg(int, multiple=True, description=docs.RECORD_CYCLE),
+    'purpose': Arg(str, multiple=True, description='Purpose of disbursement'),
+}
+
+
+schedule_by_date = {
+    'cycle': Arg(int, multiple=True, description=docs.RECORD_CYCLE),
+    'min_date': Date(description='Minimum month, as the first day of the month'),
+    'max_date': Date(description='Maximum month, as the first day of the month'),
+}
@@ -0,0 +1,331 @@
+"""Two-level cache for values derived from materialized data.
+
+Values are stored in an in-process LRU and in a SQLite file, so that all
+workers on an instance can reuse them. Every key is namespaced by a data
+generation counter that refresh tasks bump via `bump_generation`, which
+invalidates all cached values at once without having to enumerate them. The
+counters and refresh times are kept in the database, so that refreshes run on
+one instance invalidate values cached on every instance.
+
+Values derived from data that change more often than the rest can also be
+cached under a *scope*, with its own generation counter. Bumping a scope's
+generation only invalidates values cached under that scope, while bumping the
+global generation invalidates values in every scope.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+import collections
+from contextlib import closing
+
+import sqlalchemy as sa
+
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = '__generation__'
+REFRESHED_KEY = '__refreshed__'
+# Schedules A and B and their aggregates, which change whenever queued
+# changes are consumed
+ITEMIZED = 'itemized'
+# How long a process may rely on its last read of the generation counter
+GENERATION_CHECK_INTERVAL = int(os.getenv('FEC_CACHE_GENERATION_INTERVAL', 10))
+# Time to live of entries cached without one, so that values that are never
+# read again are eventually purged
+DEFAULT_TTL = int(os.getenv('FEC_CACHE_DEFAULT_TTL', 60 * 60 * 24))
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), 'openfec-cache.sqlite')
+
+
+def make_key(*parts):
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class MemoryCache(object):
+    """Thread-safe LRU cache with per-entry expiration."""
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value, expires = self._data.pop(key)
+            except KeyError:
+                return None
+            if expires is not None and expires < time.time():
+                return None
+            self._data[key] = (value, expires)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (value, expires)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SqliteCache(object):
+    """Cache backed by a SQLite file shared between processes. Values must be
+    JSON-serializable. Errors are logged and treated as cache misses so that
+    an unavailable cache never fails a request.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        if not self._initialized:
+            conn.execute(
+                'create table if not exists cache '
+                '(key text primary key, value text, expires real)'
+            )
+            conn.execute('create index if not exists cache_expires on cache (expires)')
+            self._initialized = True
+        return conn
+
+    def get(self, key):
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    'select value, expires from cache where key = ?',
+                    (key, ),
+                ).fetchone()
+        except sqlite3.Error as error:
+            logger.warning('Cache read failed: %s', error)
+            return None
+        if row is None:
+            return None
+        value, expires = row
+        if expires is not None and expires < time.time():
+            return None
+        return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        expires = time.time() + ttl if ttl else None
+        try:
+            with closing(self._connect()) as conn:
+                conn.execute('begin immediate')
+                conn.execute(
+                    'insert or replace into cache (key, value, expires) values (?, ?, ?)',
+                    (key, json.dumps(value), expires),
+                )
+                self._purge(conn)
+                conn.execute('commit')
+        except sqlite3.Error as error:
+            logger.warning('Cache write failed: %s', error)
+
+    def incr(self, key):
+        try:
+            with closing(self._connect()) as conn:
+                conn.execute('begin immediate')
+                row = conn.execute('select value from cache where key = ?', (key, )).fetchone()
+                value = (json.loads(row[0]) if row else 0) + 1
+                conn.execute(
+                    'insert or replace into cache (key, value, expires) values (?, ?, null)',
+                    (key, json.dumps(value)),
+                )
+                self._purge(conn)
+                conn.execute('commit')
+                return value
+        except sqlite3.Error as error:
+            logger.warning('Cache increment failed: %s', error)
+            return None
+
+    def _purge(self, conn):
+        """Delete expired entries, which belong to earlier generations or have
+        timed out, while holding the write lock.
+        """
+        conn.execute('delete from cache where expires < ?', (time.time(), ))
+
+
+class DatabaseStore(object):
+    """Store for generation counters and refresh times in the table
+    `ofec_cache_generations`, which all instances read. Values must be
+    JSON-serializable. Like `SqliteCache`, errors are logged and treated as
+    missing values.
+    """
+
+    table = 'ofec_cache_generations'
+
+    def _get_engine(self):
+        # Imported here since models depend on this module through utils
+        from webservices.common.models import db
+        return db.engine
+
+    def get(self, key):
+        try:
+            row = self._get_engine().execute(
+                sa.text('select value from {0} where key = :key'.format(self.table)),
+                key=key,
+            ).fetchone()
+        except sa.exc.SQLAlchemyError as error:
+            logger.warning('Generation read failed: %s', error)
+            return None
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl=None):
+        try:
+            with self._get_engine().begin() as connection:
+                self._lock(connection)
+                self._write(connection, key, value)
+        except sa.exc.SQLAlchemyError as error:
+            logger.warning('Generation write failed: %s', error)
+
+    def incr(self, key):
+        try:
+            with self._get_engine().begin() as connection:
+                self._lock(connection)
+                row = connection.execute(
+                    sa.text('select value from {0} where key = :key'.format(self.table)),
+                    key=key,
+                ).fetchone()
+                value = (json.loads(row[0]) if row else 0) + 1
+                self._write(connection, key, value)
+                return value
+        except sa.exc.SQLAlchemyError as error:
+            logger.warning('Generation increment failed: %s', error)
+            return None
+
+    def _lock(self, connection):
+        """Create the table if needed and lock out other writers until the
+        transaction ends.
+        """
+        connection.execute('create table if not exists {0} (key text primary key, value text)'.format(self.table))
+        connection.execute('lock table {0} in share row exclusive mode'.format(self.table))
+
+    def _write(self, connection, key, value):
+        params = {'key': key, 'value': json.dumps(value)}
+        result = connection.execute(
+            sa.text('update {0} set value = :value where key = :key'.format(self.table)),
+            **params
+        )
+        if not result.rowcount:
+            connection.execute(
+                sa.text('insert into {0} (key, value) values (:key, :value)'.format(self.table)),
+                **params
+            )
+
+
+class Cache(object):
+    """In-process cache in front of a shared cache, namespaced by data
+    generation.
+
+    :param str namespace: Prefix distinguishing this cache's keys
+    :param int ttl: Default time to live of entries, in seconds
+    :param shared: Cache shared between workers
+    :param generations: Store of generation counters shared between instances
+    """
+
+    def __init__(self, namespace, ttl=DEFAULT_TTL, max_size=1024, shared=None, generations=None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local = MemoryCache(max_size=max_size)
+        self.shared = shared if shared is not None else shared_cache
+        self.generations = generations if generations is not None else generation_store
+
+    def get(self, key, scope=None):
+        key = self._make_key(key, scope)
+        value = self.local.get(key)
+        if value is None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value, ttl=self.ttl)
+        return value
+
+    def set(self, key, value, ttl=None, shared=True, scope=None):
+        """Store `value` in process, and, if `shared`, in the shared cache,
+        which takes a write lock across all workers.
+
+        :param str scope: Scope of the data `value` is derived from, if any
+        """
+        key = self._make_key(key, scope)
+        ttl = ttl or self.ttl
+        self.local.set(key, value, ttl=ttl)
+        if shared:
+            self.shared.set(key, value, ttl=ttl)
+
+    def _make_key(self, key, scope=None):
+        return make_key(self.namespace, get_generations(self.generations, scope), key)
+
+
+shared_cache = SqliteCache(os.getenv('FEC_CACHE_PATH', DEFAULT_PATH))
+generation_store = DatabaseStore()
+_generations = {}
+
+
+def _get_keys(scope):
+    if scope is None:
+        return GENERATION_KEY, REFRESHED_KEY
+    return '{0}:{1}'.format(GENERATION_KEY, scope), '{0}:{1}'.format(REFRESHED_KEY, scope)
+
+
+def _check_generation(store=None, scope=None):
+    """Re-read the shared generation counter and refresh time of `scope` at
+    most once every `GENERATION_CHECK_INTERVAL` seconds.
+    """
+    store = store if store is not None else generation_store
+    generation = _generations.setdefault(scope, {'value': 0, 'refreshed': None, 'checked': None})
+    now = time.time()
+    checked = generation['checked']
+    if checked is None or now - checked >= GENERATION_CHECK_INTERVAL:
+        generation_key, refreshed_key = _get_keys(scope)
+        generation['value'] = store.get(generation_key) or 0
+        generation['refreshed'] = store.get(refreshed_key)
+        generation['checked'] = now
+    return generation
+
+
+def get_generation(store=None, scope=None):
+    """Get the current data generation, or the generation of `scope`."""
+    return _check_generation(store, scope)['value']
+
+
+def get_generations(store=None, scope=None):
+    """Get the generations that values cached under `scope` depend on: the
+    global generation, and the generation of `scope` if given.
+    """
+    generations = (get_generation(store), )
+    if scope is not None:
+        generations += (get_generation(store, scope), )
+    return generations
+
+
+def get_refreshed(store=None, scope=None):
+    """Get the time of the last data refresh, including refreshes of `scope`
+    if given, as a UNIX timestamp, or `None` if data have not been refreshed
+    since the cache was created.
+    """
+    times = [_check_generation(store)['refreshed']]
+    if scope is not None:
+        times.append(_check_generation(store, scope)['refreshed'])
+    times = [each for each in times if each is not None]
+    return max(times) if times else None
+
+
+def bump_generation(store=None, scope=None):
+    """Invalidate all cached values, or, if `scope` is given, values cached
+    under `scope`; call after refreshing data.
+    """
+    store = store if store is not None else generation_store
+    generation_key, refreshed_key = _get_keys(scope)
+    value = store.incr(generation_key)
+    refreshed = time.time()
+    store.set(refreshed_key, refreshed)
+    _generations[scope] = {'value': value or 0, 'refreshed': refreshed, 'checked': refreshed}
+    return value
@@ -0,0 +1,42 @@
+"""Resolve committee types, which determine the tables holding a committee's
+reports and totals. Types only change when data are refreshed, so resolved
+types are cached until the next refresh.
+"""
+
+import os
+
+import flask
+import sqlalchemy as sa
+
+from webservices.common import cache
+from webservices.common import models
+
+
+type_cache = cache.Cache(
+    'committee_types',
+    max_size=int(os.getenv('FEC_COMMITTEE_TYPE_CACHE_SIZE', 4096)),
+)
+
+
+def get_committee_type(committee_id, cycles=None):
+    """Get the type of a committee in its most recent cycle, optionally
+    restricted to `cycles`. Aborts with 404 if the committee has no history in
+    those cycles.
+    """
+    key = (committee_id, sorted(cycles or []))
+    cached = type_cache.get(key)
+    if cached is not None:
+        return cached['committee_type']
+    query = models.CommitteeHistory.query.with_entities(
+        models.CommitteeHistory.committee_type,
+    ).filter(
+        models.CommitteeHistory.committee_id == committee_id,
+    )
+    if cycles:
+        query = query.filter(models.CommitteeHistory.cycle.in_(cycles))
+    row = query.order_by(sa.desc(models.CommitteeHistory.cycle)).first()
+    if row is None:
+        flask.abort(404)
+    # Wrap the type so that null types are distinguishable from cache misses
+    type_cache.set(key, {'committee_type': row.committee_type})
+    return row.committee_type
@@ -1,45 +1,244 @@
-"""Approximate query count based on ANALYZE output for PostgreSQL and SQLAlchemy.
+"""Approximate query count based on EXPLAIN output for PostgreSQL and SQLAlchemy.
 
 Count logic borrowed from https://wiki.postgresql.org/wiki/Count_estimate
 ANALYZE borrowed from https://bitbucket.org/zzzeek/sqlalchemy/wiki/UsageRecipes/Explain
 """
 
-import re
+import os
+import math
+import json
+import time
+import random
+import collections
 
 from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.sql.expression import Executable, ClauseElement, _literal_as_text
 
+from webservices.common import cache
 
-count_pattern = re.compile(r'rows=(\d+)')
 
+EXACT = 'exact'
+ESTIMATE = 'estimate'
+CACHED = 'cached'
+SKIP = 'skip'
+COUNT_MODES = [EXACT, ESTIMATE, CACHED, SKIP]
 
-def count_estimate(query, session, threshold=None):
-    rows = session.execute(explain(query)).fetchall()
-    count = extract_analyze_count(rows)
-    if threshold is not None and count < threshold:
-        return query.count()
+ESTIMATE_THRESHOLD = 5000
+
+count_cache = cache.Cache(
+    'counts',
+    ttl=int(os.getenv('FEC_COUNT_CACHE_TTL', 60 * 60)),
+    max_size=int(os.getenv('FEC_COUNT_CACHE_SIZE', 1024)),
+)
+# Counts taking at least this many seconds are shared with other workers;
+# cheaper counts are only cached in process
+SHARED_COUNT_SECONDS = float(os.getenv('FEC_COUNT_CACHE_SHARED_SECONDS', 1))
+
+
+def get_count(counter, mode=EXACT, threshold=None, key=None, scope=None):
+    """Count results using the given strategy.
+
+    :param counter: `QueryCounter` of the query to count, which should not
+        have ordering or limits
+    :param str mode: One of `exact`, `estimate` (from the query planner, falling
+        back to an exact count below `threshold`), `cached` (exact count cached
+        on the normalized query; see `count_cached`), or `skip`
+    :param str key: Optional key under which to track accuracy of estimates
+    :param str scope: Cache scope of the counted data; see `cache.Cache`
+    :returns: Count, or `None` if counting is skipped
+    """
+    if mode == SKIP:
+        return None
+    if mode == ESTIMATE:
+        return count_estimate(counter, threshold=threshold, key=key)
+    if mode == CACHED:
+        return count_cached(counter, scope=scope)
+    # Store exact counts so that later pages of the same results can reuse them
+    return store_count(counter, counter.get_key(), scope=scope)
+
+
+class QueryCounter(object):
+    """Count results of a SQLAlchemy query for the counting strategies, which
+    may also count results of `statements.Statement` using a counter with the
+    same methods.
+    """
+
+    def __init__(self, query):
+        self.query = query
+
+    def get_key(self):
+        return get_cache_key(self.query)
+
+    def count(self):
+        return self.query.count()
+
+    def explain(self):
+        """Get the JSON query plan of the count."""
+        query = get_count_query(self.query)
+        return self.query.session.execute(explain(query, format='json')).fetchall()
+
+
+def get_count_query(query):
+    """Drop ordering and eager loads from `query`; eager loads add outer joins
+    that don't change the count but do confuse the planner's estimate.
+    """
+    return query.enable_eagerloads(False).order_by(None)
+
+
+def get_cache_key(query):
+    """Build a key identifying the filters of `query`, ignoring ordering and
+    limits, from its compiled SQL and bound parameters.
+    """
+    query = query.order_by(None).limit(None).offset(None)
+    compiled = query.statement.compile(dialect=query.session.bind.dialect)
+    params = sorted((key, repr(value)) for key, value in compiled.params.items())
+    return str(compiled), tuple(params)
+
+
+def count_cached(counter, scope=None):
+    """Count results, reusing counts of queries with identical filters until
+    the cache expires or data is refreshed.
+    """
+    key = counter.get_key()
+    count = count_cache.get(key, scope=scope)
+    if count is None:
+        count = store_count(counter, key, scope=scope)
+    return count
+
+
+def store_count(counter, key, scope=None):
+    """Count results and cache the count under `key`, sharing it with other
+    workers only if it was expensive to compute.
+    """
+    start = time.time()
+    count = counter.count()
+    count_cache.set(key, count, shared=time.time() - start >= SHARED_COUNT_SECONDS, scope=scope)
+    return count
+
+
+# Plan nodes that pass rows through from their first child unchanged
+PASSTHROUGH_NODES = {'Limit', 'Sort', 'Incremental Sort', 'Gather', 'Gather Merge', 'Materialize', 'Result'}
+
+ESTIMATE_SAMPLE_RATE = float(os.getenv('FEC_ESTIMATE_SAMPLE_RATE', 0.01))
+ESTIMATE_MIN_SAMPLES = 5
+ESTIMATE_TOLERANCE = 0.1
+MIN_THRESHOLD = 500
+MAX_THRESHOLD = 100000
+
+
+class EstimateStats(object):
+    """Track the error of planner estimates for one endpoint, and adapt the
+    threshold below which estimates are replaced by exact counts.
+
+    Errors are exponentially weighted so that stats follow changes in the data
+    and in table statistics.
+
+    :param int threshold: Initial threshold
+    :param float alpha: Weight of the most recent observation
+    """
+
+    def __init__(self, threshold=ESTIMATE_THRESHOLD, alpha=0.2):
+        self.threshold = threshold
+        self.alpha = alpha
+        self.samples = 0
+        self.log_ratio = 0.0
+        self.error = 0.0
+
+    @property
+    def ratio(self):
+        """Learned ratio of actual to estimated counts."""
+        if self.samples < ESTIMATE_MIN_SAMPLES:
+            return 1.0
+        return math.exp(self.log_ratio)
+
+    def correct(self, estimate):
+        return int(round(estimate * self.ratio))
+
+    def observe(self, estimate, actual):
+        log_ratio = math.log(max(actual, 1) / max(estimate, 1))
+        error = abs(actual - self.correct(estimate)) / max(actual, 1)
+        if self.samples:
+            self.log_ratio += self.alpha * (log_ratio - self.log_ratio)
+            self.error += self.alpha * (error - self.error)
+        else:
+            self.log_ratio, self.error = log_ratio, error
+        self.samples += 1
+        # Trust estimates on more queries while they are accurate; fall back
+        # to exact counts on more queries while they are not
+        if self.error > ESTIMATE_TOLERANCE:
+            self.threshold = min(self.threshold * 2, MAX_THRESHOLD)
+        else:
+            self.threshold = max(self.threshold // 2, MIN_THRESHOLD)
+
+
+estimate_stats = collections.defaultdict(EstimateStats)
+
+
+def count_estimate(counter, threshold=None, key=None):
+    """Estimate the count of results from the query planner.
+
+    :param counter: `QueryCounter` of the query to count
+    :param int threshold: Count exactly if the estimate is below this value;
+        if not provided, use the adaptive threshold for `key`
+    :param str key: Optional key, such as the endpoint name, under which to
+        track the accuracy of estimates
+    """
+    stats = estimate_stats[key] if key is not None else None
+    estimate = extract_plan_count(counter.explain())
+    count = stats.correct(estimate) if stats else estimate
+    if threshold is None:
+        threshold = stats.threshold if stats else ESTIMATE_THRESHOLD
+    if count < threshold or (stats and random.random() < ESTIMATE_SAMPLE_RATE):
+        count = counter.count()
+        if stats:
+            stats.observe(estimate, count)
     return count
 
 
-def extract_analyze_count(rows):
-    for row in rows:
-        match = count_pattern.search(row[0])
-        if match:
-            return int(match.groups()[0])
+def extract_plan_count(rows):
+    plan = rows[0][0]
+    # Older drivers return JSON plans as text
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(get_count_node(plan[0]['Plan'])['Plan Rows'])
+
+
+def get_count_node(node):
+    """Find the plan node whose row estimate matches the count of the query,
+    skipping nodes that only pass rows through and the inner side of left
+    joins, which cannot change the number of rows when joining on a key.
+    """
+    while True:
+        children = node.get('Plans', [])
+        if node['Node Type'] in PASSTHROUGH_NODES and children:
+            node = children[0]
+        elif node.get('Join Type') == 'Left' and children:
+            node = next(
+                (child for child in children if child.get('Parent Relationship') == 'Outer'),
+                children[0],
+            )
+        else:
+            return node
 
 
 class explain(Executable, ClauseElement):
-    def __init__(self, stmt, analyze=False):
+    def __init__(self, stmt, analyze=False, format=None):
         self.statement = _literal_as_text(stmt)
         self.analyze = analyze
+        self.format = format
         # helps with INSERT statements
         self.inline = getattr(stmt, 'inline', None)
 
 
 @compiles(explain, 'postgresql')
 def pg_explain(element, compiler, **kw):
-    text = 'EXPLAIN '
+    options = []
     if element.analyze:
-        text += 'ANALYZE '
+        options.append('ANALYZE')
+    if element.format:
+        options.append('FORMAT {0}'.format(element.format.upper()))
+    text = 'EXPLAIN '
+    if options:
+        text += '({0}) '.format(', '.join(options))
     text += compiler.process(element.statement, **kw)
     return text
@@ -0,0 +1,177 @@
+"""Refresh materialized views in parallel, in dependency order.
+
+Dependencies between materialized views are read from `pg_depend`. Each view
+is refreshed on its own connection once all views it selects from have been
+refreshed, so independent views refresh in parallel. Views with a unique index
+are refreshed concurrently, so that reads are not blocked. Failed refreshes are
+retried; views depending on a view that still fails are skipped.
+"""
+
+import os
+import time
+import logging
+import collections
+from concurrent import futures
+
+import sqlalchemy as sa
+
+from webservices.common.models import db
+
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv('FEC_REFRESH_WORKERS', 4))
+RETRIES = int(os.getenv('FEC_REFRESH_RETRIES', 2))
+# Seconds to wait before the first retry; doubled for each later retry
+RETRY_DELAY = int(os.getenv('FEC_REFRESH_RETRY_DELAY', 30))
+
+Result = collections.namedtuple('Result', ['view', 'seconds', 'attempts', 'error'])
+
+
+def get_views(connection, schema='public'):
+    """Get the materialized views in `schema`.
+
+    :returns: Dictionary mapping view names to whether the view has a unique
+        index, which concurrent refreshes require
+    """
+    rows = connection.execute(
+        sa.text('''
+            select
+                c.relname,
+                exists(
+                    select 1 from pg_index i
+                    where i.indrelid = c.oid and i.indisunique
+                )
+            from pg_class c
+            join pg_namespace n on c.relnamespace = n.oid
+            where c.relkind = 'm' and n.nspname = :schema
+        '''),
+        schema=schema,
+    )
+    return dict(rows.fetchall())
+
+
+def get_dependencies(connection, schema='public'):
+    """Get the materialized views that each materialized view in `schema`
+    selects from directly.
+
+    :returns: Dictionary mapping view names to sets of view names
+    """
+    rows = connection.execute(
+        sa.text('''
+            select distinct dependent.relname, source.relname
+            from pg_depend d
+            join pg_rewrite r on d.objid = r.oid
+            join pg_class dependent on r.ev_class = dependent.oid
+            join pg_class source on d.refobjid = source.oid
+            join pg_namespace n on dependent.relnamespace = n.oid
+            where dependent.relkind = 'm'
+            and source.relkind = 'm'
+            and dependent.oid != source.oid
+            and n.nspname = :schema
+        '''),
+        schema=schema,
+    )
+    dependencies = collections.defaultdict(set)
+    for view, source in rows:
+        dependencies[view].add(source)
+    return dependencies
+
+
+def refresh_view(engine, view, concurrently=True, retries=RETRIES, schema='public'):
+    """Refresh `view`, retrying on database errors.
+
+    :returns: `Result` of the refresh
+    """
+    name = '{0}.{1}'.format(
+        engine.dialect.identifier_preparer.quote(schema),
+        engine.dialect.identifier_preparer.quote(view),
+    )
+    statement = 'refresh materialized view {0}{1}'.format('concurrently ' if concurrently else '', name)
+    start = time.time()
+    for attempt in range(1, retries + 2):
+        try:
+            with engine.connect() as connection:
+                with connection.begin():
+                    connection.execute(statement)
+            return Result(view, time.time() - start, attempt, None)
+        except sa.exc.DBAPIError as error:
+            logger.warning('Refresh of %s failed on attempt %d: %s', view, attempt, error)
+            if attempt > retries:
+                return Result(view, time.time() - start, attempt, error)
+            time.sleep(RETRY_DELAY * 2 ** (attempt - 1))
+
+
+def refresh_all(workers=WORKERS, retries=RETRIES, schema='public'):
+    """Refresh all materialized views in `schema`, each after the views it
+    depends on, using up to `workers` connections at once.
+
+    :returns: List of `Result` for each view, in order of completion
+    """
+    engine = db.engine
+    with engine.connect() as connection:
+        views = get_views(connection, schema)
+        dependencies = get_dependencies(connection, schema)
+    return run(
+        views,
+        dependencies,
+        lambda view: refresh_view(engine, view, views[view], retries, schema),
+        workers=workers,
+    )
+
+
+def run(views, dependencies, refresh, workers=WORKERS):
+    """Call `refresh` on each of `views` in a thread pool, once `refresh` has
+    succeeded for all of its dependencies.
+
+    :param views: Names of views
+    :param dict dependencies: Mapping of view names to sets of view names
+    :param refresh: Function refreshing a view and returning its `Result`
+    :returns: List of `Result` for each view, in order of completion
+    """
+    pending = {
+        view: set(dependencies.get(view, ())) & set(views)
+        for view in views
+    }
+    results = []
+    running = {}
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        while pending or running:
+            for view in sorted(view for view, waiting in pending.items() if not waiting):
+                del pending[view]
+                running[executor.submit(refresh, view)] = view
+            if not running:
+                # Remaining views depend on each other; this should not happen
+                for view in sorted(pending):
+                    results.append(Result(view, 0, 0, 'dependency cycle'))
+                break
+            done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                view = running.pop(future)
+                result = future.result()
+                results.append(result)
+                if result.error is None:
+                    logger.info('Refreshed %s in %.1f seconds', view, result.seconds)
+                    for waiting in pending.values():
+                        waiting.discard(view)
+                else:
+                    results.extend(_skip_dependents(pending, view))
+    return results
+
+
+def _skip_dependents(pending, failed):
+    """Remove views depending directly or indirectly on `failed` from
+    `pending`.
+
+    :returns: List of `Result` for skipped views
+    """
+    skipped = []
+    failed = {failed}
+    while True:
+        dependents = [view for view, waiting in pending.items() if waiting & failed]
+        if not dependents:
+            return skipped
+        for view in sorted(dependents):
+            del pending[view]
+            failed.add(view)
+            skipped.append(Result(view, 0, 0, 'skipped after failed dependency'))
@@ -21,6 +21,7 @@ class CandidateSearch(BaseModel):
     name = db.Column(db.String)
     office_sought = db.Column(db.String)
     fulltxt = db.Column(TSVECTOR)
+    receipts = db.Column(db.Float)
 
 
 class CommitteeSearch(BaseModel):
@@ -29,6 +30,7 @@ class CommitteeSearch(BaseModel):
     id = db.Column(db.String)
     name = db.Column(db.String)
     fulltxt = db.Column(TSVECTOR)
+    receipts = db.Column(db.Float)
 
 
 class BaseCandidate(BaseModel):
@@ -598,6 +600,71 @@ class CommitteeTotalsIEOnly(BaseModel):
     total_independent_expenditures = db.Column(db.Integer)
 
 
+class CommitteeTotalsCombined(BaseModel):
+    """Totals of committees of all types, restricted to common columns."""
+    __tablename__ = 'ofec_totals_combined_mv'
+
+    committee_id = db.Column(db.String, index=True)
+    committee_name = db.Column(db.String)
+    committee_type = db.Column(db.String, index=True)
+    committee_type_full = db.Column(db.String)
+    committee_designation = db.Column(db.String)
+    cycle = db.Column(db.Integer, index=True)
+    coverage_start_date = db.Column(db.DateTime)
+    coverage_end_date = db.Column(db.DateTime)
+    receipts = db.Column(db.Integer, index=True)
+    disbursements = db.Column(db.Integer, index=True)
+    contributions = db.Column(db.Integer)
+    contribution_refunds = db.Column(db.Integer)
+    individual_contributions = db.Column(db.Integer)
+    individual_itemized_contributions = db.Column(db.Integer)
+    individual_unitemized_contributions = db.Column(db.Integer)
+    operating_expenditures = db.Column(db.Integer)
+    net_contributions = db.Column(db.Integer)
+    net_operating_expenditures = db.Column(db.Integer)
+    other_political_committee_contributions = db.Column(db.Integer)
+    political_party_committee_contributions = db.Column(db.Integer)
+    independent_expenditures = db.Column(db.Integer)
+
+
+class CommitteeReportsCombined(BaseModel):
+    """Reports of committees of all types, restricted to common columns."""
+    __tablename__ = 'ofec_reports_combined_mv'
+
+    committee_id = db.Column(db.String, index=True)
+    committee_name = db.Column(db.String)
+    committee_type = db.Column(db.String, index=True)
+    committee_type_full = db.Column(db.String)
+    committee_designation = db.Column(db.String)
+    cycle = db.Column(db.Integer, index=True)
+    report_year = db.Column(db.Integer, index=True)
+    report_type = db.Column(db.String, index=True)
+    report_type_full = db.Column(db.String)
+    coverage_start_date = db.Column(db.DateTime)
+    coverage_end_date = db.Column(db.DateTime, index=True)
+    beginning_image_number = db.Column(db.BigInteger)
+    end_image_number = db.Column(db.BigInteger)
+    expire_date = db.Column(db.DateTime)
+    total_receipts_period = db.Column(db.Integer, index=True)
+    total_disbursements_period = db.Column(db.Integer)
+    total_contributions_period = db.Column(db.Integer)
+    cash_on_hand_beginning_period = db.Column(db.Integer)
+    cash_on_hand_end_period = db.Column(db.Integer)
+    debts_owed_by_committee = db.Column(db.Integer)
+    debts_owed_to_committee = db.Column(db.Integer)
+
+    @property
+    def pdf_url(self):
+        if self.report_year is None:
+            return None
+        # House records start May 1996, Senate records start May 2000, and all
+        # other records start May 1993
+        start_year = {'H': 1996, 'S': 2000}.get(self.committee_type, 1993)
+        if self.report_year < start_year:
+            return None
+        return utils.make_report_pdf_url(self.beginning_image_number)
+
+
 class ScheduleA(db.Model):
     __tablename__ = 'sched_a'
 
@@ -680,32 +747,82 @@ class ScheduleASearch(db.Model):
     __tablename__ = 'ofec_sched_a_fulltext'
 
     sched_a_sk = db.Column(db.Integer, primary_key=True)
+    committee_id = db.Column('cmte_id', db.String)
+    report_year = db.Column('rpt_yr', db.Integer)
+    contributor_receipt_date = db.Column('contb_receipt_dt', db.DateTime)
+    contributor_receipt_amount = db.Column('contb_receipt_amt', db.Float)
     contributor_name_text = db.Column(TSVECTOR)
     contributor_employer_text = db.Column(TSVECTOR)
 
 
-class BaseAggregate(db.Model):
+class BaseAggregate(BaseModel):
     __abstract__ = True
 
-    committee_id = db.Column('cmte_id', db.String, primary_key=True)
-    cycle = db.Column(db.Integer, primary_key=True)
-    total = db.Column(db.Float)
-    count = db.Column(db.Integer)
+    committee_id = db.Column('cmte_id', db.String, index=True)
+    cycle = db.Column(db.Integer, index=True)
+    total = db.Column(db.Float, index=True)
+    count = db.Column(db.Integer, index=True)
 
 
 class ScheduleABySize(BaseAggregate):
     __tablename__ = 'ofec_sched_a_aggregate_size'
-    size = db.Column(db.Integer, primary_key=True)
+    size = db.Column(db.Integer, index=True)
 
 
 class ScheduleAByState(BaseAggregate):
     __tablename__ = 'ofec_sched_a_aggregate_state'
-    state = db.Column(db.String, primary_key=True)
+    state = db.Column(db.String, index=True)
 
 
 class ScheduleAByZip(BaseAggregate):
     __tablename__ = 'ofec_sched_a_aggregate_zip'
-    zip = db.Column(db.String, primary_key=True)
+    zip = db.Column(db.String, index=True)
+
+
+class ScheduleAByEmployer(BaseAggregate):
+    __tablename__ = 'ofec_sched_a_aggregate_employer'
+    employer = db.Column(db.String, index=True)
+
+
+class ScheduleAByOccupation(BaseAggregate):
+    __tablename__ = 'ofec_sched_a_aggregate_occupation'
+    occupation = db.Column(db.String, index=True)
+
+
+class ScheduleAByContributor(BaseAggregate):
+    __tablename__ = 'ofec_sched_a_aggregate_contributor'
+    contributor_id = db.Column(db.String, index=True)
+    contributor_name = db.Column(db.String, index=True)
+
+
+class ScheduleAByDate(BaseAggregate):
+    __tablename__ = 'ofec_sched_a_aggregate_date'
+    month = db.Column(db.Date, index=True)
+
+
+class ScheduleBByRecipient(BaseAggregate):
+    __tablename__ = 'ofec_sched_b_aggregate_recipient'
+    recipient_name = db.Column(db.String, index=True)
+
+
+class ScheduleBByRecipientId(BaseAggregate):
+    __tablename__ = 'ofec_sched_b_aggregate_recipient_id'
+    recipient_id = db.Column(db.String, index=True)
+
+
+class ScheduleBByState(BaseAggregate):
+    __tablename__ = 'ofec_sched_b_aggregate_state'
+    state = db.Column(db.String, index=True)
+
+
+class ScheduleBByPurpose(BaseAggregate):
+    __tablename__ = 'ofec_sched_b_aggregate_purpose'
+    purpose = db.Column(db.String, index=True)
+
+
+class ScheduleBByDate(BaseAggregate):
+    __tablename__ = 'ofec_sched_b_aggregate_date'
+    month = db.Column(db.Date, index=True)
 
 
 class ScheduleB(db.Model):
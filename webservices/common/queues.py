@@ -0,0 +1,193 @@
+"""Apply changes to Schedules A and B to aggregate and fulltext tables in
+bounded batches.
+
+Triggers copy inserted, updated, and deleted rows into the queue tables
+`ofec_<schedule>_queue_new` and `ofec_<schedule>_queue_old`. Each batch covers
+the queued rows with keys below a bound chosen so that the batch holds about
+`BATCH_SIZE` rows. A batch's updates and the deletion of its queued rows run
+in a single repeatable read transaction, so rows queued while the batch runs
+are left for the next batch, and only queued rows are locked.
+
+Consumers and rebuilds of the aggregate tables hold an advisory lock, so that
+only one of them changes the aggregates or the queues at a time.
+"""
+
+import os
+import logging
+import contextlib
+import collections
+
+import sqlalchemy as sa
+
+from webservices.common import sqlfiles
+from webservices.common.models import db
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = int(os.getenv('FEC_QUEUE_BATCH_SIZE', 10000))
+# Key of the advisory lock serializing consumers and rebuilds
+LOCK_KEY = 5138
+
+# Functions applying queued changes to each schedule, which take the bounds of
+# the batch of keys to process
+QUEUES = collections.OrderedDict([
+    ('sched_a', [
+        'ofec_sched_a_update_aggregate_zip',
+        'ofec_sched_a_update_aggregate_state',
+        'ofec_sched_a_update_aggregate_size',
+        'ofec_sched_a_update_aggregate_employer',
+        'ofec_sched_a_update_aggregate_occupation',
+        'ofec_sched_a_update_aggregate_contributor',
+        'ofec_sched_a_update_aggregate_date',
+        'ofec_sched_a_update_fulltext',
+    ]),
+    ('sched_b', [
+        'ofec_sched_b_update_aggregate_recipient',
+        'ofec_sched_b_update_aggregate_recipient_id',
+        'ofec_sched_b_update_aggregate_state',
+        'ofec_sched_b_update_aggregate_purpose',
+        'ofec_sched_b_update_aggregate_date',
+        'ofec_sched_b_update_fulltext',
+    ]),
+])
+
+
+def get_batch_bounds(connection, schedule, batch_size):
+    """Get the lowest queued key and the key ending the next batch. The end key
+    is `None` if all queued rows fit in the batch.
+    """
+    return connection.execute(
+        sa.text('''
+            with queued as (
+                select {key} as key from ofec_{schedule}_queue_new
+                union all
+                select {key} as key from ofec_{schedule}_queue_old
+            )
+            select
+                (select min(key) from queued),
+                (select key from queued order by key offset :batch_size limit 1)
+        '''.format(schedule=schedule, key=schedule + '_sk')),
+        batch_size=batch_size,
+    ).fetchone()
+
+
+def process_batch(connection, schedule, batch_size=BATCH_SIZE):
+    """Apply and remove the next batch of queued changes to `schedule`.
+
+    :returns: Tuple of the number of queued rows processed and whether the
+        queues were empty after the batch, as of the start of the transaction
+    """
+    start, stop = get_batch_bounds(connection, schedule, batch_size)
+    if start is None:
+        return 0, True
+    if stop == start:
+        # All rows in the batch share a key; include them all
+        stop = start + 1
+    for function in QUEUES[schedule]:
+        connection.execute(
+            sa.text('select {0}(null, :stop)'.format(function)),
+            stop=stop,
+        )
+    count = 0
+    for queue in ('new', 'old'):
+        result = connection.execute(
+            sa.text(
+                'delete from ofec_{schedule}_queue_{queue} where in_batch({key}, null, :stop)'.format(
+                    schedule=schedule,
+                    queue=queue,
+                    key=schedule + '_sk',
+                )
+            ),
+            stop=stop,
+        )
+        count += result.rowcount
+    return count, stop is None
+
+
+@contextlib.contextmanager
+def lock(connection, wait=True):
+    """Hold the advisory lock on `connection`, outside of any transaction.
+
+    :param bool wait: Wait for the lock if another session holds it, rather
+        than giving up
+    :returns: Context manager yielding whether the lock is held
+    """
+    if wait:
+        connection.execute(sa.text('select pg_advisory_lock(:key)').execution_options(autocommit=True), key=LOCK_KEY)
+        locked = True
+    else:
+        locked = connection.execute(
+            sa.text('select pg_try_advisory_lock(:key)').execution_options(autocommit=True),
+            key=LOCK_KEY,
+        ).scalar()
+    try:
+        yield locked
+    finally:
+        if locked:
+            connection.execute(
+                sa.text('select pg_advisory_unlock(:key)').execution_options(autocommit=True),
+                key=LOCK_KEY,
+            )
+
+
+@contextlib.contextmanager
+def connect():
+    """Connect at the isolation level of consumers and rebuilds."""
+    with db.engine.connect() as connection:
+        yield connection.execution_options(isolation_level='REPEATABLE READ')
+
+
+def consume(connection, schedule, batch_size=BATCH_SIZE):
+    """Process batches of queued changes to `schedule` until the queues are
+    empty, ignoring changes queued after processing starts on the last batch.
+    The caller must hold the lock on `connection`.
+
+    :returns: Number of queued rows processed
+    """
+    total = 0
+    while True:
+        with connection.begin():
+            count, drained = process_batch(connection, schedule, batch_size)
+        total += count
+        logger.info('Processed %d queued changes to %s', count, schedule)
+        if drained:
+            return total
+
+
+def consume_all(batch_size=BATCH_SIZE):
+    """Process queued changes to all schedules, unless another consumer or a
+    rebuild holds the lock; queued changes are then left for the next run.
+
+    :returns: Number of queued rows processed
+    """
+    with connect() as connection:
+        with lock(connection, wait=False) as locked:
+            if not locked:
+                logger.info('Skipped processing queued changes; lock is held')
+                return 0
+            return sum(consume(connection, schedule, batch_size) for schedule in QUEUES)
+
+
+def rebuild(paths, params):
+    """Rebuild aggregate tables by running the SQL files `paths` in a single
+    repeatable read transaction, holding the lock. Rebuilt aggregates include
+    the queued changes visible to the transaction, so the transaction also
+    applies those changes to fulltext tables and removes them from the
+    queues; changes queued later are left for consumers.
+
+    :param dict params: Parameters of the SQL files
+    """
+    with connect() as connection:
+        with lock(connection):
+            with connection.begin():
+                sqlfiles.run(
+                    paths,
+                    lambda path: connection.execute(sa.text(sqlfiles.read_sql(path)), **params),
+                )
+                for schedule, functions in QUEUES.items():
+                    for function in functions:
+                        if function.endswith('_fulltext'):
+                            connection.execute('select {0}()'.format(function))
+                    for queue in ('new', 'old'):
+                        connection.execute('delete from ofec_{0}_queue_{1}'.format(schedule, queue))
@@ -0,0 +1,128 @@
+"""Run SQL files in parallel, in the order implied by the relations and
+functions they create and use.
+
+A file depends on every other file that creates a view, table, function, or
+extension whose name it mentions. Files can also declare names they use
+without mentioning them, such as extensions providing index operators, in
+comments like `-- Requires: pg_trgm`. Files run in a process pool as soon as
+the files they depend on have finished, and no further files start after a
+file fails.
+"""
+
+import re
+import collections
+from concurrent import futures
+
+
+CREATE_PATTERN = re.compile(
+    r'create\s+(?:or\s+replace\s+)?(?:materialized\s+view|view|table|function|extension)\s+'
+    r'(?:if\s+not\s+exists\s+)?(?:\w+\.)?(\w+)'
+)
+NAME_PATTERN = re.compile(r'\w+')
+COMMENT_PATTERN = re.compile(r'--.*$', re.MULTILINE)
+REQUIRES_PATTERN = re.compile(r'^--\s*requires:(.*)$', re.MULTILINE | re.IGNORECASE)
+
+
+class DependencyError(Exception):
+    pass
+
+
+def read_sql(path):
+    """Read SQL from `path`, skipping lines that are comments."""
+    with open(path) as fp:
+        return '\n'.join([
+            line for line in fp.readlines()
+            if not line.startswith('--')
+        ])
+
+
+def get_created(sql):
+    """Get the names of views, tables, functions, and extensions created by
+    `sql`.
+    """
+    return set(CREATE_PATTERN.findall(COMMENT_PATTERN.sub('', sql).lower()))
+
+
+def get_required(sql):
+    """Get the names mentioned by `sql` or declared in `Requires` comments."""
+    names = set(NAME_PATTERN.findall(COMMENT_PATTERN.sub('', sql).lower()))
+    for declared in REQUIRES_PATTERN.findall(sql):
+        names.update(NAME_PATTERN.findall(declared.lower()))
+    return names
+
+
+def get_dependencies(sources):
+    """Infer dependencies between SQL files from the names they create and
+    require.
+
+    :param dict sources: Mapping of paths to SQL, including comments
+    :returns: Mapping of paths to sets of paths they depend on
+    """
+    creators = collections.defaultdict(set)
+    for path, sql in sources.items():
+        for name in get_created(sql):
+            creators[name].add(path)
+    dependencies = {}
+    for path, sql in sources.items():
+        dependencies[path] = {
+            creator
+            for name in get_required(sql)
+            for creator in creators.get(name, ())
+            if creator != path
+        }
+    return dependencies
+
+
+def get_order(dependencies):
+    """Sort paths so that each path follows the paths it depends on.
+
+    :raises: `DependencyError` if dependencies are circular
+    """
+    pending = {path: set(required) for path, required in dependencies.items()}
+    order = []
+    while pending:
+        ready = sorted(path for path, required in pending.items() if not required)
+        if not ready:
+            raise DependencyError('Circular dependencies between {0}'.format(', '.join(sorted(pending))))
+        for path in ready:
+            del pending[path]
+            for required in pending.values():
+                required.discard(path)
+        order.extend(ready)
+    return order
+
+
+def run(paths, execute, processes=1):
+    """Call `execute` on each of `paths`, after it has returned for all paths
+    that the path depends on, using up to `processes` processes. `execute`
+    must be a module-level function, so that it can be sent to other
+    processes.
+
+    :raises: `DependencyError` if dependencies are circular, or the first
+        exception raised by `execute`, after waiting for running files
+    """
+    sources = {}
+    for path in paths:
+        with open(path) as fp:
+            sources[path] = fp.read()
+    dependencies = get_dependencies(sources)
+    order = get_order(dependencies)
+    if processes <= 1:
+        for path in order:
+            execute(path)
+        return order
+    pending = {path: dependencies[path] for path in order}
+    running = {}
+    with futures.ProcessPoolExecutor(max_workers=processes) as executor:
+        while pending or running:
+            for path in sorted(path for path, required in pending.items() if not required):
+                del pending[path]
+                running[executor.submit(execute, path)] = path
+            done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                path = running.pop(future)
+                # Re-raise failures; leaving the pool waits for running files
+                future.result()
+                for required in pending.values():
+                    required.discard(path)
+    return order
@@ -0,0 +1,197 @@
+"""In-process indexes of candidate and committee names for typeahead search.
+
+Each index maps the words of every name to the names containing them, and
+answers a query by intersecting the names matching each query word as a
+prefix, ranking heavier names by receipts first. Indexes are loaded in a background thread when each process starts
+serving requests, and reloaded in the background when the data generation
+changes after a refresh, so that no request waits for a load. Callers fall
+back to fulltext search in the database while an index is loading, when it
+has no matches, or when the query looks like an FEC ID or an acronym, since
+the fulltext columns also cover IDs and acronyms that are not indexed here.
+"""
+
+import os
+import re
+import time
+import heapq
+import bisect
+import logging
+import threading
+import contextlib
+from array import array
+
+from webservices.common import cache
+from webservices.common import models
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before retrying a failed load
+RETRY_INTERVAL = int(os.getenv('FEC_TYPEAHEAD_RETRY_INTERVAL', 60))
+
+WORD = re.compile(r'\w+', re.UNICODE)
+# Sorts after all words starting with a given prefix
+MAX_CHAR = '\U0010ffff'
+# FEC IDs of committees and candidates, such as C00123456 or H4NY12345
+IDENTIFIER = re.compile(r'^[chps]\d[a-z0-9]*$', re.IGNORECASE)
+# Acronyms typed in capitals, such as DNC
+ACRONYM = re.compile(r'^[A-Z]{2,8}$')
+
+
+def tokenize(text):
+    return WORD.findall((text or '').lower())
+
+
+def is_identifier(text):
+    """Check whether `text` looks like an FEC ID or an acronym, which only
+    the fulltext columns index.
+    """
+    text = (text or '').strip()
+    return bool(IDENTIFIER.match(text) or ACRONYM.match(text))
+
+
+class PrefixIndex(object):
+    """Index of entries by the words of their names.
+
+    :param list entries: Dictionaries with at least a `name` key, and
+        optionally `receipts` to rank heavier names first
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.names = [(entry['name'] or '').lower() for entry in entries]
+        self.weights = array('d', (entry.get('receipts') or 0 for entry in entries))
+        postings = {}
+        for position, name in enumerate(self.names):
+            for word in set(tokenize(name)):
+                postings.setdefault(word, array('I')).append(position)
+        self.words = sorted(postings)
+        self.postings = [postings[word] for word in self.words]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def match(self, prefix):
+        """Get the positions of entries with a word starting with `prefix`."""
+        start = bisect.bisect_left(self.words, prefix)
+        stop = bisect.bisect_left(self.words, prefix + MAX_CHAR, lo=start)
+        matches = set()
+        for postings in self.postings[start:stop]:
+            matches.update(postings)
+        return matches
+
+    def search(self, text, limit=20):
+        """Get entries with a word starting with each word of `text`. Names
+        starting with the query rank first, then names with greater receipts,
+        then shorter names.
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        matches = None
+        # Match longer, more selective prefixes first
+        for token in sorted(set(tokens), key=len, reverse=True):
+            found = self.match(token)
+            matches = found if matches is None else matches & found
+            if not matches:
+                return []
+        query = ' '.join(tokens)
+        names, weights = self.names, self.weights
+        positions = heapq.nsmallest(
+            limit,
+            matches,
+            key=lambda position: (
+                not names[position].startswith(query),
+                -weights[position],
+                len(names[position]),
+                names[position],
+            ),
+        )
+        return [self.entries[position] for position in positions]
+
+
+class Typeahead(object):
+    """Prefix index of the names in `model`, kept current with the data
+    generation.
+
+    :param model: Fulltext model with `id` and `name` columns
+    :param list fields: Columns to load for each result
+    :param generations: Store of generation counters; see `cache.Cache`
+    """
+
+    def __init__(self, model, fields, generations=None):
+        self.model = model
+        self.fields = fields
+        self.generations = generations
+        self.app = None
+        self._index = None
+        self._generation = None
+        self._thread = None
+        self._retry_at = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Load the index in the background once `app` starts serving
+        requests, in each worker process.
+        """
+        self.app = app
+        app.before_first_request(self.refresh)
+
+    def load(self):
+        columns = [getattr(self.model, field) for field in self.fields]
+        rows = models.db.session.query(*columns).filter(self.model.name != None).all()  # noqa
+        return PrefixIndex([dict(zip(self.fields, row)) for row in rows])
+
+    def refresh(self):
+        """Start reloading the index in a background thread, unless a reload
+        is already running.
+
+        :returns: The thread reloading the index
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._reload, daemon=True)
+                self._thread.start()
+            return self._thread
+
+    def _reload(self):
+        context = self.app.app_context() if self.app is not None else contextlib.suppress()
+        try:
+            with context:
+                # Read the generation first, so that a refresh during the load
+                # triggers another reload
+                generation = cache.get_generation(self.generations)
+                try:
+                    index = self.load()
+                finally:
+                    models.db.session.remove()
+        except Exception:
+            logger.exception('Failed to load typeahead index of %s', self.model.__name__)
+            self._retry_at = time.time() + RETRY_INTERVAL
+            return
+        self._index, self._generation = index, generation
+
+    def get_index(self):
+        """Get the loaded index, or `None` if it has not loaded yet. If the
+        index is missing or stale, reload it in the background; until then,
+        requests use the old index.
+        """
+        stale = self._generation != cache.get_generation(self.generations)
+        if stale and time.time() >= self._retry_at:
+            self.refresh()
+        return self._index
+
+    def search(self, text, limit=20):
+        """Search the index, or return no results if it has not loaded yet or
+        `text` looks like an ID or acronym, so that callers use fulltext search.
+        """
+        if is_identifier(text):
+            return []
+        index = self.get_index()
+        if index is None:
+            return []
+        return index.search(text, limit=limit)
+
+
+candidates = Typeahead(models.CandidateSearch, ['id', 'name', 'office_sought', 'receipts'])
+committees = Typeahead(models.CommitteeSearch, ['id', 'name', 'receipts'])
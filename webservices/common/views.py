@@ -1,6 +1,10 @@
 from flask.ext.restful import Resource
 
 from webservices import utils
+from webservices import exports
+from webservices import sorting
+from webservices import statements
+from webservices.common import cache
 from webservices.common import counts
 from webservices.common import models
 from webservices.config import SQL_CONFIG
@@ -13,25 +17,80 @@ class ItemizedResource(Resource):
     index_column = None
     filter_multi_fields = []
     filter_fulltext_fields = []
+    filter_range_fields = []
+    # Optional model of the fulltext table, if it carries copies of the sort
+    # and filter columns of `model` under the same names
+    search_model = None
+    count_mode = counts.ESTIMATE
+    # Cached responses and counts are invalidated when queued changes are
+    # consumed
+    cache_scope = cache.ITEMIZED
 
     def get(self, **kwargs):
+        statement = statements.Statement(
+            type(self),
+            lambda bound_kwargs: self.load_related(self.build_query(bound_kwargs)),
+            kwargs,
+            self.bound_args,
+            models.db.session(),
+        )
+        return utils.fetch_seek_page(
+            statement.query(), kwargs, self.get_column(self.index_column, kwargs),
+            count_mode=self.count_mode, statement=statement, model=self.model,
+        )
+
+    @property
+    def bound_args(self):
+        """Arguments that are only compared to columns, and whose values can
+        therefore be bound as parameters of cached statements.
+        """
+        keys = {key for key, column in self.filter_multi_fields}
+        for range_keys, column in self.filter_range_fields:
+            keys.update(range_keys)
+        return keys
+
+    def export(self, kwargs, filename):
+        """Stream all results matching `kwargs` in the requested format."""
         query = self.build_query(kwargs)
-        count = counts.count_estimate(query, models.db.session, threshold=5000)
-        return utils.fetch_seek_page(query, kwargs, self.index_column, count=count)
+        index_column = self.get_column(self.index_column, kwargs)
+        query, _ = sorting.sort(query, kwargs['sort'], model=index_column.class_)
+        query = query.order_by(index_column)
+        return exports.make_response(query, self.model, format=kwargs['format'], filename=filename)
 
     def build_query(self, kwargs):
         query = self.model.query.filter(
-            self.year_column >= SQL_CONFIG['START_YEAR_ITEMIZED'],
+            self.get_column(self.year_column, kwargs) >= SQL_CONFIG['START_YEAR_ITEMIZED'],
         )
 
-        query = utils.filter_multi(query, kwargs, self.filter_multi_fields)
-        query = utils.filter_range(query, kwargs, self.filter_range_fields)
+        query = utils.filter_multi(query, kwargs, self.get_fields(self.filter_multi_fields, kwargs))
+        query = utils.filter_range(query, kwargs, self.get_fields(self.filter_range_fields, kwargs))
         query = self.filter_fulltext(query, kwargs)
 
         return query
 
+    def is_search(self, kwargs):
+        return any(kwargs[key] for key, column in self.filter_fulltext_fields)
+
+    def get_column(self, column, kwargs):
+        """Get the copy of `column` on the fulltext table for fulltext
+        searches, so that the database can filter, sort, and paginate matches
+        on the fulltext table before joining to `model`.
+        """
+        if self.search_model is not None and self.is_search(kwargs):
+            return getattr(self.search_model, column.key, column)
+        return column
+
+    def get_fields(self, fields, kwargs):
+        return [(key, self.get_column(column, kwargs)) for key, column in fields]
+
+    def load_related(self, query):
+        """Add eager loading options for related objects included in pages of
+        results; exports skip related objects.
+        """
+        return query
+
     def filter_fulltext(self, query, kwargs):
-        if any(kwargs[key] for key, column in self.filter_fulltext_fields):
+        if self.is_search(kwargs):
             query = self.join_fulltext(query)
         for key, column in self.filter_fulltext_fields:
             if kwargs[key]:
@@ -23,6 +23,28 @@ A two year election cycle that the committee was active- (after original registr
 date but before expiration date in FEC form 1s)
 '''
 
+COUNT_MODE = '''
+How to count total results: `exact`, `estimate` (approximate count from the query planner),
+`cached` (exact count, reused across pages), or `skip` (no count). Defaults vary by endpoint.
+'''
+
+CURSOR = '''
+Opaque token returned as `next_cursor` in the pagination information of the previous page.
+Must be used with the same sort as the previous page. Not available for searches ordered
+by relevance, using `q` or `name_match=similarity`; use `page` instead.
+'''
+
+FIELDS = '''
+Fields to include in each result; repeat to select several fields. By default, all
+fields are included.
+'''
+
+NAME_MATCH = '''
+How to match `name`: `substring` (names containing `name`, the default) or `similarity`
+(names similar to `name`, allowing for misspellings, most similar first). Similarity
+searches are paged using `page`, not `cursor` or `last_index`.
+'''
+
 RECORD_CYCLE = '''
 Filter records to only those that were applicable to a given two-year period.
 '''
@@ -116,6 +138,11 @@ This endpoint is useful for finding detailed information about a particular cand
 
 '''
 
+CANDIDATE_BATCH = '''
+Fetch detailed information about many candidates in one request. Pass `candidate_id`
+once for each candidate.
+'''
+
 COMMITTEE_TAG = '''
 Committees are entities that spend and raise money in an election. Their characteristics and
 relationships with candidates can change over time.
@@ -154,6 +181,11 @@ This endpoint is useful for finding detailed information about a particular comm
 filer. Use the `committee_id` to find the most recent information about the committee.
 '''
 
+COMMITTEE_BATCH = '''
+Fetch detailed information about many committees in one request. Pass `committee_id`
+once for each committee.
+'''
+
 COMMITTEE_HISTORY = '''
 Explore a filer's characteristics over time. This can be particularly useful if the
 committees change treasurers, designation, or `committee_type`.
@@ -202,6 +234,21 @@ is the next year — for example, in 2015, the current cycle is 2016.
 For presidential and Senate candidates, multiple two-year cycles exist between elections.
 '''
 
+TOTALS_COMBINED = '''
+Totals for committees of all types, aggregated by two-year period. Only fields common to
+all types of committees are included; use the committee totals endpoint for the full set
+of fields for a single committee. Independent expenditure-only filers report only
+independent contributions and expenditures, which are listed as receipts and
+disbursements.
+'''
+
+REPORTS_COMBINED = '''
+Reports of committees of all types. Only fields common to all types of committees are
+included; use the committee reports endpoint for the full set of fields for a single
+committee. Independent expenditure-only filers report only independent contributions and
+expenditures, which are listed as receipts and disbursements.
+'''
+
 SCHEDULE_A = '''
 Schedule A filings describe itemized receipts reported by a committee. This is where
 you can look for individual contributors.
@@ -266,6 +313,25 @@ To fetch the next page of results, append "last_index=230906248&amp;last_disburs
 to the URL.
 '''
 
+EXPORT = '''
+Download all results matching the filters in a single response instead of paging
+through them. Results are streamed in the requested format and compressed with gzip
+if the client sends `Accept-Encoding: gzip`. Related committee information is not
+included.
+'''
+
+SCHEDULE_A_EXPORT = '''
+Export itemized receipts. Accepts the same filters and sort as `/schedules/schedule_a`.
+''' + EXPORT
+
+SCHEDULE_B_EXPORT = '''
+Export itemized disbursements. Accepts the same filters and sort as `/schedules/schedule_b`.
+''' + EXPORT
+
+EXPORT_FORMAT = '''
+Format of the export: `csv` or `json` (newline-delimited JSON, one record per line).
+'''
+
 # If we add schedules as a grouping
 SCHEDULES = '''
 Schedules come from particular sections on forms and contain detailed transactional data.
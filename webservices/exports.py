@@ -0,0 +1,123 @@
+"""Stream large result sets as CSV or newline-delimited JSON.
+
+Rows are fetched from a server-side cursor in batches of `BATCH_SIZE` and
+written out in chunks, optionally gzipped, so that memory use does not grow
+with the size of the export.
+"""
+
+import io
+import csv
+import zlib
+import datetime
+
+import flask
+import ujson
+import sqlalchemy as sa
+
+
+CSV = 'csv'
+JSON = 'json'
+FORMATS = [CSV, JSON]
+
+MIMETYPES = {
+    CSV: 'text/csv',
+    JSON: 'application/x-ndjson',
+}
+
+BATCH_SIZE = 1000
+CHUNK_SIZE = 64 * 1024
+
+
+def get_columns(model):
+    return [attr.key for attr in sa.inspect(model).column_attrs]
+
+
+def format_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def iter_rows(query, model, columns):
+    """Select only the exported columns, skipping ORM instances and related
+    objects, and stream them from a server-side cursor.
+    """
+    query = query.with_entities(*[getattr(model, column) for column in columns])
+    for row in query.yield_per(BATCH_SIZE):
+        yield [format_value(value) for value in row]
+
+
+def write_csv(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def write_json(rows, columns):
+    lines = []
+    size = 0
+    for row in rows:
+        line = ujson.dumps(dict(zip(columns, row))) + '\n'
+        lines.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield ''.join(lines)
+            lines, size = [], 0
+    yield ''.join(lines)
+
+
+WRITERS = {
+    CSV: write_csv,
+    JSON: write_json,
+}
+
+
+def encode(chunks):
+    for chunk in chunks:
+        yield chunk.encode('utf-8')
+
+
+def compress(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def accepts_gzip():
+    return 'gzip' in flask.request.headers.get('Accept-Encoding', '')
+
+
+def make_response(query, model, format=CSV, filename='export'):
+    """Build a streaming response exporting all rows of `query`.
+
+    :param query: SQLAlchemy query, filtered and sorted
+    :param model: Model whose columns to export
+    :param str format: One of `FORMATS`
+    :param str filename: Download name, without extension
+    """
+    columns = get_columns(model)
+    chunks = WRITERS[format](iter_rows(query, model, columns), columns)
+    headers = {
+        'Content-Disposition': 'attachment; filename={0}.{1}'.format(filename, format),
+        'Vary': 'Accept-Encoding',
+    }
+    if accepts_gzip():
+        chunks = compress(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    else:
+        chunks = encode(chunks)
+    return flask.Response(
+        flask.stream_with_context(chunks),
+        mimetype=MIMETYPES[format],
+        headers=headers,
+    )
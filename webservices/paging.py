@@ -1,21 +1,137 @@
+import os
 import abc
 import math
+import hashlib
 import datetime
 import collections
 
 import sqlalchemy as sa
 import marshmallow as ma
+import itsdangerous
 from marshmallow.utils import isoformat
+from dateutil.parser import parse as parse_date
 
+from webservices import serializers
 from webservices.spec import spec
+from webservices.common import counts
+from webservices.exceptions import ApiError
+
+
+def get_cursor_secret():
+    """Get the key signing cursors from `FEC_CURSOR_SECRET`, which is required
+    in production. Elsewhere, derive a key from the database credentials,
+    which are also secret and shared by all instances.
+    """
+    secret = os.getenv('FEC_CURSOR_SECRET')
+    if secret:
+        return secret
+    if os.getenv('PRODUCTION'):
+        raise RuntimeError('FEC_CURSOR_SECRET must be set in production')
+    return hashlib.sha256('cursor:{0}'.format(os.getenv('SQLA_CONN', '')).encode()).hexdigest()
+
+
+# Cursors are signed rather than encrypted: clients may decode them, but
+# cannot forge values that were not issued by the API
+cursor_serializer = itsdangerous.URLSafeSerializer(get_cursor_secret(), salt='pagination-cursor')
+
+# Number of rows to fetch at a time when streaming results
+STREAM_BATCH_SIZE = 100
+
+
+def can_stream(query):
+    """Check whether `query` can be fetched in batches. SQLAlchemy can't
+    batch queries that eagerly load collections using subqueries or joins,
+    and raises when building their statements.
+    """
+    try:
+        query.yield_per(STREAM_BATCH_SIZE).statement
+    except sa.exc.InvalidRequestError:
+        return False
+    return True
 
 
 def _format_value(value):
     if isinstance(value, datetime.datetime):
         return isoformat(value)
+    if isinstance(value, datetime.date):
+        return value.isoformat()
     return value
 
 
+def parse_value(column, value):
+    """Coerce a serialized index value to the Python type of `column`.
+
+    :raises: ValueError, TypeError if value cannot be coerced
+    """
+    if value is None:
+        return None
+    python_type = column.property.columns[0].type.python_type
+    if issubclass(python_type, datetime.date):
+        return parse_date(value)
+    return python_type(value)
+
+
+def format_sort_option(sort_column):
+    column, direction = sort_column
+    return '{0}{1}'.format('-' if direction is sa.desc else '', column.key)
+
+
+def encode_cursor(sort_columns, index_column, values):
+    """Encode the sort values and index of a result as an opaque token.
+
+    :param list sort_columns: List of `(column, direction)` pairs
+    :param index_column: Unique column used to break ties
+    :param list values: Values of each sort column followed by the index value
+    """
+    return cursor_serializer.dumps({
+        'sort': [format_sort_option(each) for each in sort_columns],
+        'index': index_column.key,
+        'values': [_format_value(value) for value in values],
+    })
+
+
+def decode_cursor(token, sort_columns, index_column):
+    """Decode a token issued by `encode_cursor`, checking that it was issued
+    for the same sort order and index column as the current request.
+
+    :returns: Tuple of sort values and index value
+    :raises: ApiError if the token is invalid or does not match
+    """
+    try:
+        payload = cursor_serializer.loads(token)
+    except itsdangerous.BadData:
+        raise ApiError('Invalid cursor', status_code=422)
+    sort = [format_sort_option(each) for each in sort_columns]
+    if payload.get('sort') != sort or payload.get('index') != index_column.key:
+        raise ApiError('Cursor does not match requested sort', status_code=422)
+    columns = [column for column, _ in sort_columns] + [index_column]
+    values = payload.get('values') or []
+    if len(values) != len(columns):
+        raise ApiError('Invalid cursor', status_code=422)
+    try:
+        values = [parse_value(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError, OverflowError, NotImplementedError):
+        raise ApiError('Invalid cursor', status_code=422)
+    return values[:-1], values[-1]
+
+
+class ResultStream(object):
+    """Iterate over query results from a server-side cursor, fetching rows in
+    batches so that each result can be serialized and released before the
+    next is loaded. Only the most recent result is kept, for building
+    pagination information.
+    """
+
+    def __init__(self, results):
+        self.results = results
+        self.last = None
+
+    def __iter__(self):
+        for result in self.results:
+            self.last = result
+            yield result
+
+
 class BasePage(collections.Sequence):
 
     def __init__(self, results, paginator):
@@ -25,9 +141,33 @@ class BasePage(collections.Sequence):
     def __len__(self):
         return len(self.results)
 
+    def __bool__(self):
+        # Streamed results can't be counted until they have been consumed
+        return isinstance(self.results, ResultStream) or bool(self.results)
+
     def __getitem__(self, index):
         return self.results[index]
 
+    @property
+    def last_result(self):
+        if isinstance(self.results, ResultStream):
+            return self.results.last
+        return self.results[-1] if self.results else None
+
+    @property
+    def last_indexes(self):
+        last_result = self.last_result
+        if last_result is not None and self.paginator.seekable:
+            return self.paginator._get_index_values(last_result)
+        return None
+
+    @property
+    def next_cursor(self):
+        last_result = self.last_result
+        if last_result is not None and self.paginator.seekable:
+            return self.paginator._get_cursor(last_result)
+        return None
+
     @abc.abstractproperty
     def info(self):
         pass
@@ -60,36 +200,59 @@ class OffsetPage(BasePage):
             'count': self.paginator.count,
             'pages': self.paginator.pages,
             'per_page': self.paginator.per_page,
+            'count_mode': self.paginator.count_mode,
+            'last_indexes': self.last_indexes,
+            'next_cursor': self.next_cursor,
         }
 
 
 class SeekPage(BasePage):
 
-    @property
-    def last_indexes(self):
-        if self.results:
-            return self.paginator._get_index_values(self.results[-1])
-        return None
-
     @property
     def info(self):
         return {
             'count': self.paginator.count,
             'pages': self.paginator.pages,
             'per_page': self.paginator.per_page,
+            'count_mode': self.paginator.count_mode,
             'last_indexes': self.last_indexes,
+            'next_cursor': self.next_cursor,
         }
 
 
 class BasePaginator(object):
 
-    def __init__(self, cursor, per_page, count=None):
+    def __init__(self, cursor, per_page, index_column=None, sort_columns=None, count=None,
+                 count_mode=counts.EXACT, stream=False, statement=None, seekable=True):
+        """
+        :param bool seekable: Whether the following page can be fetched with
+            keyset pagination, which requires results to be ordered only by
+            the sort columns and the index column
+        """
         self.cursor = cursor
         self.per_page = per_page
-        self.count = count or self._count()
+        self.stream = stream
+        self.statement = statement
+        self.seekable = seekable and index_column is not None
+        self.index_column = index_column
+        self.sort_columns = sort_columns or []
+        self.count_mode = count_mode
+        if count is None and count_mode != counts.SKIP:
+            count = self._count()
+        self.count = count
+
+    @property
+    def sort_column(self):
+        return self.sort_columns[0] if self.sort_columns else None
+
+    @property
+    def index_direction(self):
+        return self.sort_column[1] if self.sort_column else sa.asc
 
     @property
     def pages(self):
+        if self.count is None:
+            return None
         return int(math.ceil(self.count / self.per_page))
 
     @abc.abstractmethod
@@ -100,6 +263,14 @@ class BasePaginator(object):
     def get_page(self, *args, **kwargs):
         pass
 
+    @abc.abstractmethod
+    def _get_index_values(self, result):
+        pass
+
+    @abc.abstractmethod
+    def _get_cursor(self, result):
+        pass
+
 
 class OffsetPaginator(BasePaginator):
 
@@ -112,20 +283,30 @@ class OffsetPaginator(BasePaginator):
 
 class SeekPaginator(BasePaginator):
 
-    def __init__(self, cursor, per_page, index_column, sort_column=None, count=None):
-        self.index_column = index_column
-        self.sort_column = sort_column
-        super(SeekPaginator, self).__init__(cursor, per_page, count=count)
+    def __init__(self, cursor, per_page, index_column, sort_columns=None, count=None,
+                 count_mode=counts.EXACT, stream=False, statement=None):
+        super(SeekPaginator, self).__init__(
+            cursor,
+            per_page,
+            index_column=index_column,
+            sort_columns=sort_columns,
+            count=count,
+            count_mode=count_mode,
+            stream=stream,
+            statement=statement,
+        )
 
-    def get_page(self, last_index=None, sort_index=None):
-        return SeekPage(self._fetch(last_index, sort_index), self)
+    def get_page(self, last_index=None, sort_indexes=None):
+        """Get the page of results following the given index values.
 
-    @abc.abstractmethod
-    def _fetch(self, last_indexes, limit):
-        pass
+        :param last_index: Index value of the last result on the previous page
+        :param list sort_indexes: Values of each sort column for the last result
+            on the previous page; may be shorter than the list of sort columns
+        """
+        return SeekPage(self._fetch(last_index, sort_indexes or []), self)
 
     @abc.abstractmethod
-    def _get_index_values(self, result):
+    def _fetch(self, last_index, sort_indexes):
         pass
 
 
@@ -134,40 +315,161 @@ class SqlalchemyMixin(object):
     def _count(self):
         return self.cursor.count()
 
+    def _execute(self, paginate, values, *shape):
+        """Fetch a page of results.
+
+        :param paginate: Function applying pagination to the base query, given
+            the query and `values`
+        :param list values: Values that vary between pages, such as offsets
+            or the last seen sort values
+        :param shape: Hashable values determining the structure of the query
+            built by `paginate`, other than the number of `values`
+        """
+        # Only checked for pages that would be streamed, which are large
+        # enough that building the statement twice doesn't matter
+        stream = self.stream and can_stream(self.cursor)
+
+        def prepare(query, *values):
+            query = paginate(query, *values)
+            return query.yield_per(STREAM_BATCH_SIZE) if stream else query
+
+        if self.statement is None:
+            results = prepare(self.cursor, *values)
+        else:
+            names = ['page_{0}'.format(idx) for idx in range(len(values))]
+            placeholders = [sa.bindparam(name) for name in names]
+            results = self.statement.execute(
+                self.cursor.session,
+                lambda query: prepare(query, *placeholders),
+                dict(zip(names, values)),
+                type(self), stream, len(values), shape,
+            )
+        return ResultStream(results) if stream else list(results)
+
+    def _get_index_values(self, result):
+        ret = {'last_index': getattr(result, self.index_column.key)}
+        if self.sort_column:
+            key = 'last_{0}'.format(self.sort_column[0].key)
+            ret[key] = _format_value(getattr(result, self.sort_column[0].key))
+        return ret
+
+    def _get_cursor(self, result):
+        values = [
+            getattr(result, column.key)
+            for column, _ in self.sort_columns
+        ]
+        values.append(getattr(result, self.index_column.key))
+        return encode_cursor(self.sort_columns, self.index_column, values)
+
 
 class SqlalchemyOffsetPaginator(SqlalchemyMixin, OffsetPaginator):
 
     def _fetch(self, page):
+        cursor = self.cursor
         offset, limit = self._get_offset(page), self.per_page
-        offset += (self.cursor._offset or 0)
-        if self.cursor._limit:
-            limit = min(limit, self.cursor._limit - offset)
-        return self.cursor.offset(offset).limit(limit).all()
+        offset += (cursor._offset or 0)
+        if cursor._limit:
+            limit = min(limit, cursor._limit - offset)
+        index_column, index_direction = self.index_column, self.index_direction
+
+        def paginate(query, offset, limit):
+            # Break ties on the index column so that `last_indexes` can be used
+            # to switch to keyset pagination without skipping or repeating rows
+            if index_column is not None:
+                query = query.order_by(index_direction(index_column))
+            return query.offset(offset).limit(limit)
+
+        return self._execute(paginate, [offset, limit])
 
 
 class SqlalchemySeekPaginator(SqlalchemyMixin, SeekPaginator):
 
-    def _fetch(self, last_index, sort_index=None):
-        cursor, limit = self.cursor, self.per_page
-        lhs, rhs = (), ()
-        direction = self.sort_column[1] if self.sort_column else sa.asc
-        if sort_index is not None:
-            lhs += (self.sort_column[0], )
-            rhs += (sort_index, )
+    def _fetch(self, last_index, sort_indexes):
+        # Sort values of `None` stand for NULL, not for missing values, so that
+        # pages can end on rows with NULL sort values
+        keys = list(self.sort_columns[:len(sort_indexes)])
+        values = list(sort_indexes)
         if last_index is not None:
-            lhs += (self.index_column, )
-            rhs += (last_index, )
-        if any(rhs):
-            filter = lhs > rhs if direction == sa.asc else lhs < rhs
-            cursor = cursor.filter(filter)
-        return cursor.order_by(direction(self.index_column)).limit(limit).all()
+            keys.append((self.index_column, self.index_direction))
+            values.append(last_index)
+        nulls = tuple(value is None for value in values)
+        index_column, index_direction = self.index_column, self.index_direction
 
-    def _get_index_values(self, result):
-        ret = {'last_index': getattr(result, self.index_column.key)}
-        if self.sort_column:
-            key = 'last_{0}'.format(self.sort_column[0].key)
-            ret[key] = _format_value(getattr(result, self.sort_column[0].key))
-        return ret
+        def paginate(query, limit, *params):
+            if keys:
+                # NULL values don't need bound parameters
+                params = iter(params)
+                seek_keys = [
+                    (column, direction, None if null else next(params))
+                    for (column, direction), null in zip(keys, nulls)
+                ]
+                query = query.filter(_make_seek_filter(seek_keys))
+            return query.order_by(index_direction(index_column)).limit(limit)
+
+        shape = tuple((column.key, direction.__name__) for column, direction in keys) + (nulls, )
+        values = [value for value in values if value is not None]
+        return self._execute(paginate, [self.per_page] + values, shape)
+
+
+def _is_nullable(column):
+    try:
+        return column.property.columns[0].nullable
+    except (AttributeError, IndexError):
+        return True
+
+
+def _seek_equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _seek_after(column, direction, value):
+    """Select rows where `column` sorts strictly after `value`. PostgreSQL
+    sorts NULL after all other values in ascending order, and before all
+    other values in descending order.
+
+    :returns: Filter, or `None` if no rows sort after `value`
+    """
+    if direction is sa.asc:
+        if value is None:
+            return None
+        return sa.or_(column > value, column.is_(None)) if _is_nullable(column) else column > value
+    if value is None:
+        return column.isnot(None)
+    return column < value
+
+
+def _make_seek_filter(keys):
+    """Build a filter selecting rows that sort after the given values.
+
+    If all keys share a direction and no value is NULL, emit a single row
+    comparison, which PostgreSQL can satisfy with one range scan over a
+    composite index, plus the rows with NULLs that sort last; otherwise,
+    expand the comparison into a disjunction.
+
+    :param list keys: List of `(column, direction, value)` triples; values of
+        `None` match NULL
+    """
+    directions = set(direction for _, direction, _ in keys)
+    if len(directions) == 1 and all(value is not None for _, _, value in keys):
+        direction = directions.pop()
+        lhs = sa.tuple_(*[column for column, _, _ in keys])
+        rhs = sa.tuple_(*[value for _, _, value in keys])
+        if direction is sa.desc:
+            # NULLs sort first, so rows with NULLs precede the given values
+            return lhs < rhs
+        clauses = [lhs > rhs]
+        for position, (column, _, _) in enumerate(keys):
+            if _is_nullable(column):
+                prefix = [each == each_value for each, _, each_value in keys[:position]]
+                clauses.append(sa.and_(*(prefix + [column.is_(None)])))
+        return sa.or_(*clauses) if len(clauses) > 1 else clauses[0]
+    clauses = []
+    for position, (column, direction, value) in enumerate(keys):
+        after = _seek_after(column, direction, value)
+        if after is not None:
+            prefix = [_seek_equal(each, each_value) for each, _, each_value in keys[:position]]
+            clauses.append(sa.and_(*(prefix + [after])))
+    return sa.or_(*clauses)
 
 
 class PageSchemaOpts(ma.schema.SchemaOpts):
@@ -176,21 +478,76 @@ class PageSchemaOpts(ma.schema.SchemaOpts):
         self.results_schema_class = getattr(meta, 'results_schema_class', None)
         self.results_field_name = getattr(meta, 'results_field_name', 'results')
         self.results_schema_options = getattr(meta, 'results_schema_options', {})
+        self.results_compiled = getattr(meta, 'results_compiled', False)
+        # Serialize fields in declaration order; see `PageMeta`
+        self.ordered = True
+
+
+class ResultsField(ma.fields.Nested):
+    """Nested field that also serializes a `ResultStream`, one result at a
+    time, without building a list of results first.
+
+    :param bool compiled: Serialize results using a serializer compiled from
+        the results schema; see `serializers.compile_schema`
+    """
+    def __init__(self, nested, compiled=False, **kwargs):
+        self.compiled = compiled
+        super(ResultsField, self).__init__(nested, **kwargs)
+
+    def _serialize(self, nested_obj, attr, obj):
+        serializer = self._get_serializer()
+        if serializer is not None and nested_obj is not None:
+            return [serializer(each) for each in nested_obj]
+        if not isinstance(nested_obj, ResultStream):
+            return super(ResultsField, self)._serialize(nested_obj, attr, obj)
+        # Results schemas declare their fields, so there is nothing to infer
+        # from the first result
+        return self._get_stream_schema().dump(nested_obj, many=True, update_fields=False).data
+
+    def _get_stream_schema(self):
+        """Build a copy of the results schema with fields set from its
+        declarations, rather than from results dumped by earlier requests.
+        """
+        schema = self.schema
+        stream_schema = type(schema)(
+            many=True,
+            only=schema.only,
+            exclude=schema.exclude,
+            context=schema.context,
+        )
+        stream_schema.ordered = schema.ordered
+        return stream_schema
+
+    def _get_serializer(self):
+        if not self.compiled:
+            return None
+        only = tuple(self.only) if self.only else None
+        return serializers.compile_schema(type(self.schema), only)
 
 
 class PageMeta(ma.schema.SchemaMeta):
     """Metaclass for `PageSchema` that creates a `Nested` field based on the
-    options configured in `OPTIONS_CLASS`.
+    options configured in `OPTIONS_CLASS`. Results are declared first so that
+    they are serialized before pagination information, which is computed
+    from the last result of a `ResultStream`.
     """
     def __new__(mcs, name, bases, attrs):
         klass = super().__new__(mcs, name, bases, attrs)
         opts = klass.OPTIONS_CLASS(klass.Meta)
-        klass._declared_fields[opts.results_field_name] = ma.fields.Nested(
+        results = ResultsField(
             opts.results_schema_class,
+            compiled=opts.results_compiled,
             attribute='results',
             many=True,
             **opts.results_schema_options
         )
+        klass._declared_fields = collections.OrderedDict(
+            [(opts.results_field_name, results)] +
+            [
+                (key, value) for key, value in klass._declared_fields.items()
+                if key != opts.results_field_name
+            ]
+        )
         return klass
 
 
@@ -198,14 +555,18 @@ class BaseInfoSchema(ma.Schema):
     count = ma.fields.Integer()
     pages = ma.fields.Integer()
     per_page = ma.fields.Integer()
+    count_mode = ma.fields.Str()
 
 
 class OffsetInfoSchema(BaseInfoSchema):
     page = ma.fields.Integer()
+    last_indexes = ma.fields.Raw()
+    next_cursor = ma.fields.Str()
 
 
 class SeekInfoSchema(BaseInfoSchema):
     last_indexes = ma.fields.Raw()
+    next_cursor = ma.fields.Str()
 
 
 class OffsetPageSchema(ma.Schema, metaclass=PageMeta):
@@ -3,27 +3,33 @@ from flask.ext.restful import Resource
 from webservices import args
 from webservices import utils
 from webservices import schemas
+from webservices.common import cache
 from webservices.common import models
 
 
-class ScheduleAAggregateView(Resource):
+class AggregateResource(Resource):
 
     model = None
     fields = {}
+    range_fields = []
+    # Cached responses and counts are invalidated when queued changes are
+    # consumed
+    cache_scope = cache.ITEMIZED
 
     def get(self, committee_id=None, **kwargs):
         query = self._build_query(committee_id, kwargs)
-        return utils.fetch_page(query, kwargs)
+        return utils.fetch_page(query, kwargs, model=self.model, index_column=self.model.idx)
 
     def _build_query(self, committee_id, kwargs):
         query = self.model.query
         if committee_id is not None:
             query = query.filter(self.model.committee_id == committee_id)
         query = utils.filter_multi(query, kwargs, self.fields)
+        query = utils.filter_range(query, kwargs, self.range_fields)
         return query
 
 
-class ScheduleABySizeView(ScheduleAAggregateView):
+class ScheduleABySizeView(AggregateResource):
 
     model = models.ScheduleABySize
     fields = [
@@ -32,6 +38,7 @@ class ScheduleABySizeView(ScheduleAAggregateView):
     ]
 
     @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
     @args.register_kwargs(args.schedule_a_by_size)
     @args.register_kwargs(
         args.make_sort_args(
@@ -43,7 +50,7 @@ class ScheduleABySizeView(ScheduleAAggregateView):
         return super(ScheduleABySizeView, self).get(committee_id=committee_id, **kwargs)
 
 
-class ScheduleAByStateView(ScheduleAAggregateView):
+class ScheduleAByStateView(AggregateResource):
 
     model = models.ScheduleAByState
     fields = [
@@ -52,6 +59,7 @@ class ScheduleAByStateView(ScheduleAAggregateView):
     ]
 
     @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
     @args.register_kwargs(args.schedule_a_by_state)
     @args.register_kwargs(
         args.make_sort_args(
@@ -63,7 +71,7 @@ class ScheduleAByStateView(ScheduleAAggregateView):
         return super(ScheduleAByStateView, self).get(committee_id=committee_id, **kwargs)
 
 
-class ScheduleAByZipView(ScheduleAAggregateView):
+class ScheduleAByZipView(AggregateResource):
 
     model = models.ScheduleAByZip
     fields = [
@@ -72,6 +80,7 @@ class ScheduleAByZipView(ScheduleAAggregateView):
     ]
 
     @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
     @args.register_kwargs(args.schedule_a_by_zip)
     @args.register_kwargs(
         args.make_sort_args(
@@ -81,3 +90,199 @@ class ScheduleAByZipView(ScheduleAAggregateView):
     @schemas.marshal_with(schemas.ScheduleAByZipPageSchema())
     def get(self, committee_id=None, **kwargs):
         return super(ScheduleAByZipView, self).get(committee_id=committee_id, **kwargs)
+
+
+class ScheduleAByEmployerView(AggregateResource):
+
+    model = models.ScheduleAByEmployer
+    fields = [
+        ('cycle', models.ScheduleAByEmployer.cycle),
+        ('employer', models.ScheduleAByEmployer.employer),
+    ]
+
+    @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
+    @args.register_kwargs(args.schedule_a_by_employer)
+    @args.register_kwargs(
+        args.make_sort_args(
+            validator=args.IndexValidator(models.ScheduleAByEmployer)
+        )
+    )
+    @schemas.marshal_with(schemas.ScheduleAByEmployerPageSchema())
+    def get(self, committee_id=None, **kwargs):
+        return super(ScheduleAByEmployerView, self).get(committee_id=committee_id, **kwargs)
+
+
+class ScheduleAByOccupationView(AggregateResource):
+
+    model = models.ScheduleAByOccupation
+    fields = [
+        ('cycle', models.ScheduleAByOccupation.cycle),
+        ('occupation', models.ScheduleAByOccupation.occupation),
+    ]
+
+    @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
+    @args.register_kwargs(args.schedule_a_by_occupation)
+    @args.register_kwargs(
+        args.make_sort_args(
+            validator=args.IndexValidator(models.ScheduleAByOccupation)
+        )
+    )
+    @schemas.marshal_with(schemas.ScheduleAByOccupationPageSchema())
+    def get(self, committee_id=None, **kwargs):
+        return super(ScheduleAByOccupationView, self).get(committee_id=committee_id, **kwargs)
+
+
+class ScheduleAByContributorView(AggregateResource):
+
+    model = models.ScheduleAByContributor
+    fields = [
+        ('cycle', models.ScheduleAByContributor.cycle),
+        ('contributor_id', models.ScheduleAByContributor.contributor_id),
+        ('contributor_name', models.ScheduleAByContributor.contributor_name),
+    ]
+
+    @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
+    @args.register_kwargs(args.schedule_a_by_contributor)
+    @args.register_kwargs(
+        args.make_sort_args(
+            validator=args.IndexValidator(models.ScheduleAByContributor)
+        )
+    )
+    @schemas.marshal_with(schemas.ScheduleAByContributorPageSchema())
+    def get(self, committee_id=None, **kwargs):
+        return super(ScheduleAByContributorView, self).get(committee_id=committee_id, **kwargs)
+
+
+class ScheduleBByRecipientView(AggregateResource):
+
+    model = models.ScheduleBByRecipient
+    fields = [
+        ('cycle', models.ScheduleBByRecipient.cycle),
+        ('recipient_name', models.ScheduleBByRecipient.recipient_name),
+    ]
+
+    @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
+    @args.register_kwargs(args.schedule_b_by_recipient)
+    @args.register_kwargs(
+        args.make_sort_args(
+            validator=args.IndexValidator(models.ScheduleBByRecipient)
+        )
+    )
+    @schemas.marshal_with(schemas.ScheduleBByRecipientPageSchema())
+    def get(self, committee_id=None, **kwargs):
+        return super(ScheduleBByRecipientView, self).get(committee_id=committee_id, **kwargs)
+
+
+class ScheduleBByRecipientIdView(AggregateResource):
+
+    model = models.ScheduleBByRecipientId
+    fields = [
+        ('cycle', models.ScheduleBByRecipientId.cycle),
+        ('recipient_id', models.ScheduleBByRecipientId.recipient_id),
+    ]
+
+    @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
+    @args.register_kwargs(args.schedule_b_by_recipient_id)
+    @args.register_kwargs(
+        args.make_sort_args(
+            validator=args.IndexValidator(models.ScheduleBByRecipientId)
+        )
+    )
+    @schemas.marshal_with(schemas.ScheduleBByRecipientIdPageSchema())
+    def get(self, committee_id=None, **kwargs):
+        return super(ScheduleBByRecipientIdView, self).get(committee_id=committee_id, **kwargs)
+
+
+class ScheduleBByStateView(AggregateResource):
+
+    model = models.ScheduleBByState
+    fields = [
+        ('cycle', models.ScheduleBByState.cycle),
+        ('state', models.ScheduleBByState.state),
+    ]
+
+    @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
+    @args.register_kwargs(args.schedule_b_by_state)
+    @args.register_kwargs(
+        args.make_sort_args(
+            validator=args.IndexValidator(models.ScheduleBByState)
+        )
+    )
+    @schemas.marshal_with(schemas.ScheduleBByStatePageSchema())
+    def get(self, committee_id=None, **kwargs):
+        return super(ScheduleBByStateView, self).get(committee_id=committee_id, **kwargs)
+
+
+class ScheduleBByPurposeView(AggregateResource):
+
+    model = models.ScheduleBByPurpose
+    fields = [
+        ('cycle', models.ScheduleBByPurpose.cycle),
+        ('purpose', models.ScheduleBByPurpose.purpose),
+    ]
+
+    @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
+    @args.register_kwargs(args.schedule_b_by_purpose)
+    @args.register_kwargs(
+        args.make_sort_args(
+            validator=args.IndexValidator(models.ScheduleBByPurpose)
+        )
+    )
+    @schemas.marshal_with(schemas.ScheduleBByPurposePageSchema())
+    def get(self, committee_id=None, **kwargs):
+        return super(ScheduleBByPurposeView, self).get(committee_id=committee_id, **kwargs)
+
+
+class ScheduleAByDateView(AggregateResource):
+
+    model = models.ScheduleAByDate
+    fields = [
+        ('cycle', models.ScheduleAByDate.cycle),
+    ]
+    range_fields = [
+        (('min_date', 'max_date'), models.ScheduleAByDate.month),
+    ]
+
+    @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
+    @args.register_kwargs(args.schedule_by_date)
+    @args.register_kwargs(
+        args.make_sort_args(
+            default=['month'],
+            validator=args.IndexValidator(models.ScheduleAByDate)
+        )
+    )
+    @schemas.marshal_with(schemas.ScheduleAByDatePageSchema())
+    def get(self, committee_id=None, **kwargs):
+        return super(ScheduleAByDateView, self).get(committee_id=committee_id, **kwargs)
+
+
+class ScheduleBByDateView(AggregateResource):
+
+    model = models.ScheduleBByDate
+    fields = [
+        ('cycle', models.ScheduleBByDate.cycle),
+    ]
+    range_fields = [
+        (('min_date', 'max_date'), models.ScheduleBByDate.month),
+    ]
+
+    @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
+    @args.register_kwargs(args.schedule_by_date)
+    @args.register_kwargs(
+        args.make_sort_args(
+            default=['month'],
+            validator=args.IndexValidator(models.ScheduleBByDate)
+        )
+    )
+    @schemas.marshal_with(schemas.ScheduleBByDatePageSchema())
+    def get(self, committee_id=None, **kwargs):
+        return super(ScheduleBByDateView, self).get(committee_id=committee_id, **kwargs)
@@ -6,6 +6,7 @@ from webservices import docs
 from webservices import spec
 from webservices import utils
 from webservices import schemas
+from webservices import statements
 from webservices.common import models
 from webservices.common.util import filter_query
 
@@ -32,6 +33,7 @@ class CandidateList(Resource):
         return models.Candidate.query
 
     @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
     @args.register_kwargs(args.candidate_list)
     @args.register_kwargs(args.candidate_detail)
     @args.register_kwargs(
@@ -42,27 +44,38 @@ class CandidateList(Resource):
     )
     @schemas.marshal_with(schemas.CandidatePageSchema())
     def get(self, **kwargs):
-        query = self.get_candidates(kwargs)
-        return utils.fetch_page(query, kwargs, model=models.Candidate)
+        statement = statements.Statement(type(self), self.get_candidates, kwargs, filter_fields, models.db.session())
+        return utils.fetch_page(
+            statement.query(), kwargs,
+            model=models.Candidate, index_column=models.Candidate.idx, statement=statement,
+            ranked=utils.is_ranked(kwargs),
+        )
 
     def get_candidates(self, kwargs):
 
         candidates = self.query
 
         if kwargs.get('q'):
-            candidates = utils.search_text(
-                candidates.join(
-                    models.CandidateSearch,
-                    models.Candidate.candidate_id == models.CandidateSearch.id,
-                ),
+            ranked = utils.rank_text(
+                models.CandidateSearch.id,
                 models.CandidateSearch.fulltxt,
+                models.CandidateSearch.receipts,
                 kwargs['q'],
             )
+            candidates = candidates.join(
+                ranked,
+                models.Candidate.candidate_id == ranked.c.key,
+            ).order_by(sa.desc(ranked.c.rank))
 
         candidates = filter_query(models.Candidate, candidates, filter_fields, kwargs)
 
         if kwargs.get('name'):
-            candidates = candidates.filter(models.Candidate.name.ilike('%{}%'.format(kwargs['name'])))
+            candidates = utils.search_name(
+                candidates,
+                models.Candidate.name,
+                kwargs['name'],
+                similarity=kwargs['name_match'] == 'similarity',
+            )
 
         # TODO(jmcarp) Reintroduce year filter pending accurate `load_date` and `expire_date` values
         if kwargs['cycle']:
@@ -85,13 +98,18 @@ class CandidateSearch(CandidateList):
         )
 
     @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
     @args.register_kwargs(args.candidate_list)
     @args.register_kwargs(args.candidate_detail)
     @args.register_kwargs(args.make_sort_args(validator=args.IndexValidator(models.Candidate)))
     @schemas.marshal_with(schemas.CandidateSearchPageSchema())
     def get(self, **kwargs):
-        query = self.get_candidates(kwargs)
-        return utils.fetch_page(query, kwargs, model=models.Candidate)
+        statement = statements.Statement(type(self), self.get_candidates, kwargs, filter_fields, models.db.session())
+        return utils.fetch_page(
+            statement.query(), kwargs,
+            model=models.Candidate, index_column=models.Candidate.idx, statement=statement,
+            ranked=utils.is_ranked(kwargs),
+        )
 
 
 @spec.doc(
@@ -128,8 +146,9 @@ class CandidateView(Resource):
         return utils.fetch_page(query, kwargs, model=models.CandidateDetail)
 
     def get_candidate(self, kwargs, candidate_id=None, committee_id=None):
+        candidates = models.CandidateDetail.query
+
         if candidate_id is not None:
-            candidates = models.CandidateDetail.query
             candidates = candidates.filter_by(candidate_id=candidate_id)
 
         if committee_id is not None:
@@ -148,6 +167,30 @@ class CandidateView(Resource):
         return candidates
 
 
+@spec.doc(
+    tags=['candidate'],
+    description=docs.CANDIDATE_BATCH,
+)
+class CandidateBatchView(CandidateView):
+
+    @args.register_kwargs(args.make_batch_args('candidate_id', docs.CANDIDATE_ID))
+    @args.register_kwargs(args.candidate_detail)
+    @args.register_kwargs(
+        args.make_sort_args(
+            default=['-expire_date'],
+            validator=args.IndexValidator(models.CandidateDetail),
+        )
+    )
+    @schemas.marshal_with(schemas.CandidateDetailPageSchema())
+    def get(self, **kwargs):
+        # Filter on the requested IDs here rather than in `get_candidate`
+        candidate_ids = kwargs.pop('candidate_id')
+        args.validate_batch(candidate_ids, 'candidate_id')
+        query = self.get_candidate(kwargs)
+        query = query.filter(models.CandidateDetail.candidate_id.in_(candidate_ids))
+        return utils.fetch_page(query, kwargs, model=models.CandidateDetail)
+
+
 @spec.doc(
     tags=['candidate'],
     description=docs.CANDIDATE_HISTORY,
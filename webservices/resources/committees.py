@@ -6,6 +6,7 @@ from webservices import docs
 from webservices import spec
 from webservices import utils
 from webservices import schemas
+from webservices.common import counts
 from webservices.common import models
 from webservices.common.util import filter_query
 
@@ -36,6 +37,7 @@ def filter_year(model, query, years):
 class CommitteeList(Resource):
 
     @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
     @args.register_kwargs(args.committee)
     @args.register_kwargs(args.committee_list)
     @args.register_kwargs(
@@ -47,7 +49,13 @@ class CommitteeList(Resource):
     @schemas.marshal_with(schemas.CommitteePageSchema())
     def get(self, **kwargs):
         query = self.get_committees(kwargs)
-        return utils.fetch_page(query, kwargs)
+        return utils.fetch_page(
+            query, kwargs,
+            model=models.Committee,
+            index_column=models.Committee.idx,
+            count_mode=counts.ESTIMATE,
+            ranked=utils.is_ranked(kwargs),
+        )
 
     def get_committees(self, kwargs):
 
@@ -59,17 +67,24 @@ class CommitteeList(Resource):
             )
 
         if kwargs.get('q'):
-            committees = utils.search_text(
-                committees.join(
-                    models.CommitteeSearch,
-                    models.Committee.committee_id == models.CommitteeSearch.id,
-                ),
+            ranked = utils.rank_text(
+                models.CommitteeSearch.id,
                 models.CommitteeSearch.fulltxt,
+                models.CommitteeSearch.receipts,
                 kwargs['q'],
             )
+            committees = committees.join(
+                ranked,
+                models.Committee.committee_id == ranked.c.key,
+            ).order_by(sa.desc(ranked.c.rank))
 
         if kwargs.get('name'):
-            committees = committees.filter(models.Committee.name.ilike('%{}%'.format(kwargs['name'])))
+            committees = utils.search_name(
+                committees,
+                models.Committee.name,
+                kwargs['name'],
+                similarity=kwargs['name_match'] == 'similarity',
+            )
 
         committees = filter_query(models.Committee, committees, list_filter_fields, kwargs)
 
@@ -145,6 +160,28 @@ class CommitteeView(Resource):
         return committees
 
 
+@spec.doc(
+    tags=['committee'],
+    description=docs.COMMITTEE_BATCH,
+)
+class CommitteeBatchView(CommitteeView):
+
+    @args.register_kwargs(args.make_batch_args('committee_id', docs.COMMITTEE_ID))
+    @args.register_kwargs(args.committee)
+    @args.register_kwargs(
+        args.make_sort_args(
+            default=['name'],
+            validator=args.IndexValidator(models.CommitteeDetail),
+        )
+    )
+    @schemas.marshal_with(schemas.CommitteeDetailPageSchema())
+    def get(self, **kwargs):
+        args.validate_batch(kwargs['committee_id'], 'committee_id')
+        query = self.get_committee(kwargs, None, None)
+        query = query.filter(models.CommitteeDetail.committee_id.in_(kwargs['committee_id']))
+        return utils.fetch_page(query, kwargs, model=models.CommitteeDetail)
+
+
 @spec.doc(
     tags=['committee'],
     description=docs.COMMITTEE_HISTORY,
@@ -5,6 +5,7 @@ from webservices import docs
 from webservices import spec
 from webservices import utils
 from webservices import schemas
+from webservices.common import counts
 from webservices.common import models
 from webservices.common.util import filter_query
 
@@ -40,6 +41,7 @@ range_fields = [
 class FilingsView(Resource):
 
     @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
     @args.register_kwargs(
         args.make_sort_args(
             default=['-receipt_date'],
@@ -50,7 +52,7 @@ class FilingsView(Resource):
     def get(self, committee_id=None, **kwargs):
         filings = models.Filings.query
         filings = filings.filter_by(committee_id=committee_id)
-        return utils.fetch_page(filings, kwargs, model=models.Filings)
+        return utils.fetch_page(filings, kwargs, model=models.Filings, index_column=models.Filings.sub_id)
 
 
 @spec.doc(
@@ -60,6 +62,7 @@ class FilingsView(Resource):
 class FilingsList(Resource):
 
     @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
     @args.register_kwargs(args.filings)
     @args.register_kwargs(
         args.make_sort_args(
@@ -72,4 +75,9 @@ class FilingsList(Resource):
         query = models.Filings.query
         query = filter_query(models.Filings, query, fields, kwargs)
         query = utils.filter_range(query, kwargs, range_fields)
-        return utils.fetch_page(query, kwargs, model=models.Filings)
+        return utils.fetch_page(
+            query, kwargs,
+            model=models.Filings,
+            index_column=models.Filings.sub_id,
+            count_mode=counts.ESTIMATE,
+        )
@@ -6,7 +6,10 @@ from webservices import docs
 from webservices import spec
 from webservices import utils
 from webservices import schemas
+from webservices import statements
+from webservices.common import counts
 from webservices.common import models
+from webservices.common import committee_types
 
 
 reports_schema_map = {
@@ -18,6 +21,9 @@ reports_schema_map = {
 # We don't have report data for C and E yet
 default_schemas = (models.CommitteeReportsPacParty, schemas.CommitteeReportsPacPartyPageSchema)
 
+# Arguments only compared to columns by `get_reports`
+bound_fields = {'committee_id', 'year', 'cycle', 'beginning_image_number'}
+
 
 reports_type_map = {
     'house-senate': 'H',
@@ -38,6 +44,24 @@ def parse_types(types):
     return include, exclude
 
 
+def filter_reports(query, reports_class, kwargs):
+    if kwargs['year']:
+        query = query.filter(reports_class.report_year.in_(kwargs['year']))
+    if kwargs['cycle']:
+        query = query.filter(reports_class.cycle.in_(kwargs['cycle']))
+    if kwargs['beginning_image_number']:
+        query = query.filter(reports_class.beginning_image_number.in_(kwargs['beginning_image_number']))
+
+    if kwargs['report_type']:
+        include, exclude = parse_types(kwargs['report_type'])
+        if include:
+            query = query.filter(reports_class.report_type.in_(include))
+        elif exclude:
+            query = query.filter(sa.not_(reports_class.report_type.in_(exclude)))
+
+    return query
+
+
 @spec.doc(
     tags=['financial'],
     description=docs.REPORTS,
@@ -61,55 +85,79 @@ def parse_types(types):
 class ReportsView(Resource):
 
     @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
     @args.register_kwargs(args.reports)
     @args.register_kwargs(args.make_sort_args(default=['-coverage_end_date']))
     @schemas.marshal_with(schemas.CommitteeReportsPageSchema(), wrap=False)
     def get(self, committee_id=None, committee_type=None, **kwargs):
-        query, reports_class, reports_schema = self.get_reports(committee_id, committee_type, kwargs)
-        validator = args.IndexValidator(reports_class)
-        for key in kwargs['sort']:
-            validator(key)
-        page = utils.fetch_page(query, kwargs, model=reports_class)
-        return reports_schema().dump(page).data
-
-    def get_reports(self, committee_id, committee_type, kwargs):
         reports_class, reports_schema = reports_schema_map.get(
             self._resolve_committee_type(committee_id, committee_type, kwargs),
             default_schemas,
         )
+        validator = args.IndexValidator(reports_class)
+        for key in kwargs['sort']:
+            validator(key)
+        statement = statements.Statement(
+            (type(self), reports_class),
+            lambda bound_kwargs: self.get_reports(reports_class, bound_kwargs),
+            utils.extend(kwargs, {'committee_id': committee_id}),
+            bound_fields,
+            models.db.session(),
+        )
+        page = utils.fetch_page(
+            statement.query(), kwargs,
+            model=reports_class, index_column=reports_class.idx, statement=statement,
+        )
+        return schemas.get_schema(reports_schema, kwargs.get('fields')).dump(page).data
 
+    def get_reports(self, reports_class, kwargs):
         query = reports_class.query
 
         # Eagerly load committees if applicable
         if hasattr(reports_class, 'committee'):
             query = reports_class.query.options(sa.orm.joinedload(reports_class.committee))
 
-        if committee_id is not None:
-            query = query.filter_by(committee_id=committee_id)
-
-        if kwargs['year']:
-            query = query.filter(reports_class.report_year.in_(kwargs['year']))
-        if kwargs['cycle']:
-            query = query.filter(reports_class.cycle.in_(kwargs['cycle']))
-        if kwargs['beginning_image_number']:
-            query = query.filter(reports_class.beginning_image_number.in_(kwargs['beginning_image_number']))
+        if kwargs['committee_id'] is not None:
+            query = query.filter_by(committee_id=kwargs['committee_id'])
 
-        if kwargs['report_type']:
-            include, exclude = parse_types(kwargs['report_type'])
-            if include:
-                query = query.filter(reports_class.report_type.in_(include))
-            elif exclude:
-                query = query.filter(sa.not_(reports_class.report_type.in_(exclude)))
-
-        return query, reports_class, reports_schema
+        return filter_reports(query, reports_class, kwargs)
 
     def _resolve_committee_type(self, committee_id, committee_type, kwargs):
         if committee_id is not None:
-            query = models.CommitteeHistory.query.filter_by(committee_id=committee_id)
-            if kwargs['cycle']:
-                query = query.filter(models.CommitteeHistory.cycle.in_(kwargs['cycle']))
-            query = query.order_by(sa.desc(models.CommitteeHistory.cycle))
-            committee = query.first_or_404()
-            return committee.committee_type
+            return committee_types.get_committee_type(committee_id, kwargs['cycle'])
         elif committee_type is not None:
             return reports_type_map.get(committee_type)
+
+
+@spec.doc(
+    tags=['financial'],
+    description=docs.REPORTS_COMBINED,
+)
+class ReportsCombinedView(Resource):
+
+    filter_multi_fields = [
+        ('committee_id', models.CommitteeReportsCombined.committee_id),
+        ('committee_type', models.CommitteeReportsCombined.committee_type),
+        ('committee_designation', models.CommitteeReportsCombined.committee_designation),
+    ]
+
+    @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
+    @args.register_kwargs(args.reports)
+    @args.register_kwargs(args.combined)
+    @args.register_kwargs(
+        args.make_sort_args(
+            default=['-coverage_end_date'],
+            validator=args.IndexValidator(models.CommitteeReportsCombined),
+        )
+    )
+    @schemas.marshal_with(schemas.CommitteeReportsCombinedPageSchema())
+    def get(self, **kwargs):
+        query = utils.filter_multi(models.CommitteeReportsCombined.query, kwargs, self.filter_multi_fields)
+        query = filter_reports(query, models.CommitteeReportsCombined, kwargs)
+        return utils.fetch_page(
+            query, kwargs,
+            model=models.CommitteeReportsCombined,
+            index_column=models.CommitteeReportsCombined.idx,
+            count_mode=counts.ESTIMATE,
+        )
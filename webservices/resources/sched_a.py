@@ -15,6 +15,7 @@ from webservices.common.views import ItemizedResource
 class ScheduleAView(ItemizedResource):
 
     model = models.ScheduleA
+    search_model = models.ScheduleASearch
 
     @property
     def year_column(self):
@@ -58,9 +59,12 @@ class ScheduleAView(ItemizedResource):
 
     def build_query(self, kwargs):
         query = super(ScheduleAView, self).build_query(kwargs)
+        query = self.filter_contributor_type(query, kwargs)
+        return query
+
+    def load_related(self, query):
         query = query.options(sa.orm.joinedload(models.ScheduleA.committee))
         query = query.options(sa.orm.joinedload(models.ScheduleA.contributor))
-        query = self.filter_contributor_type(query, kwargs)
         return query
 
     def filter_contributor_type(self, query, kwargs):
@@ -75,3 +79,22 @@ class ScheduleAView(ItemizedResource):
             models.ScheduleASearch,
             models.ScheduleA.sched_a_sk == models.ScheduleASearch.sched_a_sk,
         )
+
+
+@spec.doc(
+    tags=['schedules'],
+    description=docs.SCHEDULE_A_EXPORT,
+)
+class ScheduleAExportView(ScheduleAView):
+
+    @args.register_kwargs(args.itemized)
+    @args.register_kwargs(args.schedule_a)
+    @args.register_kwargs(args.export)
+    @args.register_kwargs(
+        args.make_sort_args(
+            validator=args.OptionValidator(['contributor_receipt_date', 'contributor_receipt_amount']),
+            multiple=False,
+        )
+    )
+    def get(self, **kwargs):
+        return self.export(kwargs, filename='schedule_a')
@@ -52,8 +52,7 @@ class ScheduleBView(ItemizedResource):
     def get(self, **kwargs):
         return super(ScheduleBView, self).get(**kwargs)
 
-    def build_query(self, kwargs):
-        query = super(ScheduleBView, self).build_query(kwargs)
+    def load_related(self, query):
         query = query.options(sa.orm.joinedload(models.ScheduleB.committee))
         query = query.options(sa.orm.joinedload(models.ScheduleB.recipient_committee))
         return query
@@ -63,3 +62,22 @@ class ScheduleBView(ItemizedResource):
             models.ScheduleBSearch,
             models.ScheduleB.sched_b_sk == models.ScheduleBSearch.sched_b_sk,
         )
+
+
+@spec.doc(
+    tags=['schedules'],
+    description=docs.SCHEDULE_B_EXPORT,
+)
+class ScheduleBExportView(ScheduleBView):
+
+    @args.register_kwargs(args.itemized)
+    @args.register_kwargs(args.schedule_b)
+    @args.register_kwargs(args.export)
+    @args.register_kwargs(
+        args.make_sort_args(
+            validator=args.OptionValidator(['disbursement_date', 'disbursement_amount']),
+            multiple=False,
+        )
+    )
+    def get(self, **kwargs):
+        return self.export(kwargs, filename='schedule_b')
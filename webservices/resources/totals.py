@@ -1,4 +1,3 @@
-import sqlalchemy as sa
 from flask.ext.restful import Resource
 
 from webservices import args
@@ -6,7 +5,9 @@ from webservices import docs
 from webservices import spec
 from webservices import utils
 from webservices import schemas
+from webservices.common import counts
 from webservices.common import models
+from webservices.common import committee_types
 
 
 totals_schema_map = {
@@ -35,6 +36,7 @@ default_schemas = (models.CommitteeTotalsPacParty, schemas.CommitteeTotalsPacPar
 class TotalsView(Resource):
 
     @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
     @args.register_kwargs(args.totals)
     @args.register_kwargs(args.make_sort_args(default=['-cycle']))
     @schemas.marshal_with(schemas.CommitteeTotalsPageSchema(), wrap=False)
@@ -47,8 +49,8 @@ class TotalsView(Resource):
         for key in kwargs['sort']:
             validator(key)
         totals = self.get_totals(committee_id, totals_class, kwargs)
-        page = utils.fetch_page(totals, kwargs)
-        return totals_schema().dump(page).data
+        page = utils.fetch_page(totals, kwargs, model=totals_class, index_column=totals_class.idx)
+        return schemas.get_schema(totals_schema, kwargs.get('fields')).dump(page).data
 
     def get_totals(self, committee_id, totals_class, kwargs):
         totals = totals_class.query.filter_by(committee_id=committee_id)
@@ -57,9 +59,38 @@ class TotalsView(Resource):
         return totals
 
     def _resolve_committee_type(self, committee_id, kwargs):
-        query = models.CommitteeHistory.query.filter_by(committee_id=committee_id)
-        if kwargs['cycle']:
-            query = query.filter(models.CommitteeHistory.cycle.in_(kwargs['cycle']))
-        query = query.order_by(sa.desc(models.CommitteeHistory.cycle))
-        committee = query.first_or_404()
-        return committee.committee_type
+        return committee_types.get_committee_type(committee_id, kwargs['cycle'])
+
+
+@spec.doc(
+    tags=['financial'],
+    description=docs.TOTALS_COMBINED,
+)
+class TotalsCombinedView(Resource):
+
+    filter_multi_fields = [
+        ('committee_id', models.CommitteeTotalsCombined.committee_id),
+        ('committee_type', models.CommitteeTotalsCombined.committee_type),
+        ('committee_designation', models.CommitteeTotalsCombined.committee_designation),
+        ('cycle', models.CommitteeTotalsCombined.cycle),
+    ]
+
+    @args.register_kwargs(args.paging)
+    @args.register_kwargs(args.seek)
+    @args.register_kwargs(args.totals)
+    @args.register_kwargs(args.combined)
+    @args.register_kwargs(
+        args.make_sort_args(
+            default=['-receipts'],
+            validator=args.IndexValidator(models.CommitteeTotalsCombined),
+        )
+    )
+    @schemas.marshal_with(schemas.CommitteeTotalsCombinedPageSchema())
+    def get(self, **kwargs):
+        query = utils.filter_multi(models.CommitteeTotalsCombined.query, kwargs, self.filter_multi_fields)
+        return utils.fetch_page(
+            query, kwargs,
+            model=models.CommitteeTotalsCombined,
+            index_column=models.CommitteeTotalsCombined.idx,
+            count_mode=counts.ESTIMATE,
+        )
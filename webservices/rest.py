@@ -6,8 +6,11 @@ import os
 import re
 import http
 import logging
+import datetime
 
+import sqlalchemy as sa
 from flask import abort
+from flask import g
 from flask import request
 from flask import jsonify
 from flask import url_for
@@ -25,7 +28,9 @@ from webservices import utils
 from webservices import schemas
 from webservices import exceptions
 from webservices.common import util
+from webservices.common import cache
 from webservices.common import models
+from webservices.common import typeahead
 from webservices.common.models import db
 from webservices.resources import totals
 from webservices.resources import reports
@@ -53,8 +58,18 @@ def sqla_conn_string():
 app = Flask(__name__)
 app.debug = True
 app.config['SQLALCHEMY_DATABASE_URI'] = sqla_conn_string()
+# Cache responses by default only if a cache file is configured with
+# `FEC_CACHE_PATH`, rather than left in each container's temporary directory
+app.config['RESPONSE_CACHE'] = os.getenv(
+    'FEC_RESPONSE_CACHE',
+    'true' if os.getenv('FEC_CACHE_PATH') else 'false',
+) not in ('False', 'false', 'f')
+app.config['TYPEAHEAD_INDEX'] = os.getenv('FEC_TYPEAHEAD_INDEX', 'true') not in ('False', 'false', 'f')
 # app.config['SQLALCHEMY_ECHO'] = True
 db.init_app(app)
+if app.config['TYPEAHEAD_INDEX']:
+    typeahead.candidates.init_app(app)
+    typeahead.committees.init_app(app)
 
 
 v1 = Blueprint('v1', __name__, url_prefix='/v1')
@@ -99,17 +114,138 @@ def add_cors_headers(response):
     return response
 
 
+# Responses only change when materialized views are refreshed, which bumps the
+# cache generation, or, for itemized data, when queued changes are consumed,
+# which bumps the generation of its scope; the timeout is a fallback in case a
+# refresh is missed
+response_cache = cache.Cache(
+    'responses',
+    ttl=int(os.getenv('FEC_RESPONSE_CACHE_TTL', 60 * 60 * 24)),
+    max_size=int(os.getenv('FEC_RESPONSE_CACHE_SIZE', 256)),
+)
+
+
+def get_response_key():
+    """Build a cache key from the request path and arguments. Argument names
+    are sorted, but the order of repeated values is preserved, since it is
+    significant for arguments like `sort`.
+    """
+    query = sorted(
+        (key, values)
+        for key, values in request.args.lists()
+        if key != 'api_key'
+    )
+    return request.path, query
+
+
+def is_cacheable_request():
+    return (
+        app.config['RESPONSE_CACHE'] and
+        request.method == 'GET' and
+        request.blueprint == 'v1'
+    )
+
+
+def get_etag():
+    """Build a strong entity tag from the data generations, which all
+    instances share, and the request, so that tags change exactly when the
+    underlying data or arguments change.
+    """
+    generations = cache.get_generations(scope=utils.get_cache_scope())
+    return cache.make_key('etag', generations, get_response_key())
+
+
+def get_last_modified():
+    refreshed = cache.get_refreshed(scope=utils.get_cache_scope())
+    if refreshed is None:
+        return None
+    # HTTP dates have a resolution of one second
+    return datetime.datetime.utcfromtimestamp(int(refreshed))
+
+
+def is_conditional_request():
+    return request.method == 'GET' and request.blueprint == 'v1'
+
+
+@app.before_request
+def check_not_modified():
+    """Respond with 304 Not Modified before building any query if the client
+    already has the current representation. Without a known refresh time, the
+    generation may not reflect the data, so always respond in full.
+    """
+    if not is_conditional_request():
+        return None
+    last_modified = get_last_modified()
+    if last_modified is None:
+        return None
+    etag = get_etag()
+    if request.if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since
+        modified = not request.if_none_match.contains(etag)
+    else:
+        modified = (
+            request.if_modified_since is None or
+            last_modified > request.if_modified_since
+        )
+    if modified:
+        return None
+    response = app.response_class(status=http.client.NOT_MODIFIED)
+    response.set_etag(etag)
+    return response
+
+
+@app.before_request
+def load_cached_response():
+    if not is_cacheable_request():
+        return None
+    cached = response_cache.get(get_response_key(), scope=utils.get_cache_scope())
+    if cached is None:
+        return None
+    g.cached_response = True
+    response = app.response_class(cached['data'], mimetype=cached['mimetype'])
+    response.headers['X-Cache'] = 'HIT'
+    return response
+
+
+@app.after_request
+def cache_response(response):
+    if not is_cacheable_request() or g.get('cached_response'):
+        return response
+    if response.status_code == 200 and not response.is_streamed:
+        response_cache.set(
+            get_response_key(),
+            {'data': response.get_data(as_text=True), 'mimetype': response.mimetype},
+            scope=utils.get_cache_scope(),
+        )
+        response.headers['X-Cache'] = 'MISS'
+    return response
+
+
 @app.after_request
 def add_caching_headers(response):
     max_age = os.getenv('FEC_CACHE_AGE')
     if max_age is not None:
         response.headers.add('Cache-Control', 'public, max-age={}'.format(max_age))
+    if is_conditional_request() and response.status_code == 200:
+        last_modified = get_last_modified()
+        if last_modified is not None:
+            response.set_etag(get_etag())
+            response.last_modified = last_modified
     return response
 
 
-def search_typeahead_text(model, text):
-    query = utils.search_text(model.query, model.fulltxt, text)
-    query = query.limit(20)
+def search_typeahead_text(model, text, index=None):
+    """Search names using the in-process `index` if enabled, falling back
+    to fulltext search if the index is loading, has no matches, or can't
+    match `text`; see `typeahead.Typeahead.search`.
+    """
+    if index is not None and app.config['TYPEAHEAD_INDEX']:
+        results = index.search(text, limit=20)
+        if results:
+            return {'results': results}
+    ranked = utils.rank_text(model.id, model.fulltxt, model.receipts, text)
+    query = model.query.join(ranked, model.id == ranked.c.key)
+    query = query.order_by(sa.desc(ranked.c.rank)).limit(20)
     return {'results': query.all()}
 
 
@@ -126,7 +262,7 @@ class CandidateNameSearch(restful.Resource):
     @args.register_kwargs(args.names)
     @schemas.marshal_with(schemas.CandidateSearchListSchema())
     def get(self, **kwargs):
-        return search_typeahead_text(models.CandidateSearch, kwargs['q'])
+        return search_typeahead_text(models.CandidateSearch, kwargs['q'], index=typeahead.candidates)
 
 
 @spec.doc(
@@ -142,7 +278,7 @@ class CommitteeNameSearch(restful.Resource):
     @args.register_kwargs(args.names)
     @schemas.marshal_with(schemas.CommitteeSearchListSchema())
     def get(self, **kwargs):
-        return search_typeahead_text(models.CommitteeSearch, kwargs['q'])
+        return search_typeahead_text(models.CommitteeSearch, kwargs['q'], index=typeahead.committees)
 
 
 api.add_resource(candidates.CandidateList, '/candidates')
@@ -152,6 +288,7 @@ api.add_resource(
     '/candidate/<string:candidate_id>',
     '/committee/<string:committee_id>/candidates',
 )
+api.add_resource(candidates.CandidateBatchView, '/candidates/detail')
 api.add_resource(
     candidates.CandidateHistoryView,
     '/candidate/<string:candidate_id>/history',
@@ -165,6 +302,7 @@ api.add_resource(
     '/committee/<string:committee_id>',
     '/candidate/<string:candidate_id>/committees',
 )
+api.add_resource(committees.CommitteeBatchView, '/committees/detail')
 api.add_resource(
     committees.CommitteeHistoryView,
     '/committee/<string:committee_id>/history',
@@ -173,11 +311,15 @@ api.add_resource(
     '/candidate/<candidate_id>/committees/history/<int:cycle>',
 )
 api.add_resource(totals.TotalsView, '/committee/<string:committee_id>/totals')
+api.add_resource(totals.TotalsCombinedView, '/totals')
+api.add_resource(reports.ReportsCombinedView, '/reports')
 api.add_resource(reports.ReportsView, '/committee/<string:committee_id>/reports', '/reports/<string:committee_type>')
 api.add_resource(CandidateNameSearch, '/names/candidates')
 api.add_resource(CommitteeNameSearch, '/names/committees')
 api.add_resource(sched_a.ScheduleAView, '/schedules/schedule_a')
 api.add_resource(sched_b.ScheduleBView, '/schedules/schedule_b')
+api.add_resource(sched_a.ScheduleAExportView, '/schedules/schedule_a/export')
+api.add_resource(sched_b.ScheduleBExportView, '/schedules/schedule_b/export')
 api.add_resource(
     aggregates.ScheduleABySizeView,
     '/schedules/schedule_a/by_size',
@@ -193,6 +335,51 @@ api.add_resource(
     '/schedules/schedule_a/by_zip',
     '/committee/<committee_id>/schedules/schedule_a/by_zip',
 )
+api.add_resource(
+    aggregates.ScheduleAByEmployerView,
+    '/schedules/schedule_a/by_employer',
+    '/committee/<committee_id>/schedules/schedule_a/by_employer',
+)
+api.add_resource(
+    aggregates.ScheduleAByOccupationView,
+    '/schedules/schedule_a/by_occupation',
+    '/committee/<committee_id>/schedules/schedule_a/by_occupation',
+)
+api.add_resource(
+    aggregates.ScheduleAByContributorView,
+    '/schedules/schedule_a/by_contributor',
+    '/committee/<committee_id>/schedules/schedule_a/by_contributor',
+)
+api.add_resource(
+    aggregates.ScheduleBByRecipientView,
+    '/schedules/schedule_b/by_recipient',
+    '/committee/<committee_id>/schedules/schedule_b/by_recipient',
+)
+api.add_resource(
+    aggregates.ScheduleBByRecipientIdView,
+    '/schedules/schedule_b/by_recipient_id',
+    '/committee/<committee_id>/schedules/schedule_b/by_recipient_id',
+)
+api.add_resource(
+    aggregates.ScheduleBByStateView,
+    '/schedules/schedule_b/by_state',
+    '/committee/<committee_id>/schedules/schedule_b/by_state',
+)
+api.add_resource(
+    aggregates.ScheduleBByPurposeView,
+    '/schedules/schedule_b/by_purpose',
+    '/committee/<committee_id>/schedules/schedule_b/by_purpose',
+)
+api.add_resource(
+    aggregates.ScheduleAByDateView,
+    '/schedules/schedule_a/by_date',
+    '/committee/<committee_id>/schedules/schedule_a/by_date',
+)
+api.add_resource(
+    aggregates.ScheduleBByDateView,
+    '/schedules/schedule_b/by_date',
+    '/committee/<committee_id>/schedules/schedule_b/by_date',
+)
 api.add_resource(filings.FilingsView, '/committee/<string:committee_id>/filings')
 api.add_resource(filings.FilingsList, '/filings')
 
@@ -256,14 +443,20 @@ register_resource(CommitteeNameSearch, blueprint='v1')
 register_resource(candidates.CandidateView, blueprint='v1')
 register_resource(candidates.CandidateList, blueprint='v1')
 register_resource(candidates.CandidateSearch, blueprint='v1')
+register_resource(candidates.CandidateBatchView, blueprint='v1')
 register_resource(candidates.CandidateHistoryView, blueprint='v1')
 register_resource(committees.CommitteeView, blueprint='v1')
 register_resource(committees.CommitteeList, blueprint='v1')
+register_resource(committees.CommitteeBatchView, blueprint='v1')
 register_resource(committees.CommitteeHistoryView, blueprint='v1')
 register_resource(reports.ReportsView, blueprint='v1')
+register_resource(reports.ReportsCombinedView, blueprint='v1')
 register_resource(totals.TotalsView, blueprint='v1')
+register_resource(totals.TotalsCombinedView, blueprint='v1')
 register_resource(sched_a.ScheduleAView, blueprint='v1')
 register_resource(sched_b.ScheduleBView, blueprint='v1')
+register_resource(sched_a.ScheduleAExportView, blueprint='v1')
+register_resource(sched_b.ScheduleBExportView, blueprint='v1')
 register_resource(filings.FilingsView, blueprint='v1')
 register_resource(filings.FilingsList, blueprint='v1')
 
@@ -8,6 +8,8 @@ from marshmallow_sqlalchemy import ModelSchema
 
 from webservices import utils
 from webservices import paging
+from webservices import exceptions
+from webservices import serializers
 from webservices.spec import spec
 from webservices.common import models
 from webservices import __API_VERSION__
@@ -47,13 +49,48 @@ def marshal_with(schema, code=http.client.OK, description=None, wrap=True):
         if wrap:
             @functools.wraps(func)
             def wrapped(*args, **kwargs):
-                return schema.dump(func(*args, **kwargs)).data
+                fields = kwargs.get('fields')
+                dump_schema = get_schema(type(schema), fields) if fields else schema
+                return dump_schema.dump(func(*args, **kwargs)).data
             return wrapped
         return func
 
     return wrapper
 
 
+def get_schema(schema_class, fields=None):
+    """Get an instance of `schema_class` that serializes the requested
+    `fields`, or all fields if none are requested. Resources that choose
+    their schema per request must serialize with this schema, since
+    `utils.project` only loads the columns of the requested fields.
+    """
+    if fields:
+        return restrict_fields(schema_class, tuple(fields))
+    return schema_class()
+
+
+@functools.lru_cache(maxsize=256)
+def restrict_fields(schema_class, fields):
+    """Build an instance of `schema_class` that only serializes `fields`. For
+    page schemas, `fields` restricts the fields of each result.
+
+    :raises: ApiError if any field is not declared on the schema
+    """
+    schema = schema_class()
+    is_page = isinstance(schema.opts, paging.PageSchemaOpts)
+    target = schema.opts.results_schema_class if is_page else schema_class
+    unknown = set(fields) - (set(target._declared_fields) - set(target.opts.exclude))
+    if unknown:
+        raise exceptions.ApiError(
+            'Cannot select unknown fields: {0}'.format(', '.join(sorted(unknown))),
+            status_code=422,
+        )
+    if not is_page:
+        return schema_class(only=fields)
+    schema.declared_fields[schema.opts.results_field_name].only = fields
+    return schema
+
+
 def register_schema(schema, definition_name=None):
     definition_name = definition_name or re.sub(r'Schema$', '', schema.__name__)
     spec.definition(definition_name, schema=schema())
@@ -83,13 +120,23 @@ def make_schema(model, class_name=None, fields=None, options=None):
 
 
 def make_page_schema(schema, page_type=paging.OffsetPageSchema, class_name=None,
-                     definition_name=None):
+                     definition_name=None, compiled=False):
+    """Build a page schema for results of `schema`.
+
+    :param bool compiled: Serialize results with a compiled serializer; see
+        `serializers.compile_schema`
+    """
     class_name = class_name or '{0}PageSchema'.format(re.sub(r'Schema$', '', schema.__name__))
     definition_name = definition_name or re.sub(r'Schema$', '', schema.__name__)
 
     class Meta:
         results_schema_class = schema
         results_schema_options = {'ref': '#/definitions/{0}'.format(definition_name)}
+        results_compiled = compiled
+
+    if compiled:
+        # Compile at startup rather than on the first request
+        serializers.compile_schema(schema)
 
     return type(
         class_name,
@@ -239,6 +286,19 @@ CommitteeTotalsPageSchema = make_page_schema(CommitteeTotalsSchema)
 register_schema(CommitteeTotalsSchema)
 register_schema(CommitteeTotalsPageSchema)
 
+CommitteeTotalsCombinedSchema = make_schema(models.CommitteeTotalsCombined)
+CommitteeTotalsCombinedPageSchema = make_page_schema(CommitteeTotalsCombinedSchema)
+CommitteeReportsCombinedSchema = make_schema(
+    models.CommitteeReportsCombined,
+    fields={'pdf_url': ma.fields.Str()},
+)
+CommitteeReportsCombinedPageSchema = make_page_schema(CommitteeReportsCombinedSchema)
+
+register_schema(CommitteeTotalsCombinedSchema)
+register_schema(CommitteeTotalsCombinedPageSchema)
+register_schema(CommitteeReportsCombinedSchema)
+register_schema(CommitteeReportsCombinedPageSchema)
+
 
 ScheduleASchema = make_schema(
     models.ScheduleA,
@@ -254,7 +314,7 @@ ScheduleASchema = make_schema(
         'exclude': ('memo_code', ),
     }
 )
-ScheduleAPageSchema = make_page_schema(ScheduleASchema, page_type=paging.SeekPageSchema)
+ScheduleAPageSchema = make_page_schema(ScheduleASchema, page_type=paging.SeekPageSchema, compiled=True)
 register_schema(ScheduleASchema)
 register_schema(ScheduleAPageSchema)
 
@@ -267,17 +327,53 @@ make_aggregate_schema = functools.partial(
 ScheduleABySizeSchema = make_aggregate_schema(models.ScheduleABySize)
 ScheduleAByStateSchema = make_aggregate_schema(models.ScheduleAByState)
 ScheduleAByZipSchema = make_aggregate_schema(models.ScheduleAByZip)
+ScheduleAByEmployerSchema = make_aggregate_schema(models.ScheduleAByEmployer)
+ScheduleAByOccupationSchema = make_aggregate_schema(models.ScheduleAByOccupation)
+ScheduleAByContributorSchema = make_aggregate_schema(models.ScheduleAByContributor)
+ScheduleBByRecipientSchema = make_aggregate_schema(models.ScheduleBByRecipient)
+ScheduleBByRecipientIdSchema = make_aggregate_schema(models.ScheduleBByRecipientId)
+ScheduleBByStateSchema = make_aggregate_schema(models.ScheduleBByState)
+ScheduleBByPurposeSchema = make_aggregate_schema(models.ScheduleBByPurpose)
+ScheduleAByDateSchema = make_aggregate_schema(models.ScheduleAByDate)
+ScheduleBByDateSchema = make_aggregate_schema(models.ScheduleBByDate)
 
 ScheduleABySizePageSchema = make_page_schema(ScheduleABySizeSchema)
 ScheduleAByStatePageSchema = make_page_schema(ScheduleAByStateSchema)
 ScheduleAByZipPageSchema = make_page_schema(ScheduleAByZipSchema)
+ScheduleAByEmployerPageSchema = make_page_schema(ScheduleAByEmployerSchema)
+ScheduleAByOccupationPageSchema = make_page_schema(ScheduleAByOccupationSchema)
+ScheduleAByContributorPageSchema = make_page_schema(ScheduleAByContributorSchema)
+ScheduleBByRecipientPageSchema = make_page_schema(ScheduleBByRecipientSchema)
+ScheduleBByRecipientIdPageSchema = make_page_schema(ScheduleBByRecipientIdSchema)
+ScheduleBByStatePageSchema = make_page_schema(ScheduleBByStateSchema)
+ScheduleBByPurposePageSchema = make_page_schema(ScheduleBByPurposeSchema)
+ScheduleAByDatePageSchema = make_page_schema(ScheduleAByDateSchema)
+ScheduleBByDatePageSchema = make_page_schema(ScheduleBByDateSchema)
 
 register_schema(ScheduleABySizeSchema)
 register_schema(ScheduleAByStateSchema)
 register_schema(ScheduleAByZipSchema)
+register_schema(ScheduleAByEmployerSchema)
+register_schema(ScheduleAByOccupationSchema)
+register_schema(ScheduleAByContributorSchema)
+register_schema(ScheduleBByRecipientSchema)
+register_schema(ScheduleBByRecipientIdSchema)
+register_schema(ScheduleBByStateSchema)
+register_schema(ScheduleBByPurposeSchema)
+register_schema(ScheduleAByDateSchema)
+register_schema(ScheduleBByDateSchema)
 register_schema(ScheduleABySizePageSchema)
 register_schema(ScheduleAByStatePageSchema)
 register_schema(ScheduleAByZipPageSchema)
+register_schema(ScheduleAByEmployerPageSchema)
+register_schema(ScheduleAByOccupationPageSchema)
+register_schema(ScheduleAByContributorPageSchema)
+register_schema(ScheduleBByRecipientPageSchema)
+register_schema(ScheduleBByRecipientIdPageSchema)
+register_schema(ScheduleBByStatePageSchema)
+register_schema(ScheduleBByPurposePageSchema)
+register_schema(ScheduleAByDatePageSchema)
+register_schema(ScheduleBByDatePageSchema)
 
 
 ScheduleBSchema = make_schema(
@@ -294,7 +390,7 @@ ScheduleBSchema = make_schema(
         'exclude': ('memo_code', ),
     }
 )
-ScheduleBPageSchema = make_page_schema(ScheduleBSchema, page_type=paging.SeekPageSchema)
+ScheduleBPageSchema = make_page_schema(ScheduleBSchema, page_type=paging.SeekPageSchema, compiled=True)
 register_schema(ScheduleBSchema)
 register_schema(ScheduleBPageSchema)
 
@@ -0,0 +1,112 @@
+"""Fast serialization for marshmallow schemas.
+
+`compile_schema` builds a function per schema that reads each attribute and
+converts it directly, skipping marshmallow's per-field dispatch, error
+collection and field inference. Fields without a direct converter fall back
+to their own `serialize` method, so output matches `Schema.dump`.
+"""
+
+import functools
+
+import marshmallow as ma
+from marshmallow import utils as ma_utils
+from marshmallow.decorators import PRE_DUMP, POST_DUMP
+
+
+missing = ma.missing
+
+
+def _none_or(func):
+    def convert(value):
+        return None if value is None else func(value)
+    return convert
+
+
+def _format_date(value):
+    return value.isoformat()
+
+
+def _format_datetime(value):
+    return ma_utils.isoformat(value, localtime=False)
+
+
+SIMPLE_CONVERTERS = {
+    ma.fields.Field: lambda value: value,
+    ma.fields.Raw: lambda value: value,
+    ma.fields.String: _none_or(ma_utils.ensure_text_type),
+    ma.fields.Integer: _none_or(int),
+    ma.fields.Float: _none_or(float),
+    ma.fields.Boolean: _none_or(bool),
+    ma.fields.Date: _none_or(_format_date),
+}
+
+
+def get_converter(field):
+    """Get a function converting attribute values for `field`, or `None` if
+    the field must be serialized by marshmallow.
+    """
+    field_type = type(field)
+    if isinstance(field, ma.fields.Number) and field.as_string:
+        return None
+    if field_type in SIMPLE_CONVERTERS:
+        return SIMPLE_CONVERTERS[field_type]
+    if field_type is ma.fields.Decimal:
+        return _none_or(field._format_num)
+    if field_type is ma.fields.DateTime and field.dateformat in (None, 'iso', 'iso8601'):
+        return _none_or(_format_datetime)
+    if field_type is ma.fields.Nested and not field.many and not isinstance(field.only, str):
+        serializer = compile_schema(type(field.schema), field.only)
+        if serializer is not None:
+            return _none_or(serializer)
+    return None
+
+
+def is_compilable(schema):
+    """Check that `schema` doesn't customize dumping in ways that compiled
+    serializers don't reproduce.
+    """
+    return (
+        not schema.extra and
+        not schema.prefix and
+        not schema.__data_handlers__ and
+        type(schema)._postprocess is ma.Schema._postprocess and
+        not any(
+            schema.__processors__[(tag, raw)]
+            for tag in (PRE_DUMP, POST_DUMP)
+            for raw in (True, False)
+        )
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def compile_schema(schema_class, only=None):
+    """Build a function serializing a single object like
+    `schema_class(only=only).dump(obj).data`.
+
+    :returns: Serializer, or `None` if the schema can't be compiled
+    """
+    schema = schema_class(only=only)
+    if not is_compilable(schema):
+        return None
+    steps = []
+    for name, field in schema.fields.items():
+        if field.load_only:
+            continue
+        attribute = getattr(field, 'attribute', None) or name
+        converter = get_converter(field) if '.' not in attribute else None
+        steps.append((name, attribute, converter, field))
+
+    def serialize(obj):
+        ret = {}
+        for name, attribute, converter, field in steps:
+            value = getattr(obj, attribute, missing) if converter is not None else missing
+            if value is missing:
+                # Let marshmallow handle defaults and nested attributes
+                value = field.serialize(name, obj)
+            else:
+                value = converter(value)
+            if value is not missing:
+                ret[name] = value
+        return ret
+
+    return serialize
@@ -28,13 +28,14 @@ def ensure_list(value):
     return []
 
 
+def parse_options(options, model=None):
+    return [parse_option(option, model=model) for option in ensure_list(options)]
+
+
 def sort(query, options, model=None, clear=False):
     if clear:
         query = query.order_by(False)
-    options = ensure_list(options)
-    columns = []
-    for option in options:
-        column, order = parse_option(option, model=model)
+    columns = parse_options(options, model=model)
+    for column, order in columns:
         query = query.order_by(order(column))
-        columns.append((column, order))
     return query, columns
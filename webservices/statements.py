@@ -0,0 +1,170 @@
+"""Cache compiled SQL for queries built from request arguments.
+
+Resources build a query from parsed arguments on every request, and
+SQLAlchemy compiles it to SQL each time. A `Statement` builds the query once
+per *shape* of the arguments instead, with bound argument values replaced by
+bind parameters, and bakes it using `sqlalchemy.ext.baked` so that later
+requests with the same shape reuse the query and the compiled SQL with new
+parameters. Counts of results are derived from the same cached query, and
+also reuse their compiled SQL.
+
+Two requests have the same shape if they are handled by the same resource,
+set the same bound arguments with the same number of values, and have equal
+values for all other arguments, such as sort order or fulltext searches.
+"""
+
+import os
+
+import sqlalchemy as sa
+from sqlalchemy import util
+from sqlalchemy.ext import baked
+
+from webservices.common import counts
+
+
+CACHE_SIZE = int(os.getenv('FEC_STATEMENT_CACHE_SIZE', 500))
+
+bakery = baked.bakery(size=CACHE_SIZE)
+# Queries and count statements built for each shape, and their compiled SQL
+queries = util.LRUCache(CACHE_SIZE)
+compiled_cache = util.LRUCache(CACHE_SIZE)
+
+# Arguments that only affect pagination; paginators bind these separately
+PAGING_ARGS = {'page', 'per_page', 'last_index', 'cursor', 'count_mode'}
+
+
+def _freeze(value):
+    return tuple(value) if isinstance(value, list) else value
+
+
+def is_paging_arg(key):
+    return key in PAGING_ARGS or key.startswith('last_')
+
+
+def bind_kwargs(kwargs, bound):
+    """Replace the values of `bound` arguments with bind parameters.
+
+    :param dict kwargs: Parsed request arguments
+    :param bound: Names of arguments that can be bound; list values are
+        bound one parameter per element
+    :returns: Tuple of shape, arguments with placeholders, and parameters
+    """
+    shape, placeholders, params = [], {}, {}
+    for key, value in kwargs.items():
+        placeholders[key] = value
+        if is_paging_arg(key):
+            continue
+        if key in bound and value is not None and value != [] and value != '':
+            if isinstance(value, list):
+                names = ['{0}_{1}'.format(key, idx) for idx in range(len(value))]
+                placeholders[key] = [sa.bindparam(name) for name in names]
+                params.update(zip(names, value))
+                shape.append((key, ('bound', len(value))))
+            else:
+                placeholders[key] = sa.bindparam(key)
+                params[key] = value
+                shape.append((key, ('bound', 1)))
+        else:
+            shape.append((key, _freeze(value)))
+    return tuple(sorted(shape, key=lambda pair: pair[0])), placeholders, params
+
+
+class Statement(object):
+    """Query built from request arguments, cached by argument shape.
+
+    :param key: Hashable key identifying the resource building the query
+    :param build: Function building a query from request arguments
+    :param dict kwargs: Parsed request arguments
+    :param bound: Names of arguments whose values `build` only passes to SQL
+        expressions, and that can therefore be bound as parameters
+    :param session: Session to run queries in; not a scoped session
+    """
+
+    def __init__(self, key, build, kwargs, bound, session):
+        self.build = build
+        self.shape, self.placeholders, self.params = bind_kwargs(kwargs, bound)
+        self.key = (key, self.shape)
+        self.session = session
+        self.steps = []
+
+    def add(self, fn, *args):
+        """Add a step transforming the query. Steps must not depend on values
+        that vary between requests of the same shape, except through `args`,
+        which are added to the cache key.
+        """
+        self.steps.append((fn, args))
+        return self
+
+    def query(self):
+        """Get the query built by `build` and the steps added so far, bound to
+        this request's parameters. The query is only built once per shape.
+        """
+        key = self.key + tuple((fn.__code__, args) for fn, args in self.steps)
+        query = self._get_cached(key, self._build)
+        return query.with_session(self.session).params(self.params)
+
+    def _build(self):
+        query = self.build(self.placeholders)
+        for fn, args in self.steps:
+            query = fn(query)
+        return query.with_session(None)
+
+    def _get_cached(self, key, build):
+        value = queries.get(key)
+        if value is None:
+            value = queries[key] = build()
+        return value
+
+    def execute_derived(self, name, derive):
+        """Run a statement derived from the query built by `build`, such as a
+        count. The statement is built once per shape and `name`, and compiled
+        once per process.
+
+        :param derive: Function building a statement from the query
+        """
+        statement = self._get_cached(self.key + (name, ), lambda: derive(self.build(self.placeholders)))
+        connection = self.session.connection().execution_options(compiled_cache=compiled_cache)
+        return connection.execute(statement, self.params)
+
+    def bake(self):
+        build, placeholders = self.build, self.placeholders
+        query = bakery(lambda session: build(placeholders).with_session(session), *self.key)
+        for fn, args in self.steps:
+            query.add_criteria(fn, *args)
+        return query
+
+    def execute(self, session, fn, params, *args):
+        """Run the baked query with a final step `fn` and its parameters.
+
+        :returns: Iterable of results
+        """
+        query = self.bake().add_criteria(fn, *args)
+        return query(session).params(self.params).params(params)
+
+
+class StatementCounter(object):
+    """Count results of a `Statement` for `counts.get_count`, reusing the
+    count statements built and compiled for earlier requests of the same
+    shape.
+    """
+
+    def __init__(self, statement):
+        self.statement = statement
+
+    def get_key(self):
+        params = sorted((key, repr(value)) for key, value in self.statement.params.items())
+        return repr(self.statement.key), tuple(params)
+
+    def count(self):
+        return self.statement.execute_derived(
+            'count',
+            lambda query: sa.select([sa.func.count()]).select_from(
+                counts.get_count_query(query).statement.alias()
+            ),
+        ).scalar()
+
+    def explain(self):
+        return self.statement.execute_derived(
+            'explain',
+            lambda query: counts.explain(counts.get_count_query(query).statement, format='json'),
+        ).fetchall()
@@ -1,31 +1,235 @@
+import os
+
+import flask
 import sqlalchemy as sa
 
 from webservices import paging
 from webservices import sorting
+from webservices import exceptions
+from webservices import statements
+from webservices.common import counts
+
+
+# Pages at least this large are streamed from a server-side cursor
+STREAM_PER_PAGE = int(os.getenv('FEC_STREAM_PER_PAGE', 100))
+# Number of most heavily weighted fulltext matches ranked by `rank_text`
+RANK_LIMIT = int(os.getenv('FEC_RANK_LIMIT', 1000))
+
 
+def fetch_page(query, kwargs, model=None, clear=False, count=None, index_column=None,
+               count_mode=counts.EXACT, statement=None, ranked=False):
+    """Fetch a page of results using offset pagination, or keyset pagination
+    if the resource supports it and the request includes `cursor` or
+    `last_index`.
 
-def fetch_page(query, kwargs, model=None, clear=False, count=None):
-    query, _ = sorting.sort(query, kwargs['sort'], model=model, clear=clear)
-    paginator = paging.SqlalchemyOffsetPaginator(query, kwargs['per_page'], count=count)
+    :param index_column: Optional unique column used to break ties in sorting
+        and to enable keyset pagination
+    :param str count_mode: Default count strategy for the resource; may be
+        overridden by the `count_mode` argument
+    :param statement: Optional `statements.Statement` building the same query
+        as `query`; if given, the query is prepared, counted, and fetched
+        only through the statement, reusing queries and compiled SQL built
+        for earlier requests of the same shape
+    :param bool ranked: Whether `query` orders results by relevance ahead of
+        the requested sort; see `is_ranked`. Keyset pagination can't resume
+        from a position in relevance order, so seek arguments are rejected
+        and pages don't report last indexes
+    """
+    if ranked and is_seek_request(kwargs):
+        raise exceptions.ApiError(
+            'Cannot use cursor or last_index when ordering by relevance; use page instead',
+            status_code=422,
+        )
+    if index_column is not None and is_seek_request(kwargs):
+        return fetch_seek_page(
+            query, kwargs, index_column,
+            clear=clear, count=count, count_mode=count_mode, statement=statement,
+        )
+    count, count_mode = get_count(query, kwargs, count, count_mode, statement=statement)
+    query, sort_columns = prepare_page_query(query, kwargs, model, index_column, clear=clear, statement=statement)
+    paginator = paging.SqlalchemyOffsetPaginator(
+        query,
+        kwargs['per_page'],
+        index_column=index_column,
+        sort_columns=sort_columns if index_column is not None else None,
+        count=count,
+        count_mode=count_mode,
+        stream=should_stream(kwargs),
+        statement=statement,
+        seekable=not ranked,
+    )
     return paginator.get_page(kwargs['page'])
 
 
-def fetch_seek_page(query, kwargs, index_column, clear=False, count=None):
-    model = index_column.class_
-    query, sort_columns = sorting.sort(query, kwargs['sort'], model=model, clear=clear)
-    sort_column = sort_columns[0] if sort_columns else None
+def prepare_query(query, kwargs, model=None, index_column=None, clear=False, sort_model=None):
+    """Sort `query` and restrict loaded columns to the requested fields.
+
+    :param sort_model: Optional model to sort on, if not `model`; sort columns
+        must have the same names on both models
+    :returns: Tuple of query and sort columns
+    """
+    query, sort_columns = sorting.sort(query, kwargs['sort'], model=sort_model or model, clear=clear)
+    if model is not None:
+        required = [column for column, _ in sort_columns]
+        if index_column is not None:
+            required.append(index_column)
+        query = project(query, model, kwargs.get('fields'), required)
+    return query, sort_columns
+
+
+def prepare_page_query(query, kwargs, model=None, index_column=None, clear=False, sort_model=None,
+                       statement=None):
+    """Prepare `query` as in `prepare_query`, or, if `statement` is given, add
+    the preparation to the statement and get the prepared query from it.
+
+    :returns: Tuple of query and sort columns
+    """
+    if statement is None:
+        return prepare_query(query, kwargs, model, index_column, clear=clear, sort_model=sort_model)
+    statement.add(
+        lambda query: prepare_query(
+            query, kwargs, model, index_column, clear=clear, sort_model=sort_model,
+        )[0]
+    )
+    return statement.query(), sorting.parse_options(kwargs['sort'], model=sort_model or model)
+
+
+def get_count(query, kwargs, count=None, count_mode=counts.EXACT, statement=None):
+    """Count results using the requested strategy, unless the caller has
+    already provided a count. Unless the client explicitly requests exact
+    counts, pages after the first reuse the cached count from the first page.
+
+    :param statement: Optional `statements.Statement` building `query`, whose
+        cached count statements are used instead of `query`
+    :returns: Tuple of count and the strategy used
+    """
+    if kwargs.get('count_mode'):
+        count_mode = kwargs['count_mode']
+    elif count_mode == counts.EXACT and (kwargs.get('page', 1) > 1 or is_seek_request(kwargs)):
+        count_mode = counts.CACHED
+    if count is None:
+        if statement is not None:
+            counter = statements.StatementCounter(statement)
+        else:
+            counter = counts.QueryCounter(query)
+        count = counts.get_count(counter, count_mode, key=flask.request.endpoint, scope=get_cache_scope())
+    return count, count_mode
+
+
+def get_cache_scope():
+    """Get the cache scope of the data served by the current request's
+    resource, as set by its `cache_scope` attribute; see `cache.Cache`.
+    """
+    view = flask.current_app.view_functions.get(flask.request.endpoint)
+    return getattr(getattr(view, 'view_class', None), 'cache_scope', None)
+
+
+def is_ranked(kwargs):
+    """Check whether results are ordered by relevance to a fulltext query, as
+    with `rank_text`, or to a similar name, as with `search_name`.
+    """
+    return bool(kwargs.get('q')) or bool(kwargs.get('name') and kwargs.get('name_match') == 'similarity')
+
+
+def should_stream(kwargs):
+    return kwargs['per_page'] >= STREAM_PER_PAGE
+
+
+def is_seek_request(kwargs):
+    return kwargs.get('cursor') is not None or kwargs.get('last_index') is not None
+
+
+def fetch_seek_page(query, kwargs, index_column, clear=False, count=None, count_mode=counts.EXACT,
+                    statement=None, model=None):
+    """Fetch a page of results using keyset pagination.
+
+    :param index_column: Unique column used to break ties in sorting; results
+        are sorted on columns of its model
+    :param model: Optional model of the results, if not the model of
+        `index_column`, such as a model joined to a search table that carries
+        the sort columns
+    """
+    sort_model = index_column.class_
+    model = model or sort_model
+    count, count_mode = get_count(query, kwargs, count, count_mode, statement=statement)
+    query, sort_columns = prepare_page_query(
+        query, kwargs, model, index_column, clear=clear, sort_model=sort_model, statement=statement,
+    )
     paginator = paging.SqlalchemySeekPaginator(
         query,
         kwargs['per_page'],
         index_column,
-        sort_column=sort_column,
+        sort_columns=sort_columns,
         count=count,
+        count_mode=count_mode,
+        stream=should_stream(kwargs),
+        statement=statement,
     )
-    if sort_column is not None:
-        sort_index = kwargs['last_{0}'.format(sort_column[0].key)]
+    if kwargs.get('cursor') is not None:
+        sort_indexes, last_index = paging.decode_cursor(kwargs['cursor'], sort_columns, index_column)
+    elif kwargs.get('last_index') is not None:
+        sort_indexes, last_index = get_sort_indexes(kwargs, sort_columns), kwargs['last_index']
     else:
-        sort_index = None
-    return paginator.get_page(last_index=kwargs['last_index'], sort_index=sort_index)
+        sort_indexes, last_index = [], None
+    return paginator.get_page(last_index=last_index, sort_indexes=sort_indexes)
+
+
+def project(query, model, fields, required=()):
+    """Load only the columns and relationships of `model` needed to serialize
+    `fields`. If any field is computed from other attributes, all columns are
+    loaded, since its dependencies are unknown.
+
+    :param list fields: Requested field names, or `None` to load everything
+    :param list required: Columns that must be loaded, such as sort columns
+    """
+    if not fields:
+        return query
+    mapper = sa.inspect(model)
+    columns = set(mapper.column_attrs.keys())
+    relationships = set(mapper.relationships.keys())
+    fields = set(fields)
+    for key in relationships - fields:
+        query = query.options(sa.orm.noload(getattr(model, key)))
+    if fields - columns - relationships:
+        return query
+    keys = fields & columns
+    keys.update(column.key for column in required)
+    keys.update(mapper.get_property_by_column(column).key for column in mapper.primary_key)
+    for key in fields & relationships:
+        # Lazy loads of requested relationships need their local columns
+        keys.update(
+            mapper.get_property_by_column(column).key
+            for column in mapper.relationships[key].local_columns
+        )
+    return query.options(sa.orm.load_only(*[getattr(model, key) for key in keys]))
+
+
+def get_sort_indexes(kwargs, sort_columns):
+    """Get the value of `last_<column>` for keyset pagination, either from
+    parsed arguments or, for resources that accept arbitrary sort columns,
+    from the request query string. A missing value stands for NULL, since
+    `last_indexes` reports NULL sort values as null. Only a single sort
+    column is supported; multi-column sorts must use `cursor`.
+    """
+    if not sort_columns:
+        return []
+    if len(sort_columns) > 1:
+        raise exceptions.ApiError(
+            'Cannot sort on multiple fields using last_index; use cursor instead',
+            status_code=422,
+        )
+    column = sort_columns[0][0]
+    key = 'last_{0}'.format(column.key)
+    if key in kwargs:
+        return [kwargs[key]]
+    value = flask.request.args.get(key)
+    try:
+        return [paging.parse_value(column, value)]
+    except (ValueError, TypeError, OverflowError, NotImplementedError):
+        raise exceptions.ApiError(
+            'Invalid value for {0}: "{1}"'.format(key, value),
+            status_code=422,
+        )
 
 
 def extend(*dicts):
@@ -35,14 +239,18 @@ def extend(*dicts):
     return ret
 
 
+def make_tsquery(text):
+    vector = ' & '.join(text.split())
+    return sa.func.concat(vector, ':*')
+
+
 def search_text(query, column, text, order=True):
     """
 
     :param order: Order results by text similarity, descending; prohibitively
-        slow for large collections
+        slow for large collections, which should use `rank_text` instead
     """
-    vector = ' & '.join(text.split())
-    vector = sa.func.concat(vector, ':*')
+    vector = make_tsquery(text)
     query = query.filter(column.match(vector))
     if order:
         query = query.order_by(
@@ -56,6 +264,44 @@ def search_text(query, column, text, order=True):
     return query
 
 
+def search_name(query, column, text, similarity=False):
+    """Filter to rows where `column` contains `text`, or, if `similarity`, to
+    rows where `column` is similar to `text`, most similar first. Both are
+    served by trigram indexes on `column`.
+    """
+    if similarity:
+        # `%` is the trigram similarity operator of `pg_trgm`
+        query = query.filter(column % text)
+        return query.order_by(sa.desc(sa.func.similarity(column, text)))
+    return query.filter(column.ilike('%{}%'.format(text)))
+
+
+def rank_text(key, column, weight, text, limit=None):
+    """Rank fulltext matches in two phases: select the `limit` matches with
+    the greatest precomputed `weight` using the index on `column`, then rank
+    only those matches by text similarity.
+
+    :param key: Column identifying rows of the fulltext table
+    :param column: Fulltext column to search
+    :param weight: Column of precomputed weights, such as receipts
+    :param int limit: Number of matches to rank; defaults to `RANK_LIMIT`
+    :returns: Subquery of the keys and ranks of ranked matches, as columns
+        `key` and `rank`
+    """
+    vector = make_tsquery(text)
+    matches = sa.select([key.label('key'), column.label('text')]).where(
+        column.match(vector)
+    ).order_by(
+        weight.desc().nullslast()
+    ).limit(
+        limit or RANK_LIMIT
+    ).alias('matches')
+    return sa.select([
+        matches.c.key,
+        sa.func.ts_rank_cd(matches.c.text, sa.func.to_tsquery(vector)).label('rank'),
+    ]).alias('ranked')
+
+
 def filter_multi(query, kwargs, fields):
     for key, column in fields:
         if kwargs[key]: